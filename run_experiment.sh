@@ -1,7 +1,7 @@
 clean() {
     rm -f frames/*
     rm -f stats-frames/*
-    rm -f stats.txt
+    rm -f stats.npz
     rm -f stats.mp4
     rm -f simulation.mp4
     rm -f combined.mp4
@@ -30,5 +30,5 @@ while true; do
     IDX=$((IDX+1))
 done
 
-mv -f last_run.env stats.txt ant_colony_stats.png ./*.mp4 "$EXP_DIR"/
+mv -f last_run.env stats.npz ant_colony_stats.png ./*.mp4 "$EXP_DIR"/
 echo "Experiment archived in $EXP_DIR"
\ No newline at end of file
@@ -1,6 +1,5 @@
 #!/bin/bash
 
-MAX_PARALLEL=10
 START_ANTS=1
 END_ANTS=100
 START_FOOD=1
@@ -10,27 +9,9 @@ END_FOOD=100
 STEP_ANTS=1
 STEP_FOOD=1
 
-run_one() {
-    local ants=$1
-    local food=$2
-    echo "Running experiment: ANTS=$ants FOOD=$food"
-    venv/bin/python src/colony.py --output_mode=dummy --num_food="$food" --num_ants="$ants"
-}
-
-export -f run_one
-
-JOBS=0
-for ants in $(seq $START_ANTS $STEP_ANTS $END_ANTS); do
-    for food in $(seq $START_FOOD $STEP_FOOD $END_FOOD); do
-        bash -c "run_one $ants $food" &
-        JOBS=$((JOBS+1))
-        if [ "$JOBS" -ge "$MAX_PARALLEL" ]; then
-            wait -n  # Wait for any job to finish
-            JOBS=$((JOBS-1))
-        fi
-    done
-done
-
-# Wait for all remaining jobs
-wait
-echo "All scatter experiments complete."
\ No newline at end of file
+# One process pool sized to the machine's cores runs every (ants, food) cell;
+# results are appended to results.txt by the parent process only.
+venv/bin/python src/sweep.py \
+    --ants "$START_ANTS" "$END_ANTS" "$STEP_ANTS" \
+    --food "$START_FOOD" "$END_FOOD" "$STEP_FOOD" \
+    "$@"
@@ -15,9 +15,9 @@ NC='\033[0m' # No Color
 echo -e "${BLUE}Ant Colony Statistics Visualizer${NC}"
 echo "=================================="
 
-# Check if stats.txt exists
-if [ ! -f "stats.txt" ]; then
-    echo -e "${RED}Error: stats.txt not found!${NC}"
+# Check if stats.npz exists (pass --stats_file to read a legacy stats.txt)
+if [ ! -f "stats.npz" ] && [[ "$*" != *--stats_file* ]]; then
+    echo -e "${RED}Error: stats.npz not found!${NC}"
     echo -e "${YELLOW}Please run the simulation with statistics first:${NC}"
     echo "  make run-stats"
     echo "  or"
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Adaptive (num_ants, num_food) sweep.
+
+Instead of running every cell of the grid, the planner starts from a coarse
+lattice and splits only the squares whose corners disagree on the outcome (or
+are still uncertain), down to single cells. Every evaluated point gets
+replicate runs until the Wilson lower bound of its majority outcome clears
+one half at the requested confidence, or --max_repeats is reached. Squares
+whose corners all agree are filled in with that outcome.
+
+Jobs in each round are handed to the worker pool longest-expected-first,
+using the wall times already measured at the nearest evaluated point. One
+pool serves every round, so workers start once per sweep.
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+from colony import SimulationConfig
+from sweep import format_duration, run_sweep
+
+
+def wilson_lower(successes, n, z):
+    """Lower bound of the Wilson score interval for a proportion."""
+    if n == 0:
+        return 0.0
+    p = successes / n
+    denominator = 1 + z * z / n
+    centre = p + z * z / (2 * n)
+    margin = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return (centre - margin) / denominator
+
+
+def lattice(n, stride):
+    """Indices 0, stride, 2*stride, ... of a length-n axis, always including n - 1."""
+    coords = list(range(0, n, stride))
+    if coords[-1] != n - 1:
+        coords.append(n - 1)
+    return coords
+
+
+def spans(coords):
+    """Consecutive (start, end) pairs of a lattice axis; (0, 0) for a single point."""
+    if len(coords) == 1:
+        return [(coords[0], coords[0])]
+    return list(zip(coords, coords[1:]))
+
+
+def halve(lo, hi):
+    """Split an axis span at its midpoint, if it has interior cells."""
+    if hi - lo < 2:
+        return [(lo, hi)]
+    mid = (lo + hi) // 2
+    return [(lo, mid), (mid, hi)]
+
+
+class AdaptivePlanner:
+    """Decides which grid points need (more) runs and which squares to refine."""
+
+    def __init__(self, ants_values, food_values, coarse=8, confidence=0.9, min_repeats=1, max_repeats=5):
+        self.ants_values = list(ants_values)
+        self.food_values = list(food_values)
+        self.z = statistics.NormalDist().inv_cdf(confidence)
+        self.min_repeats = min_repeats
+        self.max_repeats = max(min_repeats, max_repeats)
+        self.runs = {}    # (i, j) -> [(outcome, steps, wall, line)]
+        self.filled = []  # (i0, i1, j0, j1, outcome) squares settled from their corners
+        self.regions = [(i0, i1, j0, j1)
+                        for i0, i1 in spans(lattice(len(self.ants_values), coarse))
+                        for j0, j1 in spans(lattice(len(self.food_values), coarse))]
+
+    def corners(self, region):
+        i0, i1, j0, j1 = region
+        return sorted({(i0, j0), (i0, j1), (i1, j0), (i1, j1)})
+
+    def majority(self, point):
+        """(outcome, count) of the most common outcome at a point."""
+        counts = {}
+        for outcome, *_ in self.runs.get(point, ()):
+            counts[outcome] = counts.get(outcome, 0) + 1
+        return max(counts.items(), key=lambda item: (item[1], item[0])) if counts else (None, 0)
+
+    def confident(self, point):
+        n = len(self.runs.get(point, ()))
+        return n > 0 and wilson_lower(self.majority(point)[1], n, self.z) > 0.5
+
+    def needs_run(self, point):
+        n = len(self.runs.get(point, ()))
+        if n < self.min_repeats:
+            return True
+        return n < self.max_repeats and not self.confident(point)
+
+    def pending(self):
+        """Points of the current regions that need another replicate."""
+        points = sorted({p for region in self.regions for p in self.corners(region)})
+        return [p for p in points if self.needs_run(p)]
+
+    def record(self, point, outcome, steps, wall, line):
+        self.runs.setdefault(point, []).append((outcome, steps, wall, line))
+
+    def refine(self):
+        """Settle agreeing squares and split the rest; return False when nothing is left to split."""
+        next_regions = []
+        for region in self.regions:
+            i0, i1, j0, j1 = region
+            corners = self.corners(region)
+            outcomes = {self.majority(p)[0] for p in corners}
+            if len(outcomes) == 1 and all(self.confident(p) for p in corners):
+                self.filled.append((i0, i1, j0, j1, outcomes.pop()))
+                continue
+            parts = [(a0, a1, b0, b1) for a0, a1 in halve(i0, i1) for b0, b1 in halve(j0, j1)]
+            if len(parts) > 1:
+                next_regions.extend(parts)
+        self.regions = next_regions
+        return bool(self.regions)
+
+    def expected_wall(self, point):
+        """Expected run time at a point: measured there, else at the nearest evaluated point."""
+        runs = self.runs.get(point)
+        if not runs and self.runs:
+            nearest = min(self.runs, key=lambda q: abs(q[0] - point[0]) + abs(q[1] - point[1]))
+            runs = self.runs[nearest]
+        if runs:
+            return sum(run[2] for run in runs) / len(runs)
+        return float(self.ants_values[point[0]])  # Before any timing, more ants means slower runs
+
+    def outcome_map(self):
+        """{(i, j): (outcome, representative results line, evaluated)} for every grid cell."""
+        cells = {}
+        for (i0, i1, j0, j1, outcome) in self.filled:
+            lines = [self.representative(p)[1] for p in self.corners((i0, i1, j0, j1))]
+            steps = int(statistics.median(int(line.split(',')[2]) for line in lines))
+            flags = lines[0].split(',')[3:]
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    fields = [str(self.ants_values[i]), str(self.food_values[j]), str(steps)] + flags
+                    cells.setdefault((i, j), (outcome, ','.join(fields), False))
+        for point in self.runs:
+            outcome, line = self.representative(point)
+            cells[point] = (outcome, line, True)
+        return cells
+
+    def representative(self, point):
+        """(majority outcome, results line of its median-length run) at an evaluated point."""
+        outcome = self.majority(point)[0]
+        runs = sorted((run for run in self.runs[point] if run[0] == outcome), key=lambda run: run[1])
+        return outcome, runs[len(runs) // 2][3]
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Adaptive ant colony parameter sweep")
+    parser.add_argument('--ants', type=int, nargs=3, default=[1, 100, 1], metavar=('START', 'END', 'STEP'),
+                        help='Inclusive range of --num_ants values (default: 1 100 1)')
+    parser.add_argument('--food', type=int, nargs=3, default=[1, 100, 1], metavar=('START', 'END', 'STEP'),
+                        help='Inclusive range of --num_food values (default: 1 100 1)')
+    parser.add_argument('--coarse', type=int, default=8, help='Stride of the initial lattice, in grid cells (default: 8)')
+    parser.add_argument('--confidence', type=float, default=0.9,
+                        help='One-sided confidence that a point\'s majority outcome is right (default: 0.9)')
+    parser.add_argument('--min_repeats', type=int, default=1, help='Runs per evaluated point at least (default: 1)')
+    parser.add_argument('--max_repeats', type=int, default=5, help='Runs per evaluated point at most (default: 5)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: number of cores)')
+    parser.add_argument('--engine', choices=['reference', 'numpy'], default='reference',
+                        help='Simulation engine (default: reference)')
+    parser.add_argument('--max_steps', type=int, default=None, help='Override the per-run step limit')
+    parser.add_argument('--seed', type=int, default=None, help='Base seed; run i uses seed + i (default: unseeded)')
+    parser.add_argument('--results_file', default='results.txt',
+                        help='Every run is appended here (default: results.txt)')
+    parser.add_argument('--map_file', default='adaptive_map.txt',
+                        help='One results line per grid cell, filled in where not run (default: adaptive_map.txt)')
+    return parser.parse_args(argv)
+
+
+def run_adaptive(planner, make_config, run_batch, on_run=None, log=sys.stdout):
+    """Drive the planner until every square is settled or down to single cells.
+
+    `make_config(i, j, run_index)` builds the SimulationConfig of a job and
+    `run_batch(configs)` runs them (in the given order) and returns
+    [(result, wall_time)].
+    """
+    total = 0
+    level = 0
+    while True:
+        while True:
+            points = planner.pending()
+            if not points:
+                break
+            points.sort(key=planner.expected_wall, reverse=True)  # Longest expected first
+            configs = [make_config(i, j, total + k) for k, (i, j) in enumerate(points)]
+            index = {(c.num_ants, c.num_food): p for c, p in zip(configs, points)}
+            for result, wall in run_batch(configs):
+                point = index[(result.num_ants, result.num_food)]
+                planner.record(point, result.outcome or 'ended', result.steps, wall, result.csv_line())
+                if on_run is not None:
+                    on_run(result, wall)
+            total += len(configs)
+            if log is not None:
+                log.write(f"Level {level}: {len(planner.regions)} squares, ran {len(configs)} jobs ({total} total)\n")
+                log.flush()
+        if not planner.refine():
+            return total
+        level += 1
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    ants_values = list(range(args.ants[0], args.ants[1] + 1, args.ants[2]))
+    food_values = list(range(args.food[0], args.food[1] + 1, args.food[2]))
+    planner = AdaptivePlanner(ants_values, food_values, args.coarse, args.confidence,
+                              args.min_repeats, args.max_repeats)
+
+    def make_config(i, j, run_index):
+        config = SimulationConfig(num_ants=ants_values[i], num_food=food_values[j], engine=args.engine)
+        if args.max_steps is not None:
+            config.max_steps = args.max_steps
+        if args.seed is not None:
+            config.seed = args.seed + run_index
+        return config
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes=args.workers) as pool, open(args.results_file, 'a') as results_out:
+        def run_batch(configs):
+            return run_sweep(configs, args.workers, chunksize=1, shuffle=False, progress=None, pool=pool)
+
+        def record(result, wall_time):
+            results_out.write(result.csv_line() + "\n")
+            results_out.flush()
+        total = run_adaptive(planner, make_config, run_batch, on_run=record)
+        # Let workers exit on their own; terminate() can hang on workers that initialized SDL
+        pool.close()
+        pool.join()
+
+    cells = planner.outcome_map()
+    with open(args.map_file, 'w') as map_out:
+        for (i, j) in sorted(cells):
+            map_out.write(cells[(i, j)][1] + "\n")
+    grid = len(ants_values) * len(food_values)
+    evaluated = sum(1 for _, _, run in cells.values() if run)
+    print(f"{total} runs at {evaluated} of {grid} grid points in {format_duration(time.perf_counter() - start)} "
+          f"({total / grid:.1%} of one run per cell); map written to {args.map_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Headless benchmark suite.
+
+Runs a matrix of (num_ants, num_food, output mode, engine) cases, each with
+fixed seeds for a fixed number of steps (a run that loses a colony earlier
+stops there), repeating the seeded runs until at least --min_seconds of
+steps have been timed so small cases are not lost in noise. It reports steps/sec, per-step latency percentiles and peak
+RSS. Every case runs in its own freshly spawned process, one at a time, so
+peak RSS belongs to that case alone and cases do not compete for cores.
+
+--scaling instead runs a weak-scaling series: square worlds from 2500 to
+20000 pixels wide with ant and food counts growing with the area (up to
+100,000 ants and 10,000 food items among 32 colonies), so the density stays
+constant. The reported microseconds per ant-step should stay flat as the
+world grows when per-step cost depends on local density only.
+
+--strong_scaling runs the largest of those worlds with the single-process
+numpy engine and with the tiled engine on 1, 2, 4, ... up to all cores,
+and prints each tile count's speedup and parallel efficiency.
+
+--events runs the reference engine on worlds from the default board up to
+10000x10000 pixels, each with and without event-driven stepping, and prints
+how much faster (or slower) each world ran with it.
+
+--memory builds worlds of 1,000 up to 1,000,000 ants on the reference
+(per-object) and numpy (array) engines without stepping them, and reports
+the bytes each ant takes, as traced by tracemalloc, and the peak RSS.
+
+Results can be written as JSON and compared against a stored baseline; a
+case whose steps/sec falls more than --tolerance below the baseline, or
+whose peak RSS grows by more than that, is flagged as a regression and the
+exit status is 1.
+
+    python src/benchmark.py --output baseline.json
+    python src/benchmark.py --baseline baseline.json --output current.json
+    python src/benchmark.py --scaling
+    python src/benchmark.py --strong_scaling
+    python src/benchmark.py --events
+    python src/benchmark.py --memory
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from colony import HEIGHT, WIDTH, Simulation, SimulationConfig, food_for_density
+
+PERCENTILES = (50, 90, 99)
+
+# Weak-scaling series: world side lengths, with ants and food kept at the density of the largest
+SCALING_SIDES = (2500, 5000, 10000, 20000)
+SCALING_ANTS = 100000  # At the largest side
+SCALING_FOOD_DENSITY = 0.25  # Food items per 100x100 pixels: 10,000 at the largest side
+
+# Event-stepping series: (side, ants, food, colonies), from the default board to sparse worlds; None is the default
+EVENT_WORLDS = ((None, 80, 20, 2), (3000, 500, 20, 4), (6000, 2000, 40, 4), (10000, 4000, 80, 16))
+
+# Memory series: ant counts, on worlds at the scaling density; a little food so the ants dominate
+MEMORY_ANTS = (1000, 10000, 100000, 1000000)
+MEMORY_FOOD = 50
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Measure simulation throughput across scales and output modes")
+    parser.add_argument('--ants', type=int, nargs='+', default=None,
+                        help='num_ants values of the matrix (default: 10 100 1000 10000; '
+                             '1000 10000 100000 1000000 with --memory)')
+    parser.add_argument('--food', type=int, nargs='+', default=[1, 50, 500, 5000],
+                        help='num_food values of the matrix (default: 1 50 500 5000)')
+    parser.add_argument('--modes', nargs='+', choices=['dummy', 'files'], default=['dummy', 'files'],
+                        help='Output modes to measure (default: dummy files)')
+    parser.add_argument('--engines', nargs='+', choices=['reference', 'numpy', 'tiled'], default=None,
+                        help='Simulation engines to measure (default: reference; numpy with --scaling; '
+                             'reference numpy with --memory)')
+    parser.add_argument('--steps', type=int, default=None,
+                        help='Step limit per run (default: 200; 20 with --scaling; 150 with --events)')
+    parser.add_argument('--seeds', type=int, default=None,
+                        help='Runs per case, seeded 0..N-1 (default: 2; 1 with --scaling)')
+    parser.add_argument('--min_seconds', type=float, default=1.0,
+                        help='Repeat the seeded runs of a case until this much stepping time is measured (default: 1.0)')
+    parser.add_argument('--quick', action='store_true',
+                        help='Small matrix for a fast check: 10 and 100 ants, 1 and 50 food, 100 steps, 1 seed')
+    parser.add_argument('--scaling', action='store_true',
+                        help='Weak-scaling series at constant density up to a 20000x20000 world with 100,000 ants '
+                             'in dummy mode, instead of the --ants x --food matrix')
+    parser.add_argument('--strong_scaling', action='store_true',
+                        help='The largest --scaling world on the numpy engine and on the tiled engine with '
+                             '1, 2, 4, ... up to --max_tiles worker processes')
+    parser.add_argument('--events', action='store_true',
+                        help='Reference engine with and without --events, from the default board up to a sparse '
+                             '10000x10000 world, instead of the --ants x --food matrix')
+    parser.add_argument('--memory', action='store_true',
+                        help='Measure bytes per ant and peak RSS of freshly built worlds instead of throughput')
+    parser.add_argument('--max_tiles', type=int, default=os.cpu_count() or 1,
+                        help='Largest tile count for --strong_scaling (default: number of cores)')
+    parser.add_argument('--colonies', type=int, default=None,
+                        help='Colonies per run (default: 2; 32 with --scaling or --strong_scaling)')
+    parser.add_argument('--output', default=None, help='Write the results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='Compare against the results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Allowed relative drop in steps/sec (and growth in peak RSS) against the baseline '
+                             '(default: 0.15)')
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.ants, args.food, args.steps, args.seeds = [10, 100], [1, 50], 100, 1
+    args.ants = args.ants or list(MEMORY_ANTS if args.memory else (10, 100, 1000, 10000))
+    large = args.scaling or args.strong_scaling or args.memory
+    args.steps = args.steps or (20 if large else 150 if args.events else 200)
+    args.seeds = args.seeds or (1 if large or args.events else 2)
+    args.engines = args.engines or (['numpy'] if args.scaling else ['reference', 'numpy'] if args.memory
+                                    else ['reference'])
+    args.colonies = args.colonies or (32 if large else 2)
+    return args
+
+
+def case_name(case):
+    name = f"{case['engine']}/{case['mode']}/ants={case['num_ants']}/food={case['num_food']}"
+    if case.get('num_colonies', 2) != 2:
+        name += f"/colonies={case['num_colonies']}"
+    if (case.get('width', WIDTH), case.get('height', HEIGHT)) != (WIDTH, HEIGHT):
+        name += f"/world={case['width']}x{case['height']}"
+    if case.get('tiles'):
+        name += f"/tiles={case['tiles']}"
+    if case.get('events'):
+        name += "/events"
+    return name
+
+
+def build_cases(ants, food, modes, engines, steps, seeds, min_seconds=0.0, colonies=2):
+    """One case dict per point of the benchmark matrix."""
+    return [{'engine': engine, 'mode': mode, 'num_ants': num_ants, 'num_food': num_food, 'steps': steps,
+             'seeds': seeds, 'min_seconds': min_seconds, 'num_colonies': colonies}
+            for engine in engines for mode in modes for num_ants in ants for num_food in food]
+
+
+def scaling_cases(engines, steps, seeds, colonies=32, sides=SCALING_SIDES):
+    """Constant-density cases on growing square worlds, the largest holding SCALING_ANTS ants."""
+    largest = max(sides)
+    return [{'engine': engine, 'mode': 'dummy', 'num_ants': round(SCALING_ANTS * (side / largest) ** 2),
+             'num_food': food_for_density(SCALING_FOOD_DENSITY, side, side), 'steps': steps, 'seeds': seeds,
+             'min_seconds': 0.0, 'num_colonies': colonies, 'width': side, 'height': side}
+            for engine in engines for side in sides]
+
+
+def memory_cases(engines, ants, colonies=32):
+    """One world per engine and ant count, sized to hold the ants at the scaling density."""
+    largest = max(SCALING_SIDES)
+    cases = []
+    for engine in engines:
+        for num_ants in ants:
+            side = max(WIDTH, round(largest * math.sqrt(num_ants / SCALING_ANTS)))
+            cases.append({'engine': engine, 'mode': 'memory', 'num_ants': num_ants, 'num_food': MEMORY_FOOD,
+                          'num_colonies': colonies, 'width': side, 'height': side})
+    return cases
+
+
+def event_cases(steps, seeds, worlds=EVENT_WORLDS):
+    """Each world on the reference engine, stepping every ant and then with event-driven stepping."""
+    cases = []
+    for side, num_ants, num_food, colonies in worlds:
+        base = {'engine': 'reference', 'mode': 'dummy', 'num_ants': num_ants, 'num_food': num_food, 'steps': steps,
+                'seeds': seeds, 'min_seconds': 0.0, 'num_colonies': colonies}
+        if side is not None:
+            base.update(width=side, height=side)
+        cases += [base, dict(base, events=True)]
+    return cases
+
+
+def event_speedups(results):
+    """(name, speedup) of each --events result against the same world stepped in full."""
+    plain = {result['name']: result for result in results if not result.get('events')}
+    rows = []
+    for result in results:
+        if result.get('events'):
+            base = plain[result['name'][:-len('/events')]]
+            rows.append((base['name'], result['steps_per_sec'] / max(base['steps_per_sec'], 1e-9)))
+    return rows
+
+
+def tile_counts(max_tiles):
+    """1, 2, 4, ... below `max_tiles`, then `max_tiles` itself."""
+    counts = [1]
+    while counts[-1] * 2 < max_tiles:
+        counts.append(counts[-1] * 2)
+    return counts + [max_tiles] if max_tiles > 1 else counts
+
+
+def strong_scaling_cases(steps, seeds, colonies=32, max_tiles=1, side=max(SCALING_SIDES)):
+    """The largest scaling world on the numpy engine, then on the tiled engine at each tile count."""
+    base = scaling_cases(['numpy'], steps, seeds, colonies, sides=(side,))[0]
+    return [base] + [dict(base, engine='tiled', tiles=tiles) for tiles in tile_counts(max_tiles)]
+
+
+def speedups(results):
+    """(name, tiles, speedup, efficiency) of each tiled result against the numpy one."""
+    base = next(result for result in results if result['engine'] == 'numpy')
+    rows = []
+    for result in results:
+        if result['engine'] == 'tiled':
+            speedup = result['steps_per_sec'] / max(base['steps_per_sec'], 1e-9)
+            rows.append((result['name'], result['tiles'], speedup, speedup / result['tiles']))
+    return rows
+
+
+def measure(case):
+    """Run a case's seeds in this process; return its measurements (RSS is this process's peak)."""
+    latencies = []
+    runs = 0
+    with tempfile.TemporaryDirectory() as frames_dir:
+        while runs < case['seeds'] or sum(latencies) < case.get('min_seconds', 0.0):
+            seed = runs % case['seeds']
+            runs += 1
+            config = SimulationConfig(num_ants=case['num_ants'], num_food=case['num_food'], output_mode=case['mode'],
+                                      engine=case['engine'], max_steps=case['steps'], stop_on_divergence=False,
+                                      seed=seed, frames_dir=os.path.join(frames_dir, str(seed)),
+                                      num_colonies=case.get('num_colonies', 2), width=case.get('width', WIDTH),
+                                      height=case.get('height', HEIGHT), tiles=case.get('tiles', 0),
+                                      events=case.get('events', False))
+            with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):  # Hide per-frame log lines
+                simulation = Simulation(config)
+                running = True
+                while running:
+                    start = time.perf_counter()
+                    running = simulation.step()
+                    latencies.append(time.perf_counter() - start)
+    total_time = sum(latencies)
+    latencies = np.array(latencies) * 1000
+    return dict(case, name=case_name(case), runs=runs, total_steps=len(latencies), seconds=round(total_time, 4),
+                steps_per_sec=round(len(latencies) / max(total_time, 1e-9), 2),
+                us_per_ant_step=round(total_time / max(len(latencies) * case['num_ants'], 1) * 1e6, 3),
+                latency_ms={**{f'p{p}': round(float(np.percentile(latencies, p)), 4) for p in PERCENTILES},
+                            'max': round(float(latencies.max()), 4)},
+                peak_rss_mb=round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1))
+
+
+def measure_memory(case):
+    """Build a case's world in this process without stepping it; return the memory it takes.
+
+    The world is built twice: once for the peak RSS, then again under
+    tracemalloc, whose own bookkeeping would inflate the RSS, for the bytes
+    allocated per ant.
+    """
+    config = SimulationConfig(num_ants=case['num_ants'], num_food=case['num_food'], engine=case['engine'],
+                              stop_on_divergence=False, seed=0, num_colonies=case['num_colonies'],
+                              width=case['width'], height=case['height'])
+    with open(os.devnull, 'w') as quiet, contextlib.redirect_stdout(quiet):
+        simulation = Simulation(config)
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        del simulation
+        tracemalloc.start()
+        simulation = Simulation(config)
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    return dict(case, name=case_name(case), traced_mb=round(traced / 2**20, 1),
+                bytes_per_ant=round(traced / max(case['num_ants'], 1), 1), peak_rss_mb=round(peak_rss, 1))
+
+
+def measure_into(case, queue):
+    queue.put(measure_memory(case) if case['mode'] == 'memory' else measure(case))
+
+
+def run_cases(cases, on_result=None):
+    """Measure each case in a fresh process, one at a time; return the results in order."""
+    # A forked child would start with the parent's memory; a plain Process rather than a Pool
+    # worker, which as a daemon could not start the tiled engine's workers
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for case in cases:
+        queue = context.SimpleQueue()
+        process = context.Process(target=measure_into, args=(case, queue))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            raise RuntimeError(f"Benchmark case {case_name(case)} failed with exit code {process.exitcode}")
+        results.append(queue.get())
+        if on_result is not None:
+            on_result(results[-1])
+    return results
+
+
+def environment():
+    """Machine and library versions the results were measured with."""
+    return {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(), 'cpus': os.cpu_count(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+
+def compare(results, baseline, tolerance):
+    """(name, steps/sec ratio, peak RSS ratio, regressed) for every case also in the baseline."""
+    previous = {case['name']: case for case in baseline['cases']}
+    rows = []
+    for case in results:
+        base = previous.get(case['name'])
+        if base is None:
+            continue
+        speed = case['steps_per_sec'] / max(base['steps_per_sec'], 1e-9) if 'steps_per_sec' in case else 1.0
+        memory = case['peak_rss_mb'] / max(base['peak_rss_mb'], 1e-9)
+        rows.append((case['name'], speed, memory, speed < 1 - tolerance or memory > 1 + tolerance))
+    return rows
+
+
+def format_result(result):
+    if result['mode'] == 'memory':
+        return (f"{result['name']:<60} {result['bytes_per_ant']:>8.0f} bytes/ant  traced {result['traced_mb']:.1f}MB  "
+                f"peak RSS {result['peak_rss_mb']:.0f}MB")
+    latency = result['latency_ms']
+    return (f"{result['name']:<40} {result['total_steps']:>6} steps {result['steps_per_sec']:>10.1f} steps/sec  "
+            f"{result['us_per_ant_step']:.2f}us/ant-step  "
+            f"p50 {latency['p50']:.3f}ms p99 {latency['p99']:.3f}ms max {latency['max']:.1f}ms  "
+            f"peak RSS {result['peak_rss_mb']:.0f}MB")
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    if args.strong_scaling:
+        cases = strong_scaling_cases(args.steps, args.seeds, args.colonies, args.max_tiles)
+    elif args.memory:
+        cases = memory_cases(args.engines, args.ants, args.colonies)
+    elif args.events:
+        cases = event_cases(args.steps, args.seeds)
+    elif args.scaling:
+        cases = scaling_cases(args.engines, args.steps, args.seeds, args.colonies)
+    else:
+        cases = build_cases(args.ants, args.food, args.modes, args.engines, args.steps, args.seeds,
+                            args.min_seconds, args.colonies)
+    if args.memory:
+        print(f"Building {len(cases)} worlds")
+    else:
+        print(f"Running {len(cases)} benchmark cases, {args.seeds} seed(s) x {args.steps} steps each")
+    results = run_cases(cases, on_result=lambda result: print(format_result(result), flush=True))
+
+    if args.strong_scaling:
+        print("Speedup over the numpy engine:")
+        for _, tiles, speedup, efficiency in speedups(results):
+            print(f"{tiles:>4} tiles  x{speedup:.2f}  efficiency {100 * efficiency:.0f}%")
+    if args.events:
+        print("Speedup from --events:")
+        for name, speedup in event_speedups(results):
+            print(f"{name:<70} x{speedup:.2f}")
+
+    report = {'environment': environment(), 'cases': results}
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump(report, out, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.tolerance)
+        print(f"Compared with {args.baseline} ({len(rows)} matching cases):")
+        for name, speed, memory, regressed in rows:
+            print(f"{'REGRESSION' if regressed else 'ok':>10}  {name:<40} steps/sec x{speed:.2f}  peak RSS x{memory:.2f}")
+        if any(regressed for *_, regressed in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
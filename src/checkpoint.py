@@ -0,0 +1,94 @@
+"""
+Snapshots of a running simulation.
+
+A checkpoint is the pickled state of a Simulation (config, board with its
+colonies, ants and food, or the NumPy engine arrays, RNG state, telemetry and
+counters), gzip-compressed and written atomically. Loading one and stepping
+on reproduces the original run bit for bit; forking one reseeds and/or
+changes parameters first, so variants share the simulated prefix.
+"""
+
+import dataclasses
+import gzip
+import os
+import pickle
+
+FORMAT_VERSION = 1
+
+# Config fields that may differ between a checkpoint and the run resumed from it
+OVERRIDABLE = ('learning_rate', 'ant_speed', 'initial_life', 'max_steps', 'stop_on_divergence',
+               'output_mode', 'frame_interval', 'frames_dir', 'video_file', 'stats', 'stats_file',
+               'stats_interval', 'checkpoint_interval', 'checkpoint_file', 'plateau_window', 'plateau_windows',
+               'plateau_tolerance', 'plateau_population_tolerance', 'plateau_record_only', 'profile',
+               'profile_window', 'profile_file', 'tiles', 'live', 'live_interval', 'live_capacity')
+
+# Spellings of booleans accepted by --set
+TRUE = ('1', 'true', 'yes', 'on')
+FALSE = ('0', 'false', 'no', 'off')
+
+# Suffixed per variant so forked runs do not overwrite each other's files
+PER_RUN_FILES = ('frames_dir', 'video_file', 'stats_file', 'checkpoint_file', 'profile_file')
+
+
+def save(state, path):
+    """Write a snapshot to `path`, replacing any previous one only once complete."""
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, 'wb', compresslevel=3) as out:
+        pickle.dump({'version': FORMAT_VERSION, 'state': state}, out, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    """Read a snapshot written by save()."""
+    with gzip.open(path, 'rb') as f:
+        payload = pickle.load(f)
+    if payload.get('version') != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version {payload.get('version')!r}")
+    return payload['state']
+
+
+def parse_value(config, name, text):
+    """Convert `text` to the declared type of config field `name`."""
+    if name not in OVERRIDABLE:
+        raise ValueError(f"Cannot change {name!r} when resuming; allowed: {', '.join(OVERRIDABLE)}")
+    kind = next(field.type for field in dataclasses.fields(config) if field.name == name)
+    if kind is bool:
+        if text.lower() in TRUE:
+            return True
+        if text.lower() in FALSE:
+            return False
+        raise ValueError(f"{name} takes one of {', '.join(TRUE + FALSE)}, got {text!r}")
+    return kind(text)
+
+
+def parse_overrides(config, assignments, variant=0):
+    """Turn NAME=VALUE strings into {name: value} for one variant.
+
+    A comma-separated VALUE list gives each fork variant its own value,
+    cycling through the list.
+    """
+    overrides = {}
+    for assignment in assignments or ():
+        name, sep, values = assignment.partition('=')
+        if not sep:
+            raise ValueError(f"Expected NAME=VALUE, got {assignment!r}")
+        options = values.split(',')
+        overrides[name] = parse_value(config, name, options[variant % len(options)])
+    return overrides
+
+
+def apply_overrides(config, overrides, engine=None):
+    """Set overridden config fields, mirroring them onto the NumPy engine where it keeps a copy."""
+    for name, value in overrides.items():
+        setattr(config, name, value)
+        if engine is not None and hasattr(engine, name):
+            setattr(engine, name, value)
+
+
+def rename_outputs(config, variant):
+    """Give the run's output files a _fork<variant> suffix, in place."""
+    for name in PER_RUN_FILES:
+        root, ext = os.path.splitext(getattr(config, name))
+        if root.endswith('.pkl'):
+            root, ext = root[:-4], '.pkl' + ext
+        setattr(config, name, f"{root}_fork{variant}{ext}")
@@ -1,62 +1,31 @@
-import matplotlib.pyplot as plt
 import os
-import pygame
-import random
 import math
-import sys
 import collections
+import heapq
+import sys
 import argparse
+import contextlib
+import time
+import signal
+from dataclasses import dataclass, asdict
+from typing import Optional, Tuple
 
+import numpy as np
 
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description="Ant Colonies Simulation")
-parser.add_argument('--num_ants', type=int, default=80, help='Number of ants (default: 80)')
-parser.add_argument('--num_food', type=int, default=20, help='Number of food items (default: 20)')
-parser.add_argument('--output_mode', choices=['display', 'files', 'dummy'], default='dummy',
-                    help='Output mode: "display" for window, "files" for image files, or "dummy" for no output (default: dummy)')
-parser.add_argument('--stats', action='store_true', default=False,
-                    help='Save detailed statistics to stats.txt file (default: False)')
-parser.add_argument('--no_stop_on_divergence', action='store_true', default=False,
-                    help='Continue simulation even if colonies diverge in food preference')
-args = parser.parse_args()
-
-# Environment setup for Pygame
-if args.output_mode in ['dummy', 'files']:
-    os.environ['SDL_VIDEODRIVER'] = 'dummy'  # Use dummy by default for headless runs; can be overridden
-
-# Initialize Pygame
-pygame.init()
-WIDTH, HEIGHT = 800, 600
+import checkpoint
+from colors import COLOR_GREEN, COLOR_ORANGE, colony_color
+from events import EventScheduler
+from food import FoodRegistry
+from frames import FrameWriter
+from profiler import Profiler
+from rng import RandomPool
+from spatial import SpatialGrid
+from telemetry import TelemetryRecorder
+from engine_numpy import NumpyEngine
 
-NUM_ANTS = args.num_ants
-NUM_FOOD = args.num_food
-
-# Set up screen based on output mode
-if args.output_mode == 'display':
-    screen = pygame.display.set_mode((WIDTH, HEIGHT))
-    pygame.display.set_caption("Ant Colonies Simulation")
-    use_display = True
-    use_dummy = False
-    use_files = False
-elif args.output_mode == 'dummy':
-    screen = pygame.Surface((WIDTH, HEIGHT))
-    use_display = False
-    use_dummy = True
-    use_files = False
-else:  # files mode
-    screen = pygame.Surface((WIDTH, HEIGHT))
-    use_display = False
-    use_dummy = False
-    use_files = True
-
-# Colors as constants
-COLOR_WHITE = (255, 255, 255)
-COLOR_BLACK = (0, 0, 0)
-COLOR_RED = (255, 0, 0)
-COLOR_GREEN = (0, 255, 0)
-COLOR_ORANGE = (254, 183, 42)
-
-# Simulation constants
+
+# Simulation defaults (overridable per run through SimulationConfig)
+WIDTH, HEIGHT = 800, 600
 ANT_RADIUS = 7
 FOOD_RADIUS = 9
 VISION_RADIUS = 50
@@ -67,22 +36,162 @@ LEARNING_RATE = 0.1
 MAX_STEPS = 500000
 FRAME_INTERVAL = 100  # Save every 100 steps in 'files' mode
 
+NO_PROFILE = contextlib.nullcontext()  # Stands in for a phase timer when a run is not profiled
+
 # Colony positions
 COLONY_A_POS = (100, 100)
 COLONY_B_POS = (WIDTH - 100, HEIGHT - 100)
+FOOD_DENSITY_AREA = 100 * 100  # --food_density counts food items per this many square pixels
+
+
+@dataclass
+class SimulationConfig:
+    """Parameters of a single simulation run."""
+    num_ants: int = 80
+    num_food: int = 20
+    output_mode: str = 'dummy'  # 'display', 'files' or 'dummy'
+    stats: bool = False
+    stop_on_divergence: bool = True
+    neighbor_search: str = 'grid'  # 'grid' or 'brute'
+    events: bool = False  # Reference engine: skip the steps of ants nothing can reach
+    event_horizon: int = 32  # Longest sleep, in steps
+    engine: str = 'reference'  # 'reference', 'numpy' or 'tiled'
+    tiles: int = 0  # Worker processes of the tiled engine (0: one per core)
+    seed: Optional[int] = None
+    width: int = WIDTH
+    height: int = HEIGHT
+    ant_radius: int = ANT_RADIUS
+    food_radius: int = FOOD_RADIUS
+    vision_radius: int = VISION_RADIUS
+    colony_radius: int = COLONY_RADIUS
+    ant_speed: float = ANT_SPEED
+    initial_life: int = INITIAL_LIFE
+    learning_rate: float = LEARNING_RATE
+    max_steps: int = MAX_STEPS
+    frame_interval: int = FRAME_INTERVAL
+    colony_a_pos: Tuple[int, int] = COLONY_A_POS
+    colony_b_pos: Tuple[int, int] = COLONY_B_POS
+    num_colonies: int = 2
+    colony_positions: Optional[Tuple[Tuple[int, int], ...]] = None  # Default: A and B for two colonies, else a grid
+    stats_file: str = 'stats.npz'
+    stats_interval: int = FRAME_INTERVAL  # Steps between telemetry samples
+    stats_capacity: int = 4096  # Telemetry rows preallocated
+    stats_mode: str = 'grow'  # 'grow', 'ring' or 'decimate' once the rows are full
+    frames_dir: str = 'frames'
+    frame_format: str = 'png'  # 'png', 'ffmpeg' (raw RGB piped to ffmpeg) or 'auto'
+    frame_workers: int = 2
+    frame_queue: int = 8  # Frames buffered between the loop and the writers
+    frame_backpressure: str = 'block'  # 'block' or 'drop' when the queue is full
+    video_file: str = 'simulation.mp4'
+    checkpoint_interval: int = 0  # Steps between snapshots; 0 only snapshots on SIGTERM
+    checkpoint_file: str = 'checkpoint.pkl.gz'
+    plateau_window: int = 0  # Steps per plateau-detector window; 0 disables early stopping
+    plateau_windows: int = 5  # Consecutive windows without drift before a run counts as stuck
+    plateau_tolerance: float = 0.05  # Allowed spread of window-mean preferences
+    plateau_population_tolerance: float = 0.1  # Allowed spread of window-mean populations, relative
+    plateau_record_only: bool = False  # Note the plateau step but keep running
+    profile: bool = False  # Time step phases and count neighbor checks and events
+    profile_window: int = 1000  # Steps per profile summary line
+    profile_file: str = 'profile.json'
+    live: str = ''  # Serve live metrics on 'PORT', 'HOST:PORT' or a UNIX socket path; '' is off
+    live_interval: int = 10  # Steps between live metrics rows
+    live_capacity: int = 1024  # Rows kept for readers that fall behind
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of a finished run, as recorded in results.txt."""
+    num_ants: int
+    num_food: int
+    steps: int
+    colony_a_alive: bool
+    colony_b_alive: bool
+    colony_a_preference: float
+    colony_b_preference: float
+    death_count: int
+    elapsed: float
+    seed: Optional[int] = None
+    outcome: str = ''  # 'divergence', 'extinction', 'timeout' or 'plateau'
+    plateau_step: Optional[int] = None  # Step the plateau detector fired at, if it did
+    num_colonies: int = 2
+    colonies_alive: Optional[Tuple[bool, ...]] = None  # Every colony in order; colony_a/b are the first two
+    colony_preferences: Optional[Tuple[float, ...]] = None
+
+    def csv_line(self, with_seed=False):
+        """Format the result as a results.txt line, optionally followed by the seed.
+
+        Runs with other than two colonies get an 'alive=' field of one 0/1 flag
+        per colony, and runs ended early by the plateau detector a trailing
+        'plateau' field.
+        """
+        line = f"{self.num_ants},{self.num_food},{self.steps},{int(self.colony_a_alive)},{int(self.colony_b_alive)}"
+        if with_seed:
+            line += f",{self.seed}"
+        if self.num_colonies != 2 and self.colonies_alive is not None:
+            line += ",alive=" + ''.join('1' if alive else '0' for alive in self.colonies_alive)
+        if self.outcome == 'plateau':
+            line += ",plateau"
+        return line
+
+    def as_dict(self):
+        return asdict(self)
+
+    def colonies_summary(self):
+        """Surviving colonies as text: the 0/1 flags of A and B for two colonies, else 'alive/total'."""
+        if self.num_colonies == 2 or self.colonies_alive is None:
+            return f"{int(self.colony_a_alive)}/{int(self.colony_b_alive)}"
+        return f"{sum(self.colonies_alive)}/{self.num_colonies}"
 
-# Food namedtuple
-Food = collections.namedtuple('Food', ['x', 'y', 'color'])
 
 class Colony:
-    def __init__(self, pos, color, capacity, initial_preference=0.5):
+    __slots__ = ('board', 'pos', 'index', 'color', 'capacity', 'food_preference', 'ants', 'is_alive',
+                 'preference_sum', 'preference_sumsq', 'min_heap', 'max_heap')
+
+    def __init__(self, board, pos, color, capacity, initial_preference=0.5, index=0):
+        self.board = board
         self.pos = pos
+        self.index = index  # Position in board.colonies, used to order neighbor queries
         self.color = color
         self.capacity = capacity
         self.food_preference = initial_preference
-        self.food_preference_stats = []
-        self.ants = []
+        self.ants = []  # Living ants; each ant knows its index here
         self.is_alive = capacity > 0
+        # Running aggregates over the living ants' preferences
+        self.preference_sum = 0.0
+        self.preference_sumsq = 0.0
+        self.min_heap = []  # (preference, order, ant), dead entries dropped lazily
+        self.max_heap = []  # (-preference, order, ant)
+
+    @property
+    def population(self):
+        return len(self.ants)
+
+    @property
+    def preference_mean(self):
+        """Mean preference of the living ants right now (food_preference is the per-step snapshot)."""
+        return self.preference_sum / len(self.ants) if self.ants else self.food_preference
+
+    @property
+    def preference_variance(self):
+        if not self.ants:
+            return 0.0
+        mean = self.preference_sum / len(self.ants)
+        return max(0.0, self.preference_sumsq / len(self.ants) - mean * mean)
+
+    @property
+    def preference_min(self):
+        return self.heap_top(self.min_heap)
+
+    @property
+    def preference_max(self):
+        top = self.heap_top(self.max_heap)
+        return -top if top is not None else None
+
+    def heap_top(self, heap):
+        """Smallest live key of a min/max heap, or None for an empty colony."""
+        while heap and not heap[0][2].is_alive:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
 
     def spawn_ant(self, food_preference=None):
         """Spawn a new ant if under capacity."""
@@ -91,110 +200,332 @@ class Colony:
         if food_preference is None:
             food_preference = self.food_preference
         ant = Ant(self, food_preference)
+        ant.index = len(self.ants)
         self.ants.append(ant)
+        preference = ant.food_preference
+        self.preference_sum += preference
+        self.preference_sumsq += preference * preference
+        heapq.heappush(self.min_heap, (preference, ant.order, ant))
+        heapq.heappush(self.max_heap, (-preference, ant.order, ant))
 
     def remove_ant(self, ant):
-        """Remove an ant from the colony."""
-        if ant in self.ants:
-            self.ants.remove(ant)
+        """Remove an ant from the colony by swapping the last ant into its place."""
+        index = ant.index
+        if index is None or index >= len(self.ants) or self.ants[index] is not ant:
+            return
+        last = self.ants.pop()
+        if last is not ant:
+            self.ants[index] = last
+            last.index = index
+        ant.index = None
         if not self.ants:
             self.is_alive = False
+            self.preference_sum = self.preference_sumsq = 0.0
+            self.min_heap, self.max_heap = [], []
+            return
+        preference = ant.food_preference
+        self.preference_sum -= preference
+        self.preference_sumsq -= preference * preference
+        # Rebuild the heaps once dead entries outnumber the living ants
+        if len(self.min_heap) > 2 * len(self.ants) + 16:
+            self.min_heap = [(a.food_preference, a.order, a) for a in self.ants]
+            self.max_heap = [(-a.food_preference, a.order, a) for a in self.ants]
+            heapq.heapify(self.min_heap)
+            heapq.heapify(self.max_heap)
 
     def refresh(self):
-        """Remove dead ants and update average food preference."""
-        self.ants = [ant for ant in self.ants if ant.is_alive]
+        """Update the average food preference from the running sums."""
         if not self.ants:
             self.is_alive = False
             return
-        preferences = [ant.food_preference for ant in self.ants]
-        self.food_preference = sum(preferences) / len(preferences)
-        self.food_preference_stats.append(self.food_preference)
-
-    def draw(self):
-        """Draw the colony and preference bar."""
-        if not self.is_alive:
-            return
-        pygame.draw.circle(screen, self.color, self.pos, COLONY_RADIUS)
-        # Preference bar: green for green preference, orange for orange
-        bar_x = self.pos[0] - 2 * COLONY_RADIUS
-        bar_y = self.pos[1] - 2 * COLONY_RADIUS
-        bar_width = 8
-        green_height = COLONY_RADIUS * 4 * self.food_preference
-        orange_height = COLONY_RADIUS * 4 * (1 - self.food_preference)
-        pygame.draw.rect(screen, COLOR_GREEN, (bar_x, bar_y, bar_width, green_height))
-        pygame.draw.rect(screen, COLOR_ORANGE, (bar_x, bar_y + green_height, bar_width, orange_height))
+        self.food_preference = self.preference_sum / len(self.ants)
 
 class Board:
-    def __init__(self):
+    profiler = None  # Set to a Profiler to time and count each step
+    events = None  # EventScheduler with --events
+
+    def __init__(self, config, use_grid=True):
+        self.config = config
+        self.rng = RandomPool(config.seed)
         self.colonies = []
-        self.food_items = []  # Renamed for clarity
+        self.food_items = FoodRegistry()
         self.death_count = 0
-        self.death_count_stats = []
         self.step = 0
+        self.ants_spawned = 0
+        # Spatial indexes; None in brute-force mode
+        self.use_grid = use_grid
+        self.food_grid = SpatialGrid(config.vision_radius) if use_grid else None
+        self.vision_grid = SpatialGrid(config.vision_radius) if use_grid else None
+        self.contact_grid = SpatialGrid(config.ant_radius * 2) if use_grid else None
+        if config.events:
+            self.events = EventScheduler(self, config.event_horizon)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('profiler', None)  # Profiling belongs to a run, not to its checkpoints
+        return state
 
     def spawn_colony(self, pos, color, capacity):
         """Add a new colony to the board."""
-        colony = Colony(pos, color, capacity)
+        colony = Colony(self, pos, color, capacity, index=len(self.colonies))
         self.colonies.append(colony)
         return colony
 
+    def populate(self):
+        """Spawn every colony's initial ants and the initial food."""
+        for colony in self.colonies:
+            for _ in range(colony.capacity):
+                colony.spawn_ant()
+        for _ in range(self.config.num_food):
+            self.add_food()
+
+    def add_food(self, x=None, y=None, color=None):
+        """Add a new food item at random or specified position."""
+        if color is None:
+            color = self.rng.choice([COLOR_GREEN, COLOR_ORANGE])
+        if x is None:
+            x = self.rng.randint(0, self.config.width)
+        if y is None:
+            y = self.rng.randint(0, self.config.height)
+        self.place_food(self.food_items.add(x, y, color))
+
+    def reseed(self, seed):
+        """Continue with a fresh random stream."""
+        self.rng = RandomPool(seed)
+
+    def all_ants(self):
+        """Generator for all ants across colonies."""
+        for colony in self.colonies:
+            for ant in colony.ants:
+                yield ant
+
+    def place_food(self, food):
+        """Index a food item that was just added to the registry."""
+        if self.use_grid:
+            self.food_grid.insert(food, food.x, food.y, food.id)  # Same order as iterating the registry
+        if self.events is not None:
+            self.events.food_added(food)
+
+    def take_food(self, food):
+        """Remove a food item if still present; return True on success."""
+        if not self.food_items.claim(food):
+            return False
+        if self.use_grid:
+            self.food_grid.remove(food)
+        return True
+
+    def place_ant(self, ant):
+        """Index a newly spawned ant; ants are ordered like all_ants()."""
+        ant.order = (ant.colony.index, self.ants_spawned)
+        self.ants_spawned += 1
+        if self.use_grid:
+            self.vision_grid.insert(ant, ant.x, ant.y, ant.order)
+            self.contact_grid.insert(ant, ant.x, ant.y, ant.order)
+
+    def move_ant(self, ant):
+        """Update the spatial index after an ant moved."""
+        if self.use_grid:
+            self.vision_grid.move(ant, ant.x, ant.y)
+            self.contact_grid.move(ant, ant.x, ant.y)
+
+    def unplace_ant(self, ant):
+        """Drop a dead ant from the spatial index."""
+        if self.use_grid:
+            self.vision_grid.remove(ant)
+            self.contact_grid.remove(ant)
+
+    def food_near(self, x, y):
+        """Food items that may lie within the vision radius of (x, y)."""
+        if self.use_grid:
+            return self.food_grid.query(x, y, self.config.vision_radius)
+        return self.food_items
+
+    def ants_near(self, x, y, radius):
+        """Ants that may lie within `radius` of (x, y).
+
+        The grid returns them by colony, then spawn order; brute force returns
+        all_ants(), whose order deaths change by swapping the last ant of a
+        colony into the dead one's place. The two orders agree only until
+        the first death.
+        """
+        if not self.use_grid:
+            return self.all_ants()
+        grid = self.contact_grid if radius <= self.contact_grid.cell_size else self.vision_grid
+        return grid.query(x, y, radius)
+
     def register_death(self):
         """Increment the death counter."""
         self.death_count += 1
 
+    def advance(self):
+        """Move every ant, refresh colonies and tick."""
+        if self.profiler is not None:
+            self.advance_profiled()
+            return
+        if self.events is not None:
+            self.events.advance()
+        else:
+            for ant in list(self.all_ants()):  # Use list to avoid modification issues
+                ant.move()
+                ant.look_for_targets()
+                ant.check_collisions()
+        for colony in self.colonies:
+            colony.refresh()
+        self.tick()
+
+    def advance_profiled(self):
+        """advance(), timing each phase and counting neighbor checks and events into the profiler."""
+        times, counts = self.profiler.times, self.profiler.counts
+        clock = time.perf_counter
+        food_near, ants_near = self.food_near, self.ants_near
+        take_food, register_death, place_ant = self.take_food, self.register_death, self.place_ant
+        contact = self.config.ant_radius * 2
+
+        def counted(items, name):
+            for item in items:
+                counts[name] += 1
+                yield item
+
+        def counted_food_near(x, y):
+            return counted(food_near(x, y), 'vision_candidates')
+
+        def counted_ants_near(x, y, radius):
+            return counted(ants_near(x, y, radius), 'collision_checks' if radius <= contact else 'vision_candidates')
+
+        def counted_take_food(food):
+            taken = take_food(food)
+            counts['pickups'] += taken
+            return taken
+
+        def counted_register_death():
+            counts['deaths'] += 1
+            register_death()
+
+        def counted_place_ant(ant):
+            counts['spawns'] += 1
+            place_ant(ant)
+
+        # Shadow the methods on this instance for one step only, so the normal path stays untouched
+        self.food_near, self.ants_near = counted_food_near, counted_ants_near
+        self.take_food, self.register_death, self.place_ant = counted_take_food, counted_register_death, counted_place_ant
+        def act(ant):
+            start = clock()
+            ant.move()
+            moved = clock()
+            ant.look_for_targets()
+            looked = clock()
+            ant.check_collisions()
+            times['move'] += moved - start
+            times['look'] += looked - moved
+            times['collide'] += clock() - looked
+
+        try:
+            if self.events is not None:
+                self.events.advance(act)
+            else:
+                for ant in list(self.all_ants()):
+                    act(ant)
+            start = clock()
+            for colony in self.colonies:
+                colony.refresh()
+            times['refresh'] += clock() - start
+        finally:
+            for name in ('food_near', 'ants_near', 'take_food', 'register_death', 'place_ant'):
+                del self.__dict__[name]
+        self.tick()
+
     def tick(self):
-        """Advance the simulation step and record stats."""
-        self.death_count_stats.append(self.death_count)
+        """Advance the simulation step."""
         self.step += 1
 
+    def colony_status(self):
+        """Return (alive flags, food preferences) per colony."""
+        return [c.is_alive for c in self.colonies], [c.food_preference for c in self.colonies]
+
+    def colony_populations(self):
+        """Number of live ants per colony."""
+        return [c.population for c in self.colonies]
+
+    def food_count(self):
+        """Number of food items on the ground."""
+        return len(self.food_items)
+
+def exit_step(p0, d, after, size):
+    """First step k after `after` at which p0 + k * d is outside (0, size), or math.inf."""
+    def out(k):
+        p = p0 + k * d
+        return p <= 0 or p >= size
+
+    if out(after + 1):
+        return after + 1
+    if d == 0:
+        return math.inf
+    k = max(after + 2, math.ceil(((size if d > 0 else 0) - p0) / d))  # Rounding may put the wall a step either side
+    while k > after + 2 and out(k - 1):
+        k -= 1
+    while not out(k):
+        k += 1
+    return k
+
+
 class Ant:
+    # No per-ant __dict__: a million ants is a million of these
+    __slots__ = ('colony', 'board', 'x', 'y', 'angle', 'has_food', 'food_color', 'food_preference', 'target_food',
+                 'target_ant', 'life', 'is_alive', 'index', 'order', 'sleep_until', 'sleep_from', 'retry_at',
+                 'event_slot', 'leg', 'leg_step')
+
     def __init__(self, colony, food_preference=0.5):
         self.colony = colony
+        self.board = colony.board
         self.x, self.y = colony.pos
-        self.angle = random.uniform(0, 2 * math.pi)
+        self.angle = self.board.rng.angle()
         self.has_food = False
         self.food_color = None
         self.food_preference = max(0.0, min(1.0, food_preference))  # Clamp to [0,1]
         self.target_food = None
         self.target_ant = None
-        self.life = INITIAL_LIFE
+        self.life = self.board.config.initial_life
         self.is_alive = True
+        self.index = None  # Position in colony.ants, set by Colony.spawn_ant
+        self.sleep_until = 0  # With --events: first step the ant acts again
+        self.sleep_from = None  # With --events while asleep: step its position is current for
+        self.retry_at = 0  # With --events: first step it may try to sleep again
+        self.event_slot = -1  # With --events: position in the stepping order of the latest step
+        self.leg = None  # (heading, x0, y0, dx, dy, steps) of the straight stretch it walks; see aim()
+        self.leg_step = 0  # Steps taken along it
+        self.board.place_ant(self)
 
     def move(self):
         """Handle ant movement based on state."""
         if not self.is_alive:
             return
 
+        board = self.board
+        cfg = board.config
+        speed = cfg.ant_speed
         if self.has_food:
             # Move back to colony at half speed
-            dx = self.colony.pos[0] - self.x
-            dy = self.colony.pos[1] - self.y
-            dist = math.hypot(dx, dy)
+            dist = math.hypot(self.colony.pos[0] - self.x, self.colony.pos[1] - self.y)
             if dist < 3:  # Close enough to drop food
                 self.has_food = False
                 self.food_color = None
-                self.angle = random.uniform(0, 2 * math.pi)
-                add_food()  # Respawn food randomly
-                self.colony.spawn_ant(self.food_preference + random.uniform(-LEARNING_RATE, LEARNING_RATE))
+                self.angle = board.rng.angle()
+                board.add_food()  # Respawn food randomly
+                self.colony.spawn_ant(self.food_preference + board.rng.uniform(-cfg.learning_rate, cfg.learning_rate))
             elif dist > 0:
-                self.x += (ANT_SPEED / 2) * (dx / dist)
-                self.y += (ANT_SPEED / 2) * (dy / dist)
+                self.walk()
         else:
             if self.target_food:
                 # Move to target food
-                dx = self.target_food.x - self.x  # Use .x, .y since Food is namedtuple
-                dy = self.target_food.y - self.y
-                dist = math.hypot(dx, dy)
-                if dist <= ANT_SPEED:
+                dist = math.hypot(self.target_food.x - self.x, self.target_food.y - self.y)
+                if dist <= speed:
                     # Pick up food if still available
-                    if self.target_food in board.food_items:
-                        board.food_items.remove(self.target_food)
+                    if board.take_food(self.target_food):
                         self.has_food = True
                         self.food_color = self.target_food.color
                     self.target_food = None
                 else:
-                    self.x += ANT_SPEED * (dx / dist)
-                    self.y += ANT_SPEED * (dy / dist)
+                    self.walk()
             elif self.target_ant:
                 # Move to target ant
                 if not self.target_ant.is_alive or not self.target_ant.has_food:
@@ -203,42 +534,104 @@ class Ant:
                 dx = self.target_ant.x - self.x
                 dy = self.target_ant.y - self.y
                 dist = math.hypot(dx, dy)
-                if dist > ANT_SPEED:
-                    self.x += ANT_SPEED * (dx / dist)
-                    self.y += ANT_SPEED * (dy / dist)
+                if dist > speed:
+                    self.x += speed * (dx / dist)
+                    self.y += speed * (dy / dist)
+                    self.leg = None  # Off any straight leg
             else:
                 # Random walk
-                self.x += ANT_SPEED * math.cos(self.angle)
-                self.y += ANT_SPEED * math.sin(self.angle)
+                self.walk()
+
+        self.bounce()
+        board.move_ant(self)
+
+    def aim(self):
+        """The straight leg the ant walks now, starting a new one where it is if its heading changed.
 
-        # Wall bouncing
-        if self.x <= 0 or self.x >= WIDTH:
+        A leg is (heading, x0, y0, dx, dy, steps): after k steps along it the
+        ant stands at (x0 + k * dx, y0 + k * dy). The heading is the nest or
+        food item walked to, for `steps` steps before re-aiming, or the
+        angle of a random walk, which runs until a wall turns it.
+        """
+        leg = self.leg
+        if self.has_food or self.target_food:
+            target = self.colony if self.has_food else self.target_food
+            if leg is not None and leg[0] is target and self.leg_step < leg[5]:
+                return leg
+            stride = self.board.config.ant_speed / (2 if self.has_food else 1)
+            tx, ty = target.pos if self.has_food else (target.x, target.y)
+            dx, dy = tx - self.x, ty - self.y
+            dist = math.hypot(dx, dy)
+            leg = (target, self.x, self.y, stride * (dx / dist), stride * (dy / dist), int(dist // stride))
+        elif leg is not None and leg[0] == self.angle:
+            return leg
+        else:
+            speed = self.board.config.ant_speed
+            leg = (self.angle, self.x, self.y, speed * math.cos(self.angle), speed * math.sin(self.angle), math.inf)
+        self.leg = leg
+        self.leg_step = 0
+        return leg
+
+    def walk(self):
+        """Take one step along the current leg."""
+        _, x0, y0, dx, dy, _ = self.aim()
+        self.leg_step += 1
+        self.x = x0 + self.leg_step * dx
+        self.y = y0 + self.leg_step * dy
+
+    def bounce(self):
+        """Turn away from and clamp to a wall the ant has reached."""
+        cfg = self.board.config
+        if self.x <= 0 or self.x >= cfg.width:
             self.angle = math.pi - self.angle
-            self.x = max(0, min(WIDTH, self.x))  # Clamp position
-        if self.y <= 0 or self.y >= HEIGHT:
+            self.x = max(0, min(cfg.width, self.x))  # Clamp position
+        if self.y <= 0 or self.y >= cfg.height:
             self.angle = -self.angle
-            self.y = max(0, min(HEIGHT, self.y))  # Clamp position
+            self.y = max(0, min(cfg.height, self.y))  # Clamp position
+
+    def skip(self, steps):
+        """Take `steps` moves at once, as move() would, for an ant that neither arrives nor changes target.
+
+        Positions come from the leg formula itself, so they are exactly the
+        ones stepping would give; wall hits are solved for per leg.
+        """
+        cfg = self.board.config
+        while steps > 0:
+            _, x0, y0, dx, dy, end = self.aim()
+            start = self.leg_step
+            hit = min(exit_step(x0, dx, start, cfg.width), exit_step(y0, dy, start, cfg.height))
+            taken = min(steps, max(start + 1, end) - start, hit - start)
+            self.leg_step = start + taken
+            self.x = x0 + self.leg_step * dx
+            self.y = y0 + self.leg_step * dy
+            self.bounce()
+            steps -= taken
+        self.board.move_ant(self)
 
     def look_for_targets(self):
         """Search for food or enemy ants with desirable food."""
         if not self.is_alive or self.has_food or self.target_food or self.target_ant:
             return
 
+        board = self.board
+        vision_radius = board.config.vision_radius
+        rng = board.rng
+
         # Probabilistic choice of desired color
         def desired_color():
-            return random.choices([COLOR_GREEN, COLOR_ORANGE], weights=[self.food_preference, 1 - self.food_preference], k=1)[0]
+            return rng.binary(self.food_preference, COLOR_GREEN, COLOR_ORANGE)
 
         # Look for food
-        for food in board.food_items:
-            if math.hypot(self.x - food.x, self.y - food.y) < VISION_RADIUS and food.color == desired_color():
+        for food in board.food_near(self.x, self.y):
+            if math.hypot(self.x - food.x, self.y - food.y) < vision_radius and food.color == desired_color():
                 self.target_food = food
                 break
 
         # If no food, look for enemy ants with food
         if not self.target_food:
-            for ant in all_ants():
-                if ant != self and ant.is_alive and ant.has_food and ant.colony.color != self.colony.color:
-                    if math.hypot(self.x - ant.x, self.y - ant.y) < VISION_RADIUS and ant.food_color == desired_color():
+            for ant in board.ants_near(self.x, self.y, vision_radius):
+                if ant != self and ant.is_alive and ant.has_food and ant.colony is not self.colony:
+                    if math.hypot(self.x - ant.x, self.y - ant.y) < vision_radius and ant.food_color == desired_color():
                         self.target_ant = ant
                         break
 
@@ -247,11 +640,12 @@ class Ant:
         if not self.is_alive or not self.has_food:
             return
 
-        for ant in all_ants():
-            if ant == self or not ant.is_alive or ant.colony.color == self.colony.color:
+        contact = self.board.config.ant_radius * 2
+        for ant in self.board.ants_near(self.x, self.y, contact):
+            if ant == self or not ant.is_alive or ant.colony is self.colony:
                 continue
             dist = math.hypot(self.x - ant.x, self.y - ant.y)
-            if dist < ANT_RADIUS * 2:
+            if dist < contact:
                 self.life -= 1
                 ant.life -= 1
                 if self.life <= 0:
@@ -263,155 +657,664 @@ class Ant:
         """Handle ant death: drop food and register."""
         self.is_alive = False
         if self.has_food:
-            add_food(self.x, self.y, self.food_color)
+            self.board.add_food(self.x, self.y, self.food_color)
             self.has_food = False
             self.food_color = None
-        board.register_death()
+        self.board.register_death()
+        self.board.unplace_ant(self)
         self.colony.remove_ant(self)
 
+def wanted_state(preferences, alive=None):
+    """Check if colonies have diverged in preferences.
+
+    Every living colony must be committed to one food color (preference above
+    0.95 or below 0.05), with at least one colony on each color; for two
+    colonies that is one near 1 and the other near 0. Also works elementwise
+    when each entry is an array of per-replica values.
+    """
+    if len(preferences) < 2:
+        return False
+    if len(preferences) == 2:  # Two-colony runs end at the first extinction, so both are alive here
+        pref_a, pref_b = preferences[0], preferences[1]
+        return ((pref_a > 0.95) & (pref_b < 0.05)) | ((pref_a < 0.05) & (pref_b > 0.95))
+    prefs = np.asarray(preferences, dtype=np.float64)
+    live = np.ones(prefs.shape, dtype=bool) if alive is None else np.asarray(alive, dtype=bool)
+    high = live & (prefs > 0.95)
+    low = live & (prefs < 0.05)
+    undecided = live & ~high & ~low
+    diverged = high.any(axis=0) & low.any(axis=0) & ~undecided.any(axis=0)
+    return diverged if diverged.ndim else bool(diverged)
+
+
+def run_outcome(alive, divergent, at_step_limit):
+    """Outcome code of a run that ended normally; fewer than two surviving colonies is an extinction."""
+    if sum(alive) < 2:
+        return 'extinction'
+    if divergent:
+        return 'divergence'
+    return 'timeout' if at_step_limit else ''
+
+
+def colony_positions(cfg):
+    """Colony centers: the configured ones, A and B for two colonies, else a grid spread over the world."""
+    n = cfg.num_colonies
+    if n < 2:
+        raise ValueError(f"A run needs at least two colonies, got {n}")
+    if cfg.colony_positions:
+        if len(cfg.colony_positions) != n:
+            raise ValueError(f"{len(cfg.colony_positions)} colony positions given for {n} colonies")
+        return [tuple(pos) for pos in cfg.colony_positions]
+    if n == 2:
+        return [cfg.colony_a_pos, cfg.colony_b_pos]
+    cols = max(1, math.ceil(math.sqrt(n * cfg.width / cfg.height)))
+    rows = math.ceil(n / cols)
+    return [(int((i % cols + 0.5) * cfg.width / cols), int((i // cols + 0.5) * cfg.height / rows))
+            for i in range(n)]
+
+
+def colony_layout(cfg):
+    """((x, y), capacity) per colony; ants are split evenly, earlier colonies taking the remainder."""
+    n = cfg.num_colonies
+    return [(pos, cfg.num_ants // n + (i < cfg.num_ants % n)) for i, pos in enumerate(colony_positions(cfg))]
+
+
+def food_for_density(density, width, height):
+    """Number of food items giving `density` items per FOOD_DENSITY_AREA square pixels."""
+    return max(1, round(density * width * height / FOOD_DENSITY_AREA))
+
+
+class PlateauDetector:
+    """Spots runs whose colony preferences and populations have stopped drifting.
+
+    Per-colony means are taken over windows of `window` steps. A run is stuck
+    once the last `windows` + 1 window means of every colony's preference lie
+    within `tolerance` of each other and their populations within
+    `population_tolerance` of their mean.
+    """
+
+    def __init__(self, window, windows=5, tolerance=0.05, population_tolerance=0.1):
+        self.window = window
+        self.windows = windows
+        self.tolerance = tolerance
+        self.population_tolerance = population_tolerance
+        self.history = collections.deque(maxlen=windows + 1)  # (preference means, population means)
+        self.preference_sum = None
+        self.population_sum = None
+        self.count = 0
+
+    def update(self, preferences, populations):
+        """Add one step; return True once the run has plateaued."""
+        if self.preference_sum is None:
+            self.preference_sum = [0.0] * len(preferences)
+            self.population_sum = [0] * len(populations)
+        for c, p in enumerate(preferences):
+            self.preference_sum[c] += p
+        for c, n in enumerate(populations):
+            self.population_sum[c] += n
+        self.count += 1
+        if self.count < self.window:
+            return False
+        self.history.append(([s / self.count for s in self.preference_sum],
+                             [s / self.count for s in self.population_sum]))
+        self.preference_sum = [0.0] * len(preferences)
+        self.population_sum = [0] * len(populations)
+        self.count = 0
+        return len(self.history) == self.history.maxlen and self.stuck()
+
+    def stuck(self):
+        """True if no colony drifted beyond tolerance across the kept windows."""
+        for c in range(len(self.history[0][0])):
+            preferences = [means[0][c] for means in self.history]
+            if max(preferences) - min(preferences) > self.tolerance:
+                return False
+            populations = [means[1][c] for means in self.history]
+            scale = max(1.0, sum(populations) / len(populations))
+            if max(populations) - min(populations) > self.population_tolerance * scale:
+                return False
+        return True
+
+
+class Simulation:
+    """A single re-entrant simulation run.
+
+    All run state lives on the instance, so any number of simulations can be
+    created and run back-to-back (or interleaved) in one process.
+    """
+
+    def __init__(self, config=None, snapshot=None):
+        if snapshot is not None:
+            config = snapshot['config']
+        self.config = cfg = config if config is not None else SimulationConfig()
+        self.use_display = cfg.output_mode == 'display'
+        self.use_files = cfg.output_mode == 'files'
+
+        # Pygame is only loaded by runs that render; dummy runs stay pure computation
+        self.renderer = None
+        self.screen = None
+        if self.use_display or self.use_files:
+            from render import Renderer
+            self.renderer = Renderer(cfg.width, cfg.height, display=self.use_display)
+            self.screen = self.renderer.screen
+        self.frame_writer = None
+        if self.use_files:
+            self.frame_writer = FrameWriter(cfg.frames_dir, cfg.width, cfg.height, cfg.frame_format,
+                                            cfg.frame_workers, cfg.frame_queue, cfg.frame_backpressure,
+                                            cfg.video_file)
+
+        self.max_steps = cfg.max_steps
+        self.frame_idx = 0
+        self.start_time = None
+        self.elapsed_before = 0.0  # Run time spent before the checkpoint this run resumed from
+        self.result = None
+        self.closed = False
+        self.stop_requested = False
+        self.telemetry = None
+        self.plateau = None
+        self.plateau_step = None
+        self.profiler = Profiler(cfg.profile_window) if cfg.profile else None
+        self.live = None  # LivePublisher, started on the first step
+
+        if snapshot is not None:
+            self.board, self.engine = snapshot['board'], snapshot['engine']
+            self.telemetry = snapshot['telemetry']
+            self.max_steps = snapshot['max_steps']
+            self.frame_idx = snapshot['frame_idx']
+            self.elapsed_before = snapshot['elapsed']
+            self.plateau, self.plateau_step = snapshot.get('plateau', (None, None))
+            if cfg.plateau_window and self.plateau is None:
+                self.plateau = self.new_plateau_detector()
+            self.world = self.engine if self.engine is not None else self.board
+            self.world.profiler = self.profiler
+            if cfg.stats and self.telemetry is None:
+                self.telemetry = TelemetryRecorder(len(self.board.colonies), cfg.stats_interval,
+                                                   cfg.stats_capacity, cfg.stats_mode)
+            return
+
+        self.board = Board(cfg, use_grid=cfg.neighbor_search == 'grid')
+        for index, (pos, capacity) in enumerate(colony_layout(cfg)):
+            self.board.spawn_colony(pos, colony_color(index), capacity)
+        self.engine = None
+        if cfg.engine in ('numpy', 'tiled'):
+            engine_class, extra = NumpyEngine, {}
+            if cfg.engine == 'tiled':
+                from engine_tiled import TiledEngine  # Pulls in multiprocessing only when used
+                engine_class, extra = TiledEngine, {'tiles': cfg.tiles}
+            self.engine = engine_class(cfg.width, cfg.height,
+                                       [(colony.pos, colony.capacity) for colony in self.board.colonies],
+                                       cfg.num_food, ant_radius=cfg.ant_radius, vision_radius=cfg.vision_radius,
+                                       ant_speed=cfg.ant_speed, initial_life=cfg.initial_life,
+                                       learning_rate=cfg.learning_rate, seed=cfg.seed, **extra)
+        else:
+            self.board.populate()
+        self.world = self.engine if self.engine is not None else self.board
+        self.world.profiler = self.profiler
+        if cfg.plateau_window:
+            self.plateau = self.new_plateau_detector()
+        if cfg.stats:
+            self.telemetry = TelemetryRecorder(len(self.board.colonies), cfg.stats_interval,
+                                               cfg.stats_capacity, cfg.stats_mode)
+
+    @classmethod
+    def resume(cls, path, seed=None, overrides=None, variant=None):
+        """Continue a run from a checkpoint file.
+
+        With no seed or overrides the run carries on exactly as the original
+        would have; a new `seed` switches to a fresh random stream and
+        `overrides` ({field: value}) changes parameters from here on. A fork
+        `variant` number is appended to the run's output file names.
+        """
+        state = checkpoint.load(path)
+        overrides = overrides or {}
+        checkpoint.apply_overrides(state['config'], overrides, state['engine'])
+        if variant is not None:
+            checkpoint.rename_outputs(state['config'], variant)
+        if 'max_steps' in overrides:
+            state['max_steps'] = overrides['max_steps']
+        simulation = cls(snapshot=state)
+        if seed is not None:
+            simulation.config.seed = seed
+            if simulation.engine is not None:
+                simulation.engine.reseed([seed])
+            else:
+                simulation.board.reseed(seed)
+        return simulation
+
+    def new_plateau_detector(self):
+        cfg = self.config
+        return PlateauDetector(cfg.plateau_window, cfg.plateau_windows, cfg.plateau_tolerance,
+                               cfg.plateau_population_tolerance)
+
+    @property
+    def current_step(self):
+        """Number of completed steps."""
+        return self.world.step
+
+    @property
+    def elapsed(self):
+        """Run time so far, including time before a resumed checkpoint."""
+        if self.start_time is None:
+            return self.elapsed_before
+        return self.elapsed_before + time.perf_counter() - self.start_time
+
+    def snapshot(self):
+        """Everything needed to continue this run, as a picklable dict."""
+        return {
+            'config': self.config,
+            'board': self.board,
+            'engine': self.engine,
+            'telemetry': self.telemetry,
+            'max_steps': self.max_steps,
+            'frame_idx': self.frame_idx,
+            'elapsed': self.elapsed,
+            'plateau': (self.plateau, self.plateau_step),
+        }
+
+    def save_checkpoint(self, path=None):
+        """Write a snapshot of the run to `path` (default: the configured checkpoint file)."""
+        path = path or self.config.checkpoint_file
+        checkpoint.save(self.snapshot(), path)
+        return path
+
+    def request_stop(self):
+        """Ask the run to checkpoint and stop before its next step (safe from a signal handler)."""
+        self.stop_requested = True
+
+    def timed(self, phase):
+        """Context timing `phase` of the step when profiling, else a no-op."""
+        if self.profiler is None:
+            return NO_PROFILE
+        return self.profiler.phase(phase)
+
     def draw(self):
-        """Draw the ant, health bar, and carried food."""
-        if not self.is_alive:
+        """Render the current world onto the screen surface."""
+        if self.board.events is not None:
+            self.board.events.settle()
+        self.renderer.draw(self.config, self.board, self.engine)
+
+    def step(self):
+        """Advance one step; return False once the run has ended."""
+        if self.result is not None or self.closed:
+            return False
+        if self.stop_requested:
+            path = self.save_checkpoint()
+            print(f"Stopped at step {self.world.step}; checkpoint saved to {path}")
+            self.close()
+            return False
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+            if self.profiler is not None:
+                self.profiler.start()
+            if self.config.live:
+                from live import LivePublisher  # Pulls in the HTTP server only when used
+                self.live = LivePublisher(self.config.live, len(self.board.colonies), self.config.live_capacity,
+                                          self.world.step)
+                print(f"Live metrics at {self.live.address} (/metrics, /stream)")
+        cfg = self.config
+
+        frame_step = self.world.step
+        self.world.advance()
+
+        # Render only when the frame is shown or saved
+        save_frame = self.use_files and frame_step % cfg.frame_interval == 0
+        if self.use_display or save_frame:
+            with self.timed('draw'):
+                self.draw()
+
+        # Hand the frame to the background writer if in 'files' mode
+        if save_frame:
+            with self.timed('frames'):
+                pixels = self.renderer.pixels()
+                queued = self.frame_writer.submit(f"frame_{self.frame_idx:06d}.png", pixels)
+            print(f"{'Queued' if queued else 'Dropped'} frame {self.frame_idx:06d} at step {frame_step} "
+                  f"({self.frame_writer.status()})")
+            self.frame_idx += 1
+
+        step = self.world.step
+        alive, preferences = self.world.colony_status()
+
+        # Record stats if enabled; extinct colonies read as preference 0
+        if self.telemetry is not None and step % self.telemetry.interval == 0:
+            with self.timed('stats'):
+                self.telemetry.record(step, [p if a else 0.0 for a, p in zip(alive, preferences)],
+                                      self.world.colony_populations(), self.world.death_count,
+                                      self.world.food_count())
+
+        if self.live is not None and step % cfg.live_interval == 0:
+            self.publish_live()
+
+        if self.plateau is not None and self.plateau_step is None:
+            if self.plateau.update(preferences, self.world.colony_populations()):
+                self.plateau_step = step
+
+        if self.profiler is not None:
+            self.profiler.end_step(step)
+
+        divergence = cfg.stop_on_divergence and wanted_state(preferences, alive)
+        if step >= self.max_steps or divergence or sum(alive) < 2:
+            self.finish(run_outcome(alive, divergence, step >= self.max_steps))
+            return False
+        if self.plateau_step is not None and not cfg.plateau_record_only:
+            self.finish('plateau')
+            return False
+        if cfg.checkpoint_interval and step % cfg.checkpoint_interval == 0:
+            with self.timed('checkpoint'):
+                self.save_checkpoint()
+
+        # Handle events if in 'display' mode
+        if self.use_display and not self.renderer.show():
+            self.close()
+            return False
+        return True
+
+    def publish_live(self):
+        """Add the current state to the live metrics."""
+        alive, preferences = self.world.colony_status()
+        with self.timed('stats'):
+            self.live.publish(self.world.step, [p if a else 0.0 for a, p in zip(alive, preferences)],
+                              self.world.colony_populations(), self.world.death_count, self.world.food_count())
+
+    def run(self, max_steps=None):
+        """Step until an end condition and return the result.
+
+        `max_steps` overrides the configured step limit. Returns None if the
+        display window was closed before the run ended.
+        """
+        if max_steps is not None:
+            self.max_steps = max_steps
+        while self.step():
+            pass
+        return self.result
+
+    def finish(self, outcome=''):
+        """Record the result of an ended run and release its outputs."""
+        alive, preferences = self.world.colony_status()
+        self.result = SimulationResult(
+            num_ants=self.config.num_ants,
+            num_food=self.config.num_food,
+            steps=self.world.step,
+            colony_a_alive=bool(alive[0]),
+            colony_b_alive=bool(alive[1]),
+            colony_a_preference=float(preferences[0]),
+            colony_b_preference=float(preferences[1]),
+            death_count=int(self.world.death_count),
+            elapsed=self.elapsed,
+            seed=self.config.seed,
+            outcome=outcome,
+            plateau_step=self.plateau_step,
+            num_colonies=len(alive),
+            colonies_alive=tuple(bool(a) for a in alive),
+            colony_preferences=tuple(float(p) for p in preferences),
+        )
+        # Save final frame if in 'files' mode
+        if self.use_files:
+            self.draw()
+            self.frame_writer.write_png("final_frame.png", self.renderer.pixels())
+        self.close()
+
+    def close(self):
+        """Flush frames, write the stats file and close the display window, if any."""
+        if self.closed:
             return
-        pygame.draw.circle(screen, self.colony.color, (int(self.x), int(self.y)), ANT_RADIUS)
-        # Health bar
-        health_width = ANT_RADIUS * 4 * (self.life / INITIAL_LIFE)
-        pygame.draw.rect(screen, self.colony.color, (int(self.x) - 2 * ANT_RADIUS, int(self.y) - 2 * ANT_RADIUS, health_width, 3))
-        if self.has_food:
-            food_offset_x = self.x + math.cos(self.angle) * 10
-            food_offset_y = self.y + math.sin(self.angle) * 10
-            pygame.draw.circle(screen, self.food_color, (int(food_offset_x), int(food_offset_y)), FOOD_RADIUS)
-
-def add_food(x=None, y=None, color=None):
-    """Add a new food item at random or specified position."""
-    if color is None:
-        color = random.choice([COLOR_GREEN, COLOR_ORANGE])
-    if x is None:
-        x = random.randint(0, WIDTH)
-    if y is None:
-        y = random.randint(0, HEIGHT)
-    board.food_items.append(Food(x, y, color))
-
-def all_ants():
-    """Generator for all ants across colonies."""
-    for colony in board.colonies:
-        for ant in colony.ants:
-            yield ant
-
-def wanted_state():
-    """Check if colonies have diverged in preferences."""
-    if len(board.colonies) < 2:
-        return False
-    pref_a, pref_b = board.colonies[0].food_preference, board.colonies[1].food_preference
-    return (pref_a > 0.95 and pref_b < 0.05) or (pref_a < 0.05 and pref_b > 0.95)
-
-# Initialize board
-board = Board()
-colony_a = board.spawn_colony(COLONY_A_POS, COLOR_RED, NUM_ANTS // 2 + NUM_ANTS % 2)  # Even split
-colony_b = board.spawn_colony(COLONY_B_POS, COLOR_BLACK, NUM_ANTS // 2)
-
-# Spawn initial ants
-for colony in board.colonies:
-    for _ in range(colony.capacity):
-        colony.spawn_ant()
-
-# Spawn initial food
-for _ in range(NUM_FOOD):
-    add_food()
-
-# Remove stats.txt if stats is enabled, to avoid appending to an old file
-stats_file_handler = None
-if getattr(args, 'stats', False):
-    stats_file_handler = open('stats.txt', 'w')
-
-# Main simulation loop
-running = True
-frame_idx = 0
-while running:
-    screen.fill(COLOR_WHITE)
-
-    # Draw colonies
-    for colony in board.colonies:
-        colony.draw()
-
-    # Draw food
-    for food in board.food_items:
-        pygame.draw.circle(screen, food.color, (food.x, food.y), FOOD_RADIUS)
-
-    # Update ants
-    for ant in list(all_ants()):  # Use list to avoid modification issues
-        ant.move()
-        ant.look_for_targets()
-        ant.check_collisions()
-        ant.draw()
-
-    # Refresh colonies
-    for colony in board.colonies:
-        colony.refresh()
-
-    # Save frame if in 'files' mode
-    if use_files and board.step % FRAME_INTERVAL == 0:
-        os.makedirs('frames', exist_ok=True)
-        pygame.image.save(screen, f"frames/frame_{frame_idx:06d}.png")
-        print(f"Saved frame {frame_idx:06d} at step {board.step}")
-        frame_idx += 1
-
-    # Tick and check end conditions
-    board.tick()
-    
-    # Save stats if enabled
-    if stats_file_handler and board.step % FRAME_INTERVAL == 0:
-        colony_0_pref = board.colonies[0].food_preference if board.colonies[0].is_alive else 0.0
-        colony_1_pref = board.colonies[1].food_preference if board.colonies[1].is_alive else 0.0
-        stats_file_handler.write(f"{board.step},{colony_0_pref:.6f},{colony_1_pref:.6f}\n")
-    
-    stop_on_divergence = not getattr(args, 'no_stop_on_divergence', False)
-    divergence = stop_on_divergence and wanted_state() or False
-    if (board.step >= MAX_STEPS or (divergence and stop_on_divergence) or not board.colonies[0].is_alive or not board.colonies[1].is_alive):
+        self.closed = True
+        if self.frame_writer is not None:
+            self.frame_writer.close()
+            print(f"Frame writer: {self.frame_writer.status()}")
+        if self.telemetry is not None:
+            with self.timed('stats'):
+                self.telemetry.save(self.config.stats_file)
+        if self.live is not None:
+            if self.live.last[0] != self.world.step:
+                self.publish_live()  # The final state, off the interval
+            self.live.close()
+        if self.profiler is not None:
+            report = self.profiler.save(self.config.profile_file, self.world.step)
+            print(f"Profile: {report['steps']} steps at {report['steps_per_sec']:.1f} steps/sec, "
+                  f"report written to {self.config.profile_file}")
+        if self.renderer is not None:
+            self.renderer.close()
+        if self.engine is not None:
+            self.engine.close()
+
+
+def parse_arguments(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Ant Colonies Simulation")
+    parser.add_argument('--num_ants', type=int, default=80, help='Number of ants (default: 80)')
+    parser.add_argument('--num_food', type=int, default=20, help='Number of food items (default: 20)')
+    parser.add_argument('--output_mode', choices=['display', 'files', 'dummy'], default='dummy',
+                        help='Output mode: "display" for window, "files" for image files, or "dummy" for no output (default: dummy)')
+    parser.add_argument('--frame_format', choices=['png', 'ffmpeg', 'auto'], default='png',
+                        help='Files mode output: PNG frames, or raw frames streamed to ffmpeg as a video; '
+                             '"auto" uses ffmpeg when installed (default: png)')
+    parser.add_argument('--frame_workers', type=int, default=2, help='Background frame encoder threads (default: 2)')
+    parser.add_argument('--frame_queue', type=int, default=8,
+                        help='Frames buffered between the simulation and the encoders (default: 8)')
+    parser.add_argument('--frame_backpressure', choices=['block', 'drop'], default='block',
+                        help='When the frame queue is full, wait for it ("block") or skip the frame ("drop") (default: block)')
+    parser.add_argument('--stats', action='store_true', default=False,
+                        help='Save detailed statistics to stats.npz file (default: False)')
+    parser.add_argument('--stats_interval', type=int, default=FRAME_INTERVAL,
+                        help=f'Steps between statistics samples (default: {FRAME_INTERVAL})')
+    parser.add_argument('--stats_mode', choices=['grow', 'ring', 'decimate'], default='grow',
+                        help='When the preallocated statistics rows fill up: "grow" them, keep only the latest rows ("ring"), '
+                             'or halve the resolution of the whole run ("decimate") (default: grow)')
+    parser.add_argument('--stats_capacity', type=int, default=4096,
+                        help='Statistics rows to preallocate; the memory bound for ring and decimate modes (default: 4096)')
+    parser.add_argument('--no_stop_on_divergence', action='store_true', default=False,
+                        help='Continue simulation even if colonies diverge in food preference')
+    parser.add_argument('--num_colonies', type=int, default=2,
+                        help='Number of colonies; ants are split evenly between them (default: 2)')
+    parser.add_argument('--colony_positions', type=parse_position, nargs='+', default=None, metavar='X,Y',
+                        help='Colony centers, one per colony (default: the usual two corners for two colonies, '
+                             'else a grid spread over the world)')
+    parser.add_argument('--width', type=int, default=WIDTH, help=f'World width in pixels (default: {WIDTH})')
+    parser.add_argument('--height', type=int, default=HEIGHT, help=f'World height in pixels (default: {HEIGHT})')
+    parser.add_argument('--food_density', type=float, default=None,
+                        help='Food items per 100x100 pixel area; sets --num_food from the world size (default: off)')
+    parser.add_argument('--neighbor_search', choices=['grid', 'brute'], default='grid',
+                        help='Neighbor lookup: "grid" uses a uniform spatial index, "brute" scans every ant and food item (default: grid)')
+    parser.add_argument('--engine', choices=['reference', 'numpy', 'tiled'], default='reference',
+                        help='Simulation engine: "reference" steps Ant objects, "numpy" advances all ants as arrays, '
+                             '"tiled" splits the numpy engine\'s neighbor searches over --tiles processes (default: reference)')
+    parser.add_argument('--events', action='store_true', default=False,
+                        help='Reference engine: let ants that nothing can reach skip steps, jumping them ahead '
+                             'when they wake; results are unchanged')
+    parser.add_argument('--event_horizon', type=int, default=32,
+                        help='Longest an ant may skip with --events, in steps (default: 32)')
+    parser.add_argument('--tiles', type=int, default=0,
+                        help='Worker processes, one board tile each, for --engine tiled (default: 0, one per core)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Seed for the random number stream; runs with the same seed are identical (default: unseeded)')
+    parser.add_argument('--plateau_window', type=int, default=0,
+                        help='End runs early once preferences and populations stop drifting, judged over windows '
+                             'of this many steps (default: 0, off)')
+    parser.add_argument('--plateau_windows', type=int, default=5,
+                        help='Consecutive windows without drift before a run counts as stuck (default: 5)')
+    parser.add_argument('--plateau_tolerance', type=float, default=0.05,
+                        help='Allowed spread of window-mean colony preferences (default: 0.05)')
+    parser.add_argument('--plateau_population_tolerance', type=float, default=0.1,
+                        help='Allowed spread of window-mean colony populations, relative to their mean (default: 0.1)')
+    parser.add_argument('--plateau_record_only', action='store_true', default=False,
+                        help='Only report the step the plateau detector fires at and keep running')
+    parser.add_argument('--checkpoint_interval', type=int, default=0,
+                        help='Write a checkpoint every N steps; one is always written on SIGTERM (default: 0, off)')
+    parser.add_argument('--checkpoint_file', default='checkpoint.pkl.gz',
+                        help='Checkpoint path (default: checkpoint.pkl.gz)')
+    parser.add_argument('--resume', metavar='CHECKPOINT', default=None,
+                        help='Continue the run saved in CHECKPOINT; other run options come from the checkpoint')
+    parser.add_argument('--fork', type=int, default=0, metavar='N',
+                        help='With --resume, start N variant runs from the checkpoint; variant i uses --seed + i')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE',
+                        help='With --resume, change a parameter (e.g. learning_rate=0.05); '
+                             'with --fork, VALUE may be a comma-separated list cycled across variants')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes used to run --fork variants (default: number of cores)')
+    parser.add_argument('--profile', action='store_true', default=False,
+                        help='Time each step phase and count neighbor checks, pickups, deaths and spawns; '
+                             'prints a summary line per window and writes a JSON report at the end')
+    parser.add_argument('--profile_window', type=int, default=1000,
+                        help='Steps per profile summary line (default: 1000)')
+    parser.add_argument('--profile_file', default='profile.json',
+                        help='Where to write the final profile report (default: profile.json)')
+    parser.add_argument('--live', default='', metavar='ADDRESS',
+                        help='Serve live metrics over HTTP (JSON at /metrics, server-sent events at /stream) on '
+                             'PORT, HOST:PORT or a UNIX socket path; view with show_stats.py --live (default: off)')
+    parser.add_argument('--live_interval', type=int, default=10,
+                        help='Steps between live metrics rows (default: 10)')
+    parser.add_argument('--live_capacity', type=int, default=1024,
+                        help='Live metrics rows buffered for slow readers (default: 1024)')
+    parser.add_argument('--results_db', default=None,
+                        help='Also store the result in this SQLite database, shared safely between processes (default: off)')
+    args = parser.parse_args(argv)
+    if (args.fork or args.set) and not args.resume:
+        parser.error('--fork and --set need --resume')
+    if args.live and args.fork:
+        parser.error('--live serves a single run; it cannot be combined with --fork')
+    if args.live_interval < 1:
+        parser.error('--live_interval must be at least 1')
+    if args.events and (args.engine != 'reference' or args.neighbor_search != 'grid'):
+        parser.error('--events needs --engine reference with --neighbor_search grid')
+    if args.event_horizon < 1:
+        parser.error('--event_horizon must be at least 1')
+    if args.tiles < 0:
+        parser.error('--tiles must be 0 (one per core) or more')
+    if args.num_colonies < 2:
+        parser.error('--num_colonies must be at least 2')
+    if args.colony_positions is not None and len(args.colony_positions) != args.num_colonies:
+        parser.error('--colony_positions needs one X,Y per colony')
+    return args
+
+def parse_position(text):
+    """An 'X,Y' command-line value as a tuple of ints."""
+    try:
+        x, y = (int(v) for v in text.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected X,Y, got {text!r}")
+    return x, y
+
+def config_from_args(args):
+    """Build a SimulationConfig from parsed command-line arguments."""
+    return SimulationConfig(
+        num_ants=args.num_ants,
+        num_food=args.num_food if args.food_density is None else food_for_density(args.food_density, args.width,
+                                                                                     args.height),
+        num_colonies=args.num_colonies,
+        colony_positions=tuple(args.colony_positions) if args.colony_positions else None,
+        width=args.width,
+        height=args.height,
+        output_mode=args.output_mode,
+        frame_format=args.frame_format,
+        frame_workers=args.frame_workers,
+        frame_queue=args.frame_queue,
+        frame_backpressure=args.frame_backpressure,
+        stats=args.stats,
+        stats_interval=args.stats_interval,
+        stats_mode=args.stats_mode,
+        stats_capacity=args.stats_capacity,
+        stop_on_divergence=not args.no_stop_on_divergence,
+        neighbor_search=args.neighbor_search,
+        events=args.events,
+        event_horizon=args.event_horizon,
+        engine=args.engine,
+        tiles=args.tiles,
+        seed=args.seed,
+        checkpoint_interval=args.checkpoint_interval,
+        checkpoint_file=args.checkpoint_file,
+        plateau_window=args.plateau_window,
+        plateau_windows=args.plateau_windows,
+        plateau_tolerance=args.plateau_tolerance,
+        plateau_population_tolerance=args.plateau_population_tolerance,
+        plateau_record_only=args.plateau_record_only,
+        profile=args.profile,
+        profile_window=args.profile_window,
+        profile_file=args.profile_file,
+        live=args.live,
+        live_interval=args.live_interval,
+        live_capacity=args.live_capacity,
+    )
+
+def run_fork(task):
+    """Worker entry point: run one variant forked from a checkpoint."""
+    path, variant, seed, assignments = task
+    overrides = checkpoint.parse_overrides(SimulationConfig(), assignments, variant)
+    simulation = Simulation.resume(path, seed=seed, overrides=overrides, variant=variant)
+    simulation.config.live = ''  # Variants run side by side and would all claim the same address
+    return variant, overrides, simulation.run(), simulation.config
+
+def fork_runs(path, count, base_seed, assignments, workers):
+    """Run `count` variants of a checkpoint in a process pool; yield (variant, overrides, result, config)."""
+    import multiprocessing
+    tasks = [(path, i, None if base_seed is None else base_seed + i, assignments) for i in range(count)]
+    with multiprocessing.Pool(processes=max(1, min(workers, count))) as pool:
+        for outcome in pool.imap_unordered(run_fork, tasks):
+            yield outcome
+        pool.close()
+        pool.join()
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    if args.results_db:
+        import results_db  # Only runs that store results load sqlite3
+
+    if args.fork:
+        store = results_db.ResultStore(args.results_db, source='fork') if args.results_db else None
+        with open('results.txt', 'a') as out:
+            for variant, overrides, result, config in fork_runs(args.resume, args.fork, args.seed, args.set,
+                                                                args.workers):
+                changes = ', '.join(f"{name}={value}" for name, value in overrides.items()) or 'no changes'
+                print(f"Fork {variant} (seed {result.seed}, {changes}): ended after {result.steps} steps, "
+                      f"colonies alive {result.colonies_summary()}")
+                out.write(result.csv_line() + "\n")
+                if store is not None:
+                    store.add(result, config)
+        if store is not None:
+            store.close()
+        return
+
+    if args.resume:
+        overrides = checkpoint.parse_overrides(SimulationConfig(), args.set)
+        simulation = Simulation.resume(args.resume, seed=args.seed, overrides=overrides)
+        config = simulation.config
+        print(f"Resuming from {args.resume} at step {simulation.current_step}")
+    else:
+        config = config_from_args(args)
+        simulation = Simulation(config)
+    # Let the run finish its current step and checkpoint when asked to terminate
+    signal.signal(signal.SIGTERM, lambda signum, frame: simulation.request_stop())
+    result = simulation.run()
+    if result is not None:
+        steps_per_sec = result.steps / max(result.elapsed, 1e-9)
+        print(f'Simulation ended after {result.steps} steps in {result.elapsed:.2f}s ({steps_per_sec:.1f} steps/sec, {config.engine} engine).')
+        if simulation.board.events is not None:
+            print(f'Event stepping: {100 * simulation.board.events.skipped_share():.0f}% of ant-steps skipped.')
+        if result.outcome == 'plateau':
+            print(f'Stopped early: no drift in preferences or populations for {config.plateau_windows} windows.')
+        elif result.plateau_step is not None:
+            print(f'Plateau detector fired at step {result.plateau_step} (outcome: {result.outcome or "ended"}).')
+        if result.num_colonies > 2:
+            print(f'Colonies alive {result.colonies_summary()}, preferences: '
+                  + ' '.join(f'{p:.2f}' if a else '-' for a, p in zip(result.colonies_alive, result.colony_preferences)))
         print('Simulation ended. Exiting.')
         with open('results.txt', 'a') as out:
-            out.write(f"{NUM_ANTS},{NUM_FOOD},{board.step},{int(board.colonies[0].is_alive)},{int(board.colonies[1].is_alive)}\n")
-        
-        # Save final frame if in 'files' mode
-        if use_files:
-            pygame.image.save(screen, "frames/final_frame.png")
-        break
-
-    # Handle events if in 'display' mode
-    if use_display:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-        pygame.display.flip()
-
-# Clean up
-if stats_file_handler:
-    stats_file_handler.close()
-
-# At the end of the simulation, write parameters to last_run.env
-with open('last_run.env', 'w') as env_out:
-    env_out.write(f"NUM_ANTS={NUM_ANTS}\n")
-    env_out.write(f"NUM_FOOD={NUM_FOOD}\n")
-    env_out.write(f"OUTPUT_MODE={args.output_mode}\n")
-    env_out.write(f"STATS={'1' if args.stats else '0'}\n")
-    env_out.write(f"NO_STOP_ON_DIVERGENCE={'1' if args.no_stop_on_divergence else '0'}\n")
-    env_out.write(f"FRAME_INTERVAL={FRAME_INTERVAL}\n")
-    env_out.write(f"MAX_STEPS={MAX_STEPS}\n")
-
-pygame.quit()
-
-# Optional plotting (commented out)
-# plt.figure()
-# plt.plot(board.colonies[0].food_preference_stats, color=[c/255 for c in COLOR_RED], label='Red colony')
-# plt.plot(board.colonies[1].food_preference_stats, color=[c/255 for c in COLOR_BLACK], label='Black colony')
-# plt.xlabel('Step')
-# plt.ylabel('Food preference')
-# plt.legend()
-# plt.show()
-
-# plt.figure()
-# plt.plot(board.death_count_stats, color='gray', label='Death count')
-# plt.xlabel('Step')
-# plt.ylabel('Death count')
-# plt.legend()
-# plt.show()
\ No newline at end of file
+            out.write(result.csv_line() + "\n")
+        if args.results_db:
+            with results_db.ResultStore(args.results_db, source='colony') as store:
+                store.add(result, config)
+
+    # At the end of the simulation, write parameters to last_run.env
+    with open('last_run.env', 'w') as env_out:
+        env_out.write(f"NUM_ANTS={config.num_ants}\n")
+        env_out.write(f"NUM_FOOD={config.num_food}\n")
+        env_out.write(f"NUM_COLONIES={config.num_colonies}\n")
+        env_out.write(f"OUTPUT_MODE={config.output_mode}\n")
+        env_out.write(f"ENGINE={config.engine}\n")
+        if config.seed is not None:
+            env_out.write(f"SEED={config.seed}\n")
+        env_out.write(f"STATS={'1' if config.stats else '0'}\n")
+        env_out.write(f"NO_STOP_ON_DIVERGENCE={'0' if config.stop_on_divergence else '1'}\n")
+        env_out.write(f"FRAME_INTERVAL={config.frame_interval}\n")
+        env_out.write(f"MAX_STEPS={config.max_steps}\n")
+
+
+if __name__ == '__main__':
+    main()
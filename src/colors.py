@@ -0,0 +1,15 @@
+"""RGB colors shared by the simulation and its renderer."""
+
+COLOR_WHITE = (255, 255, 255)
+COLOR_BLACK = (0, 0, 0)
+COLOR_RED = (255, 0, 0)
+COLOR_GREEN = (0, 255, 0)
+COLOR_ORANGE = (254, 183, 42)
+
+# Colony colors in spawn order, reused cyclically beyond the last; red and black are the two-colony game
+COLONY_COLORS = (COLOR_RED, COLOR_BLACK, (40, 90, 220), (150, 50, 190), (0, 150, 160), (130, 80, 40),
+                 (220, 60, 150), (110, 110, 110))
+
+
+def colony_color(index):
+    return COLONY_COLORS[index % len(COLONY_COLORS)]
@@ -0,0 +1,99 @@
+"""
+Downsampling of long time series for plotting.
+
+minmax keeps, for every x bucket, the first and last sample and the samples
+holding each series' minimum and maximum (the M4 scheme). With one bucket
+per pixel column, a line drawn through those samples covers exactly the same
+pixels as one drawn through every sample. MinMaxDownsampler does this
+incrementally, chunk by chunk, so a series never has to fit in memory.
+
+lttb (Largest-Triangle-Three-Buckets) picks a fixed number of samples that
+preserve the visual shape of a single in-memory series.
+"""
+
+import numpy as np
+
+
+class MinMaxDownsampler:
+    """Streaming M4 reduction of rows (x, y_0, ..., y_k) sorted by x into `buckets` x buckets."""
+
+    def __init__(self, x_start, x_end, buckets):
+        self.x_start = x_start
+        self.span = max(1, x_end - x_start + 1)
+        self.buckets = max(1, buckets)
+        self.rows = None  # (buckets, slots, 1 + k): first, last, then min and max of each series
+        self.filled = np.zeros(self.buckets, dtype=bool)
+        self.count = 0
+
+    def add(self, x, *ys):
+        """Fold one chunk of rows into the per-bucket extremes."""
+        x = np.asarray(x)
+        if len(x) == 0:
+            return
+        values = np.column_stack([x] + [np.asarray(y, dtype=np.float64) for y in ys])
+        if self.rows is None:
+            self.rows = np.zeros((self.buckets, 2 + 2 * len(ys), values.shape[1]))
+        self.count += len(x)
+
+        bucket = np.clip((x - self.x_start) * self.buckets // self.span, 0, self.buckets - 1)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        segment = np.cumsum(np.r_[True, bucket[1:] != bucket[:-1]]) - 1
+        ids = bucket[starts]
+
+        new = ~self.filled[ids]
+        self.rows[ids[new], 0] = values[starts[new]]
+        self.rows[ids, 1] = values[np.r_[starts[1:], len(x)] - 1]
+        for k in range(len(ys)):
+            y = values[:, k + 1]
+            for slot, reduce, better in ((2 + 2 * k, np.minimum, np.less), (3 + 2 * k, np.maximum, np.greater)):
+                extreme = reduce.reduceat(y, starts)
+                hits = np.flatnonzero(y == extreme[segment])
+                _, first_hit = np.unique(segment[hits], return_index=True)
+                rows = values[hits[first_hit]]
+                replace = new | better(extreme, self.rows[ids, slot, k + 1])
+                self.rows[ids[replace], slot] = rows[replace]
+        self.filled[ids] = True
+
+    def result(self):
+        """Selected rows, sorted by x without duplicates, as an array with columns (x, y_0, ..., y_k)."""
+        if self.rows is None:
+            return np.zeros((0, 1))
+        rows = self.rows[self.filled].reshape(-1, self.rows.shape[2])
+        _, unique = np.unique(rows[:, 0], return_index=True)
+        return rows[unique]
+
+
+def minmax(x, *ys, buckets=1000):
+    """Sorted indices of the samples an M4 reduction keeps from in-memory series sharing `x` (sorted, unique)."""
+    x = np.asarray(x)
+    if len(x) == 0:
+        return np.zeros(0, dtype=np.int64)
+    sampler = MinMaxDownsampler(x[0], x[-1], buckets)
+    sampler.add(x, *ys)
+    return np.searchsorted(x, sampler.result()[:, 0])
+
+
+def lttb(x, y, n_out):
+    """Indices of `n_out` samples of (x, y) chosen by Largest-Triangle-Three-Buckets."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 buckets between the end points
+    selected = np.zeros(n_out, dtype=np.int64)
+    selected[-1] = n - 1
+    previous = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < n_out - 1:
+            next_lo, next_hi = edges[b + 1], edges[b + 2]
+            next_x, next_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        # Twice the area of the triangle (previous point, candidate, next bucket's centroid)
+        area = np.abs((x[previous] - next_x) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (next_y - y[previous]))
+        previous = lo + int(np.argmax(area))
+        selected[b + 1] = previous
+    return selected
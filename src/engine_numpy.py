@@ -0,0 +1,560 @@
+"""
+Vectorized structure-of-arrays simulation engine.
+
+Keeps every ant and food item in flat NumPy arrays and advances the whole
+world with array operations instead of stepping Ant objects one at a time.
+The rules follow Ant/Colony/Board in colony.py, with one difference inherent
+to vectorizing: all ants in a step act on the state at the start of that
+phase rather than seeing the moves of lower-indexed ants.
+
+The engine can hold several independent worlds ("replicas") at once. Slots
+are laid out world-major: world w owns a contiguous block of ant slots, and
+inside it each colony owns a block of `capacity` slots, so a spawn just
+revives a dead slot of its colony. Food is conserved (every pickup is matched
+by a later respawn or death drop), so each world has exactly `num_food` food
+slots. Neighbor queries bucket by (world, cell), so worlds never interact.
+
+Randomness is counter-based: every draw is a hash of the world's seed, the
+world's step, the draw site and the slot(s) involved. Each world therefore
+has its own stream, independent of how many other worlds share the arrays,
+and a replica reproduces a single-world run with the same seed exactly.
+"""
+
+import math
+import time
+
+import numpy as np
+
+FOOD_GREEN = 0
+FOOD_ORANGE = 1
+NO_TARGET = -1
+
+# Draw sites for the counter-based RNG
+SITE_INIT_ANGLE = 1
+SITE_SPAWN_ANGLE = 2
+SITE_INIT_FOOD = 3
+SITE_RESPAWN_FOOD = 6
+SITE_DELIVER_ANGLE = 9
+SITE_MUTATION = 10
+SITE_FOOD_CHOICE = 11
+SITE_ANT_CHOICE = 12
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def mix64(z):
+    """SplitMix64 finalizer applied elementwise to uint64 values."""
+    z = np.asarray(z, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def counter_uniform(keys, steps, site, index):
+    """Uniform [0, 1) draws keyed by (stream key, step, site, index)."""
+    with np.errstate(over='ignore'):
+        z = mix64(np.asarray(keys, dtype=np.uint64) + np.asarray(steps, dtype=np.uint64) * _GOLDEN)
+        z = mix64(z + np.uint64(site) * _GOLDEN)
+        z = mix64(z + np.asarray(index, dtype=np.uint64))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def stream_keys(seeds):
+    """Turn per-world integer seeds (None for fresh entropy) into stream keys."""
+    return np.array([np.random.SeedSequence(seed).generate_state(1, np.uint64)[0] for seed in seeds],
+                    dtype=np.uint64)
+
+
+def neighbor_pairs(qx, qy, px, py, radius, width, height, qworld=None, pworld=None):
+    """Return index pairs (i, j) with |q_i - p_j| < radius, in no particular order.
+
+    Points are bucketed into a uniform grid of cell size `radius`, one grid
+    per world; each query only examines the 3x3 block of cells around it in
+    its own world. Cells are looked up by binary search in the sorted point
+    cells, so the cost depends on the points and their local density, never
+    on how many (mostly empty) cells a large world has.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(qx) == 0 or len(px) == 0:
+        return empty, empty
+    if qworld is None:
+        qworld = np.zeros(len(qx), dtype=np.int64)
+        pworld = np.zeros(len(px), dtype=np.int64)
+    nx = int(width // radius) + 2
+    ny = int(height // radius) + 2
+    pcx = np.clip((px // radius).astype(np.int64), 0, nx - 1)
+    pcy = np.clip((py // radius).astype(np.int64), 0, ny - 1)
+    pcell = (pworld * nx + pcx) * ny + pcy
+    order = np.argsort(pcell, kind='stable')
+    sorted_cells = pcell[order]
+    qcx = np.clip((qx // radius).astype(np.int64), 0, nx - 1)
+    qcy = np.clip((qy // radius).astype(np.int64), 0, ny - 1)
+    # Visit queries in cell order so the binary searches walk the sorted cells in order
+    qidx = np.argsort((qworld * nx + qcx) * ny + qcy, kind='stable')
+    qworld, qcx, qcy = qworld[qidx], qcx[qidx], qcy[qidx]
+    # The three cells of a grid column around a query are consecutive cell ids
+    cy_lo = np.maximum(qcy - 1, 0)
+    cy_hi = np.minimum(qcy + 1, ny - 1)
+
+    qi_parts, pj_parts = [], []
+    for dx in (-1, 0, 1):
+        cx = qcx + dx
+        valid = (cx >= 0) & (cx < nx)
+        column = (qworld[valid] * nx + cx[valid]) * ny
+        lo = np.searchsorted(sorted_cells, column + cy_lo[valid], 'left')
+        counts = np.searchsorted(sorted_cells, column + cy_hi[valid], 'right') - lo
+        total = counts.sum()
+        if total == 0:
+            continue
+        # Ragged arange: offsets 0..count-1 within each query's cells
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        qi_parts.append(np.repeat(qidx[valid], counts))
+        pj_parts.append(order[np.repeat(lo, counts) + offsets])
+    if not qi_parts:
+        return empty, empty
+    qi = np.concatenate(qi_parts)
+    pj = np.concatenate(pj_parts)
+    close = (qx[qi] - px[pj]) ** 2 + (qy[qi] - py[pj]) ** 2 < radius * radius
+    return qi[close], pj[close]
+
+
+def first_per_group(groups, keys, mask):
+    """Return (group, position) of the lowest-key True entry in each group.
+
+    Equivalent to scanning each group's candidates in key order and stopping
+    at the first accepted one; only accepted entries are sorted.
+    """
+    pos = np.flatnonzero(mask)
+    pos = pos[np.lexsort((keys[pos], groups[pos]))]
+    uniq, first = np.unique(groups[pos], return_index=True)
+    return uniq, pos[first]
+
+
+def rank_within(groups):
+    """For non-decreasing `groups`, return each entry's 0-based rank in its group."""
+    if len(groups) == 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.arange(len(groups))
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    return idx - np.repeat(starts, np.diff(np.r_[starts, len(groups)]))
+
+
+class NumpyEngine:
+    profiler = None  # Set to a Profiler to time and count each step
+
+    def __init__(self, width, height, colonies, num_food, ant_radius=7, vision_radius=50,
+                 ant_speed=10, initial_life=100, learning_rate=0.1, seed=None, replicas=1, seeds=None):
+        """`colonies` is a list of ((x, y), capacity) pairs shared by every world.
+
+        World r uses `seeds[r]` if given, else `seed` for a single world, else
+        fresh entropy.
+        """
+        self.width = width
+        self.height = height
+        self.ant_radius = ant_radius
+        self.vision_radius = vision_radius
+        self.ant_speed = ant_speed
+        self.initial_life = initial_life
+        self.learning_rate = learning_rate
+        if seeds is None:
+            seeds = [seed] if replicas == 1 else [None] * replicas
+        self.replicas = len(seeds)
+        self.step = 0
+
+        # Per-world state; world_ids maps current worlds to their original index
+        n_worlds = self.replicas
+        self.world_key = stream_keys(seeds)
+        self.world_ids = np.arange(n_worlds)
+        self.world_step = np.zeros(n_worlds, dtype=np.int64)
+        self.world_active = np.ones(n_worlds, dtype=bool)
+        self.world_deaths = np.zeros(n_worlds, dtype=np.int64)
+
+        # Colony arrays, indexed by global colony id world * n_colonies + c
+        self.n_colonies = n_col = len(colonies)
+        capacity = np.array([cap for _, cap in colonies], dtype=np.int64)
+        self.ants_per_world = n = int(capacity.sum())
+        self.food_per_world = num_food
+        self.colony_pos = np.tile(np.array([pos for pos, _ in colonies], dtype=np.float64).reshape(n_col, 2),
+                                  (n_worlds, 1))
+        self.colony_capacity = np.tile(capacity, n_worlds)
+        self.colony_world = np.repeat(np.arange(n_worlds), n_col)
+        self.colony_preference = np.full(n_worlds * n_col, 0.5)
+        self.colony_alive = self.colony_capacity > 0
+
+        # Ant arrays, one slot per unit of colony capacity
+        total = n_worlds * n
+        self.world = np.repeat(np.arange(n_worlds), n)
+        self.colony = self.world * n_col + np.tile(np.repeat(np.arange(n_col), capacity), n_worlds)
+        self.x = np.zeros(total)
+        self.y = np.zeros(total)
+        self.angle = np.zeros(total)
+        self.life = np.zeros(total, dtype=np.int64)
+        self.alive = np.zeros(total, dtype=bool)
+        self.has_food = np.zeros(total, dtype=bool)
+        self.food_color = np.full(total, NO_TARGET, dtype=np.int8)
+        self.preference = np.zeros(total)
+        self.target_food = np.full(total, NO_TARGET, dtype=np.int64)
+        self.target_food_gen = np.zeros(total, dtype=np.int64)
+        self.target_x = np.zeros(total)
+        self.target_y = np.zeros(total)
+        self.target_ant = np.full(total, NO_TARGET, dtype=np.int64)
+
+        # Food arrays; generation counters detect a slot reused after pickup
+        food_total = n_worlds * num_food
+        self.food_world = np.repeat(np.arange(n_worlds), num_food)
+        self.fx = np.zeros(food_total)
+        self.fy = np.zeros(food_total)
+        self.fcolor = np.zeros(food_total, dtype=np.int8)
+        self.factive = np.zeros(food_total, dtype=bool)
+        self.fgen = np.zeros(food_total, dtype=np.int64)
+
+        self.spawn(np.arange(total), np.full(total, 0.5), SITE_INIT_ANGLE)
+        self.add_food(self.food_world.copy(), site=SITE_INIT_FOOD)
+
+    # -- Population and food bookkeeping ---------------------------------
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('profiler', None)  # Profiling belongs to a run, not to its checkpoints
+        return state
+
+    @property
+    def num_ants(self):
+        return len(self.alive)
+
+    @property
+    def death_count(self):
+        return int(self.world_deaths.sum())
+
+    def close(self):
+        """Release resources held outside the arrays; nothing for this engine."""
+
+    def colony_status(self, world=0):
+        """Return (alive flags, food preferences) per colony of one world."""
+        block = slice(world * self.n_colonies, (world + 1) * self.n_colonies)
+        return ([bool(a) for a in self.colony_alive[block]],
+                [float(p) for p in self.colony_preference[block]])
+
+    def population(self):
+        """Number of live ants per (global) colony."""
+        return np.bincount(self.colony[self.alive], minlength=len(self.colony_pos))
+
+    def reseed(self, seeds):
+        """Switch every world to a new random stream from its current step on."""
+        self.world_key = stream_keys(seeds)
+
+    def colony_populations(self, world=0):
+        """Number of live ants per colony of one world."""
+        return self.population()[world * self.n_colonies:(world + 1) * self.n_colonies]
+
+    def food_count(self, world=0):
+        """Number of food items on the ground in one world."""
+        return int(np.count_nonzero(self.factive & (self.food_world == world)))
+
+    def local_index(self, slots):
+        """Index of ant slots within their own world."""
+        return slots - self.world[slots] * self.ants_per_world
+
+    def uniform(self, site, worlds, index):
+        """Per-world counter-based uniform draws."""
+        return counter_uniform(self.world_key[worlds], self.world_step[worlds], site, index)
+
+    def spawn(self, slots, preferences, site=SITE_SPAWN_ANGLE):
+        """Bring ants to life in the given (dead) slots at their colony."""
+        if len(slots) == 0:
+            return
+        if self.profiler is not None:
+            self.profiler.count('spawns', len(slots))
+        cols = self.colony[slots]
+        self.x[slots] = self.colony_pos[cols, 0]
+        self.y[slots] = self.colony_pos[cols, 1]
+        self.angle[slots] = 2 * math.pi * self.uniform(site, self.world[slots], self.local_index(slots))
+        self.life[slots] = self.initial_life
+        self.alive[slots] = True
+        self.has_food[slots] = False
+        self.food_color[slots] = NO_TARGET
+        self.preference[slots] = np.clip(preferences, 0.0, 1.0)
+        self.target_food[slots] = NO_TARGET
+        self.target_ant[slots] = NO_TARGET
+
+    def add_food(self, worlds, x=None, y=None, color=None, site=SITE_RESPAWN_FOOD):
+        """Place one food item per entry of `worlds` (sorted), at random unless given."""
+        if len(worlds) == 0:
+            return
+        rank = rank_within(worlds)
+        free = np.flatnonzero(~self.factive)
+        first_free = np.searchsorted(self.food_world[free], worlds)
+        slots = free[first_free + rank]
+        if x is None:
+            # Three consecutive sites give position and color
+            self.fx[slots] = np.floor(self.uniform(site, worlds, rank) * (self.width + 1))
+            self.fy[slots] = np.floor(self.uniform(site + 1, worlds, rank) * (self.height + 1))
+            self.fcolor[slots] = (self.uniform(site + 2, worlds, rank) >= 0.5).astype(np.int8)
+        else:
+            self.fx[slots] = x
+            self.fy[slots] = y
+            self.fcolor[slots] = color
+        self.factive[slots] = True
+        self.fgen[slots] += 1
+
+    def color_weight(self, ants, colors):
+        """Probability that each ant's desired color draw matches `colors`."""
+        pref = self.preference[ants]
+        return np.where(colors == FOOD_GREEN, pref, 1.0 - pref)
+
+    # -- Step phases -----------------------------------------------------
+
+    def advance(self):
+        """Advance every active world by one step."""
+        if self.profiler is not None:
+            self.advance_profiled()
+            return
+        acting = self.alive & self.world_active[self.world]  # Ants spawned this step act from the next
+        self.move(acting)
+        self.look_for_targets(acting & self.alive)
+        self.check_collisions(acting & self.alive)
+        self.refresh()
+        self.world_step += self.world_active
+        self.step += 1
+
+    def advance_profiled(self):
+        """advance(), timing each phase into the profiler."""
+        times = self.profiler.times
+        clock = time.perf_counter
+        start = clock()
+        acting = self.alive & self.world_active[self.world]
+        self.move(acting)
+        moved = clock()
+        self.look_for_targets(acting & self.alive)
+        looked = clock()
+        self.check_collisions(acting & self.alive)
+        collided = clock()
+        self.refresh()
+        times['move'] += moved - start
+        times['look'] += looked - moved
+        times['collide'] += collided - looked
+        times['refresh'] += clock() - collided
+        self.world_step += self.world_active
+        self.step += 1
+
+    def move(self, acting):
+        """Handle ant movement based on state."""
+        speed = self.ant_speed
+        moving = acting.copy()
+        carrying = acting & self.has_food
+        seeking = acting & ~self.has_food & (self.target_food != NO_TARGET)
+        chasing = acting & ~self.has_food & (self.target_food == NO_TARGET) & (self.target_ant != NO_TARGET)
+        wander = acting & ~self.has_food & (self.target_food == NO_TARGET) & (self.target_ant == NO_TARGET)
+
+        # Chasers drop targets that died or no longer carry food; they skip this step
+        chase_idx = np.flatnonzero(chasing)
+        tgt = self.target_ant[chase_idx]
+        lost = ~(self.alive[tgt] & self.has_food[tgt])
+        self.target_ant[chase_idx[lost]] = NO_TARGET
+        moving[chase_idx[lost]] = False
+        chase_idx, tgt = chase_idx[~lost], tgt[~lost]
+
+        # Carriers head home at half speed and deliver within 3 units
+        carry_idx = np.flatnonzero(carrying)
+        home = self.colony_pos[self.colony[carry_idx]]
+        dx = home[:, 0] - self.x[carry_idx]
+        dy = home[:, 1] - self.y[carry_idx]
+        dist = np.hypot(dx, dy)
+        arrived = dist < 3
+        walk = ~arrived & (dist > 0)
+        w = carry_idx[walk]
+        self.x[w] += (speed / 2) * dx[walk] / dist[walk]
+        self.y[w] += (speed / 2) * dy[walk] / dist[walk]
+        self.deliver(carry_idx[arrived])
+
+        # Food seekers walk to the remembered target spot and pick up if it is still there
+        seek_idx = np.flatnonzero(seeking)
+        dx = self.target_x[seek_idx] - self.x[seek_idx]
+        dy = self.target_y[seek_idx] - self.y[seek_idx]
+        dist = np.hypot(dx, dy)
+        reach = dist <= speed
+        w, d = seek_idx[~reach], dist[~reach]
+        self.x[w] += speed * dx[~reach] / d
+        self.y[w] += speed * dy[~reach] / d
+        self.pick_up(seek_idx[reach])
+
+        # Chasers close in on their target, stopping within one stride
+        dx = self.x[tgt] - self.x[chase_idx]
+        dy = self.y[tgt] - self.y[chase_idx]
+        dist = np.hypot(dx, dy)
+        far = dist > speed
+        w = chase_idx[far]
+        self.x[w] += speed * dx[far] / dist[far]
+        self.y[w] += speed * dy[far] / dist[far]
+
+        # Everyone else walks randomly
+        self.x[wander] += speed * np.cos(self.angle[wander])
+        self.y[wander] += speed * np.sin(self.angle[wander])
+
+        # Wall bouncing
+        bounce_x = moving & ((self.x <= 0) | (self.x >= self.width))
+        self.angle[bounce_x] = math.pi - self.angle[bounce_x]
+        self.x[bounce_x] = np.clip(self.x[bounce_x], 0, self.width)
+        bounce_y = moving & ((self.y <= 0) | (self.y >= self.height))
+        self.angle[bounce_y] = -self.angle[bounce_y]
+        self.y[bounce_y] = np.clip(self.y[bounce_y], 0, self.height)
+
+    def deliver(self, ants):
+        """Drop food at home, respawn it elsewhere and spawn mutated offspring."""
+        if len(ants) == 0:
+            return
+        worlds, local = self.world[ants], self.local_index(ants)
+        self.has_food[ants] = False
+        self.food_color[ants] = NO_TARGET
+        self.angle[ants] = 2 * math.pi * self.uniform(SITE_DELIVER_ANGLE, worlds, local)
+        self.add_food(worlds)
+        mutation = self.learning_rate * (2 * self.uniform(SITE_MUTATION, worlds, local) - 1)
+        children = self.preference[ants] + mutation
+        # Lowest-index deliverers spawn first while their colony has room; slots
+        # are colony-major, so `ants` is already grouped by colony
+        cols = self.colony[ants]
+        rank = rank_within(cols)
+        room = (self.colony_capacity - self.population())[cols]
+        ok = rank < room
+        dead = np.flatnonzero(~self.alive)
+        first_dead = np.searchsorted(self.colony[dead], cols[ok])
+        self.spawn(dead[first_dead + rank[ok]], children[ok])
+
+    def pick_up(self, ants):
+        """Ants at their target spot take the food if that item is still there."""
+        if len(ants) == 0:
+            return
+        slots = self.target_food[ants]
+        present = self.factive[slots] & (self.fgen[slots] == self.target_food_gen[ants])
+        # The lowest-index ant wins an item several reach in the same step
+        winners_slot, first = np.unique(slots[present], return_index=True)
+        winners = ants[present][first]
+        if self.profiler is not None:
+            self.profiler.count('pickups', len(winners))
+        self.factive[winners_slot] = False
+        self.has_food[winners] = True
+        self.food_color[winners] = self.fcolor[winners_slot]
+        self.target_food[ants] = NO_TARGET
+
+    def near(self, queries, px, py, pworld, radius):
+        """Pairs (query position, point index) within `radius` in the same world."""
+        return neighbor_pairs(self.x[queries], self.y[queries], px, py, radius, self.width, self.height,
+                              self.world[queries], pworld)
+
+    def look_for_targets(self, acting):
+        """Idle ants target visible food, else enemy carriers, of a desired color."""
+        idle = np.flatnonzero(acting & ~self.has_food & (self.target_food == NO_TARGET)
+                              & (self.target_ant == NO_TARGET))
+        if len(idle) == 0:
+            return
+
+        # Each visible candidate is accepted independently with the ant's weight
+        # for its color, and the first accepted one wins, as in desired_color()
+        food_slots = np.flatnonzero(self.factive & self.world_active[self.food_world])
+        qi, fj = self.near(idle, self.fx[food_slots], self.fy[food_slots], self.food_world[food_slots],
+                           self.vision_radius)
+        if self.profiler is not None:
+            self.profiler.count('vision_candidates', len(qi))
+        seekers, food_slots = idle[qi], food_slots[fj]
+        pair_index = (self.local_index(seekers) * self.food_per_world
+                      + food_slots - self.food_world[food_slots] * self.food_per_world)
+        draw = self.uniform(SITE_FOOD_CHOICE, self.world[seekers], pair_index)
+        accept = draw < self.color_weight(seekers, self.fcolor[food_slots])
+        found, pos = first_per_group(qi, food_slots, accept)
+        ants, slots = idle[found], food_slots[pos]
+        self.target_food[ants] = slots
+        self.target_food_gen[ants] = self.fgen[slots]
+        self.target_x[ants] = self.fx[slots]
+        self.target_y[ants] = self.fy[slots]
+
+        # Ants that found no food look for enemy carriers
+        rest = np.ones(len(idle), dtype=bool)
+        rest[found] = False
+        idle = idle[rest]
+        carriers = np.flatnonzero(self.alive & self.has_food & self.world_active[self.world])
+        qi, cj = self.near(idle, self.x[carriers], self.y[carriers], self.world[carriers], self.vision_radius)
+        if self.profiler is not None:
+            self.profiler.count('vision_candidates', len(qi))
+        seekers, prey = idle[qi], carriers[cj]
+        enemy = self.colony[seekers] != self.colony[prey]
+        pair_index = self.local_index(seekers) * self.ants_per_world + self.local_index(prey)
+        draw = self.uniform(SITE_ANT_CHOICE, self.world[seekers], pair_index)
+        accept = enemy & (draw < self.color_weight(seekers, self.food_color[prey]))
+        found, pos = first_per_group(qi, prey, accept)
+        self.target_ant[idle[found]] = prey[pos]
+
+    def check_collisions(self, acting):
+        """Carriers touching live enemies lose one life each way per contact."""
+        carriers = np.flatnonzero(acting & self.has_food)
+        others = np.flatnonzero(self.alive & self.world_active[self.world])
+        qi, oj = self.near(carriers, self.x[others], self.y[others], self.world[others], self.ant_radius * 2)
+        if self.profiler is not None:
+            self.profiler.count('collision_checks', len(qi))
+        a, b = carriers[qi], others[oj]
+        fight = self.colony[a] != self.colony[b]
+        a, b = a[fight], b[fight]
+        if len(a) == 0:
+            return
+        damage = np.bincount(a, minlength=self.num_ants) + np.bincount(b, minlength=self.num_ants)
+        self.life -= damage
+        self.die(np.flatnonzero(self.alive & (self.life <= 0)))
+
+    def die(self, ants):
+        """Kill ants, dropping any carried food where they fell."""
+        if len(ants) == 0:
+            return
+        if self.profiler is not None:
+            self.profiler.count('deaths', len(ants))
+        self.alive[ants] = False
+        drop = ants[self.has_food[ants]]
+        self.add_food(self.world[drop], self.x[drop], self.y[drop], self.food_color[drop])
+        self.has_food[ants] = False
+        self.food_color[ants] = NO_TARGET
+        self.world_deaths += np.bincount(self.world[ants], minlength=len(self.world_key))
+
+    def refresh(self):
+        """Update colony mean preferences and extinction flags."""
+        n_col = len(self.colony_pos)
+        cols = self.colony[self.alive]
+        counts = np.bincount(cols, minlength=n_col)
+        sums = np.bincount(cols, weights=self.preference[self.alive], minlength=n_col)
+        populated = counts > 0
+        self.colony_preference[populated] = sums[populated] / counts[populated]
+        self.colony_alive &= populated
+
+    # -- Replica management ----------------------------------------------
+
+    def compact(self):
+        """Drop inactive worlds from every array so they stop costing work."""
+        keep = self.world_active
+        if keep.all():
+            return
+        new_world = np.cumsum(keep) - 1
+        n, f, n_col = self.ants_per_world, self.food_per_world, self.n_colonies
+
+        ant_keep = keep[self.world]
+        old_world = self.world[ant_keep]
+        shift_ants = (new_world[old_world] - old_world) * n
+        for name in ('x', 'y', 'angle', 'life', 'alive', 'has_food', 'food_color', 'preference',
+                     'target_food', 'target_food_gen', 'target_x', 'target_y', 'target_ant'):
+            setattr(self, name, getattr(self, name)[ant_keep])
+        has_ant = self.target_ant != NO_TARGET
+        self.target_ant[has_ant] += shift_ants[has_ant]
+        has_food_target = self.target_food != NO_TARGET
+        self.target_food[has_food_target] += ((new_world[old_world] - old_world) * f)[has_food_target]
+        self.colony = self.colony[ant_keep] + (new_world[old_world] - old_world) * n_col
+        self.world = new_world[old_world]
+
+        food_keep = keep[self.food_world]
+        for name in ('fx', 'fy', 'fcolor', 'factive', 'fgen'):
+            setattr(self, name, getattr(self, name)[food_keep])
+        self.food_world = new_world[self.food_world[food_keep]]
+
+        colony_keep = keep[self.colony_world]
+        for name in ('colony_pos', 'colony_capacity', 'colony_preference', 'colony_alive'):
+            setattr(self, name, getattr(self, name)[colony_keep])
+        self.colony_world = new_world[self.colony_world[colony_keep]]
+
+        for name in ('world_key', 'world_ids', 'world_step', 'world_deaths', 'world_active'):
+            setattr(self, name, getattr(self, name)[keep])
@@ -0,0 +1,315 @@
+"""
+Tiled multi-process variant of the NumPy engine for one large world.
+
+The board is cut into a grid of tiles, one per worker process. Ant and food
+arrays live in `multiprocessing.shared_memory` blocks that every process
+maps. The neighbor searches, vision and collisions, are most of a step's
+cost; for those phases the main process publishes the acting ants and
+releases the workers through a barrier. Each worker handles the ants
+standing in its tile and sees points in the tile plus a halo (ghost) margin
+of the search radius around it. The main process waits at the barrier
+again and then does the cheap global bookkeeping:
+- movement, delivery and pickup
+- spawns, deaths and food respawns
+- colony statistics
+
+Tile ownership is recomputed from the positions at every phase. An ant that
+walks across a border therefore belongs to its new tile from the next phase
+on. A carrier heading for a distant nest needs nothing special, because
+colony positions are global. Each worker writes only its own ants' entries:
+- targets in the vision phase
+- damage taken in the collision phase
+Every draw is keyed by slot and step, never by the order ants are visited,
+so a tiled run gives exactly the same results as `--engine numpy` with the
+same seed.
+"""
+
+import math
+import multiprocessing
+import os
+import threading
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from engine_numpy import NumpyEngine, neighbor_pairs, stream_keys
+
+PHASE_STOP = 0
+PHASE_LOOK = 1
+PHASE_COLLIDE = 2
+PHASE_TIMEOUT = 60.0  # Seconds the main process waits for a phase before giving up on the workers
+
+# Arrays the workers map; they read all of them and write only their own ants' entries
+SHARED = ('x', 'y', 'alive', 'has_food', 'colony', 'world', 'preference', 'food_color', 'target_food',
+          'target_food_gen', 'target_x', 'target_y', 'target_ant', 'fx', 'fy', 'fcolor', 'factive', 'fgen',
+          'food_world', 'world_key', 'world_step', 'world_active', 'acting', 'damage', 'tile_counts', 'phase')
+
+# Constants a worker needs besides the shared arrays
+PARAMS = ('width', 'height', 'ant_radius', 'vision_radius', 'ants_per_world', 'food_per_world')
+
+# Per-tile event counters handed to the profiler
+TILE_COUNTERS = ('vision_candidates', 'collision_checks')
+
+
+def tile_grid(tiles, width, height):
+    """Split `tiles` into columns x rows, as close to square tiles on a width x height board as it divides."""
+    best = None
+    for cols in range(1, tiles + 1):
+        if tiles % cols:
+            continue
+        rows = tiles // cols
+        skew = abs(math.log((width / cols) / (height / rows)))
+        if best is None or skew < best[0]:
+            best = (skew, cols, rows)
+    return best[1], best[2]
+
+
+def tile_of(x, y, grid, width, height):
+    """Index of the tile each position falls in, row-major."""
+    cols, rows = grid
+    col = np.clip((x * (cols / width)).astype(np.int64), 0, cols - 1)
+    row = np.clip((y * (rows / height)).astype(np.int64), 0, rows - 1)
+    return row * cols + col
+
+
+class TileCounter:
+    """Stand-in profiler for a worker, adding counts to its row of the shared counters."""
+
+    def __init__(self, row):
+        self.row = row
+
+    def count(self, name, n=1):
+        if name in TILE_COUNTERS:
+            self.row[TILE_COUNTERS.index(name)] += n
+
+
+class TileWorker(NumpyEngine):
+    """One worker's view of the shared engine state, limited to its tile and halo."""
+
+    def __init__(self, index, grid, arrays, params):
+        self.__dict__.update(arrays)
+        self.__dict__.update(params)
+        self.index = index
+        self.grid = grid
+        cols, rows = grid
+        col, row = index % cols, index // cols
+        self.bounds = (col * self.width / cols, (col + 1) * self.width / cols,
+                       row * self.height / rows, (row + 1) * self.height / rows)
+        self.profiler = TileCounter(self.tile_counts[index])
+
+    def owned(self):
+        """Mask of the ants standing in this tile."""
+        return tile_of(self.x, self.y, self.grid, self.width, self.height) == self.index
+
+    def halo(self, px, py, radius):
+        """Mask of the points in this tile or within `radius` of it."""
+        x0, x1, y0, y1 = self.bounds
+        margin = radius + 1  # Covers rounding at the tile border
+        return (px >= x0 - margin) & (px < x1 + margin) & (py >= y0 - margin) & (py < y1 + margin)
+
+    def near(self, queries, px, py, pworld, radius):
+        """Like NumpyEngine.near, but only over points in the tile and its halo."""
+        ghost = np.flatnonzero(self.halo(px, py, radius))
+        qi, pj = neighbor_pairs(self.x[queries], self.y[queries], px[ghost], py[ghost], radius, self.width,
+                                self.height, self.world[queries], pworld[ghost])
+        return qi, ghost[pj]
+
+    def look(self):
+        """Targets for the acting ants in this tile."""
+        NumpyEngine.look_for_targets(self, self.acting & self.owned())
+
+    def collide(self):
+        """Damage each ant in this tile takes from enemy contacts this step."""
+        owned = self.owned()
+        carriers = np.flatnonzero(self.acting & self.has_food)
+        others = np.flatnonzero(self.alive & self.world_active[self.world])
+        self.damage[owned] = 0
+        # Carriers in the halo too, since their contacts may hurt ants of this tile
+        reach = self.ant_radius * 2
+        carriers = carriers[self.halo(self.x[carriers], self.y[carriers], reach)]
+        qi, oj = self.near(carriers, self.x[others], self.y[others], self.world[others], reach)
+        a, b = carriers[qi], others[oj]
+        self.profiler.count('collision_checks', int(owned[a].sum()))
+        fight = self.colony[a] != self.colony[b]
+        a, b = a[fight], b[fight]
+        np.add.at(self.damage, a[owned[a]], 1)
+        np.add.at(self.damage, b[owned[b]], 1)
+
+
+def attach(layout):
+    """Map the shared blocks named in `layout`; return (blocks, {name: array})."""
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in layout.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype, buffer=block.buf)
+    return blocks, arrays
+
+
+def run_tile(index, grid, layout, params, barrier):
+    """Worker loop: wait for a phase, run it on this tile, report back through the barrier."""
+    blocks, arrays = attach(layout)
+    worker = TileWorker(index, grid, arrays, params)
+    try:
+        while True:
+            barrier.wait()
+            phase = int(worker.phase[0])
+            if phase == PHASE_STOP:
+                break
+            try:
+                if phase == PHASE_LOOK:
+                    worker.look()
+                elif phase == PHASE_COLLIDE:
+                    worker.collide()
+            except BaseException:
+                barrier.abort()  # Wake the main process instead of leaving it waiting
+                raise
+            barrier.wait()
+    except threading.BrokenBarrierError:
+        pass  # The main process or another tile gave up and reports why
+    finally:
+        del worker, arrays
+        for block in blocks:
+            block.close()
+
+
+class TilePool:
+    """Worker processes and the shared memory blocks they map."""
+
+    def __init__(self, engine, tiles, timeout=PHASE_TIMEOUT):
+        self.timeout = timeout
+        self.blocks = []
+        layout = {}
+        for name in SHARED:
+            array = getattr(engine, name)
+            block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            shared = np.ndarray(array.shape, array.dtype, buffer=block.buf)
+            shared[...] = array
+            setattr(engine, name, shared)
+            self.blocks.append(block)
+            layout[name] = (block.name, array.shape, array.dtype.str)
+        grid = tile_grid(tiles, engine.width, engine.height)
+        params = {name: getattr(engine, name) for name in PARAMS}
+        context = multiprocessing.get_context()
+        self.barrier = context.Barrier(tiles + 1)
+        self.processes = [context.Process(target=run_tile, args=(index, grid, layout, params, self.barrier),
+                                          daemon=True, name=f'tile-{index}')
+                          for index in range(tiles)]
+        for process in self.processes:
+            process.start()
+        self.phase = engine.phase
+        self.closed = False
+        self.failed = False  # A phase could not complete and the workers were stopped
+
+    def run(self, phase):
+        """Run one phase on every tile and wait until all are done, or raise if a worker is gone or stuck."""
+        if all(process.is_alive() for process in self.processes):
+            self.phase[0] = phase
+            try:
+                self.barrier.wait(self.timeout)
+                self.barrier.wait(self.timeout)
+                return
+            except threading.BrokenBarrierError:
+                pass
+        raise self.failure()
+
+    def failure(self):
+        """Stop the workers after a failed phase; return an error naming the tiles that died, else a timeout.
+
+        The barrier is not aborted: that waits for every worker blocked in
+        it to wake, and a dead one never does.
+        """
+        self.failed = True
+        if self.barrier.broken:
+            for process in self.processes:
+                process.join(timeout=1)  # A worker that raised may still be exiting
+        dead = [f"tile {index} (exit code {process.exitcode})" for index, process in enumerate(self.processes)
+                if not process.is_alive() and process.exitcode != 0]
+        for process in self.processes:
+            process.terminate()
+        if dead:
+            return RuntimeError(f"Tile worker died: {', '.join(dead)}")
+        return RuntimeError(f"Tile workers did not finish a phase within {self.timeout:g}s")
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        if self.closed:
+            return
+        self.closed = True
+        if not (self.barrier.broken or self.failed):
+            self.phase[0] = PHASE_STOP
+            try:
+                self.barrier.wait(timeout=10)
+            except threading.BrokenBarrierError:
+                pass
+        for process in self.processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self.phase = None
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+class TiledEngine(NumpyEngine):
+    """NumpyEngine whose vision and collision phases run on `tiles` worker processes."""
+
+    def __init__(self, *args, tiles=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tiles = tiles  # 0 or None: one per core
+        self.pool = None  # Started on the first step
+        self.finalizer = None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        for name in SHARED:
+            if name in state:  # The per-phase arrays only exist once start() has run
+                state[name] = np.array(state[name])  # A private copy, not a view of shared memory
+        state['pool'] = None
+        state['finalizer'] = None
+        return state
+
+    def reseed(self, seeds):
+        self.world_key[...] = stream_keys(seeds)  # In place, so the workers see it
+
+    def start(self):
+        """Move the shared arrays into shared memory and start the workers."""
+        n, tiles = self.num_ants, self.tiles or os.cpu_count() or 1
+        self.acting = np.zeros(n, dtype=bool)
+        self.damage = np.zeros(n, dtype=np.int64)
+        self.tile_counts = np.zeros((tiles, len(TILE_COUNTERS)), dtype=np.int64)
+        self.phase = np.zeros(1, dtype=np.int64)
+        self.pool = TilePool(self, tiles)
+        self.finalizer = weakref.finalize(self, self.pool.close)
+
+    def close(self):
+        """Stop the workers; the engine keeps its state in private memory and can step on later."""
+        if self.pool is None:
+            return
+        for name in SHARED:
+            setattr(self, name, np.array(getattr(self, name)))
+        self.finalizer()
+        self.pool = None
+        self.finalizer = None
+
+    def run_phase(self, phase, acting):
+        if self.pool is None:
+            self.start()
+        self.acting[...] = acting
+        self.tile_counts[...] = 0
+        self.pool.run(phase)
+        if self.profiler is not None:
+            for name, total in zip(TILE_COUNTERS, self.tile_counts.sum(axis=0)):
+                if total:
+                    self.profiler.count(name, int(total))
+
+    def look_for_targets(self, acting):
+        self.run_phase(PHASE_LOOK, acting)
+
+    def check_collisions(self, acting):
+        self.run_phase(PHASE_COLLIDE, acting)
+        if self.damage.any():
+            self.life -= self.damage
+            self.die(np.flatnonzero(self.alive & (self.life <= 0)))
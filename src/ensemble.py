@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Batched ensemble runs: many seeds of one configuration in a single pass.
+
+All replicas share one NumpyEngine whose arrays carry a world dimension, so
+each step advances every unfinished replica with the same array operations.
+Every replica has its own RNG stream and its own end condition (divergence,
+extinction, max steps); finished replicas are masked out immediately and
+compacted away once enough of them have ended.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from colony import SimulationConfig, SimulationResult, colony_layout, run_outcome, wanted_state
+from engine_numpy import NumpyEngine
+
+
+class Ensemble:
+    """R independent replicas of one SimulationConfig, advanced together."""
+
+    def __init__(self, config, replicas, seeds=None, compact_fraction=0.25):
+        self.config = cfg = config
+        if seeds is None:
+            base = cfg.seed if cfg.seed is not None else random.SystemRandom().randrange(2 ** 31)
+            seeds = [base + r for r in range(replicas)]
+        self.seeds = list(seeds)
+        self.compact_fraction = compact_fraction
+        self.engine = NumpyEngine(cfg.width, cfg.height, colony_layout(cfg), cfg.num_food,
+                                  ant_radius=cfg.ant_radius, vision_radius=cfg.vision_radius,
+                                  ant_speed=cfg.ant_speed, initial_life=cfg.initial_life,
+                                  learning_rate=cfg.learning_rate, seeds=self.seeds)
+        self.results = [None] * len(self.seeds)
+        self.start_time = None
+
+    @property
+    def active(self):
+        """Number of replicas still running."""
+        return int(self.engine.world_active.sum())
+
+    def step(self):
+        """Advance all running replicas one step; return False once all have ended."""
+        if self.start_time is None:
+            self.start_time = time.perf_counter()
+        engine, cfg = self.engine, self.config
+        engine.advance()
+
+        n_col = engine.n_colonies
+        alive = engine.colony_alive.reshape(-1, n_col)
+        preferences = engine.colony_preference.reshape(-1, n_col)
+        at_limit = engine.world_step >= cfg.max_steps
+        divergent = wanted_state(preferences.T, alive.T) if cfg.stop_on_divergence else np.zeros_like(at_limit)
+        done = (at_limit | (alive.sum(axis=1) < 2) | divergent) & engine.world_active
+        for w in np.flatnonzero(done):
+            self.record(w, alive[w], preferences[w], run_outcome(alive[w], divergent[w], at_limit[w]))
+        engine.world_active[done] = False
+
+        # Compact once a good share of the arrays belongs to finished replicas
+        if (~engine.world_active).sum() >= max(1, self.compact_fraction * len(engine.world_active)):
+            engine.compact()
+        return engine.world_active.any()
+
+    def record(self, world, alive, preferences, outcome):
+        """Store the result of a replica that just ended."""
+        engine, cfg = self.engine, self.config
+        replica = int(engine.world_ids[world])
+        self.results[replica] = SimulationResult(
+            num_ants=cfg.num_ants,
+            num_food=cfg.num_food,
+            steps=int(engine.world_step[world]),
+            colony_a_alive=bool(alive[0]),
+            colony_b_alive=bool(alive[1]),
+            colony_a_preference=float(preferences[0]),
+            colony_b_preference=float(preferences[1]),
+            death_count=int(engine.world_deaths[world]),
+            elapsed=time.perf_counter() - self.start_time,
+            seed=self.seeds[replica],
+            outcome=outcome,
+            num_colonies=len(alive),
+            colonies_alive=tuple(bool(a) for a in alive),
+            colony_preferences=tuple(float(p) for p in preferences),
+        )
+
+    def run(self):
+        """Run every replica to its end and return results in replica order."""
+        while self.step():
+            pass
+        return self.results
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run many seeds of one ant colony configuration at once")
+    parser.add_argument('--num_ants', type=int, default=80, help='Number of ants (default: 80)')
+    parser.add_argument('--num_food', type=int, default=20, help='Number of food items (default: 20)')
+    parser.add_argument('--replicas', type=int, default=32, help='Number of independent replicas (default: 32)')
+    parser.add_argument('--seed', type=int, default=None, help='Base seed; replica r uses seed + r')
+    parser.add_argument('--max_steps', type=int, default=None, help='Override the per-replica step limit')
+    parser.add_argument('--no_stop_on_divergence', action='store_true', default=False,
+                        help='Continue replicas even if colonies diverge in food preference')
+    parser.add_argument('--results_file', default='ensemble_results.txt',
+                        help='File the per-replica results (results.txt format plus seed) are appended to')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    config = SimulationConfig(num_ants=args.num_ants, num_food=args.num_food, seed=args.seed,
+                              stop_on_divergence=not args.no_stop_on_divergence, engine='numpy')
+    if args.max_steps is not None:
+        config.max_steps = args.max_steps
+
+    ensemble = Ensemble(config, args.replicas)
+    results = ensemble.run()
+    elapsed = time.perf_counter() - ensemble.start_time
+    with open(args.results_file, 'a') as out:
+        for result in results:
+            out.write(result.csv_line(with_seed=True) + "\n")
+    survived = sum(r.colony_a_alive and r.colony_b_alive for r in results)
+    print(f"{len(results)} replicas finished in {elapsed:.2f}s; "
+          f"{survived} with both colonies alive, median {int(np.median([r.steps for r in results]))} steps.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Event-driven stepping for the reference engine (`--events`).
+
+Between decisions an ant walks straight legs (Ant.aim): a carrier heads
+home, a food seeker heads to its target and a wanderer walks straight on
+until a wall turns it. After k steps along a leg it stands at
+(x0 + k * dx, y0 + k * dy), in step-by-step mode too. An ant can skip steps for as long as nothing can
+reach it. That means no enemy ant, no newborn from an enemy nest and (for a
+wanderer) no food item. Over that stretch nothing it does depends on the
+rest of the world, and the rest of the world does not depend on it.
+
+Such an ant is put to sleep until the earliest step something could reach
+it, at most `horizon` steps away. It wakes before its arrival step, which
+is computed in closed form from its distance. Sleepers wait in a priority
+queue keyed by wake step, and the step loop skips them. Waking jumps the
+ant ahead with Ant.skip: the position comes from the leg formula, and the
+steps at which it hits a wall are solved for, so the cost of a wake grows
+with the number of bounces, not the steps slept. Positions and every later
+random draw come out exactly as in step-by-step mode.
+
+How far each awake ant is from the nearest enemy and food item is worked
+out once per step for all of them together with the NumPy neighbor search.
+A food item that appears mid-step (respawned or dropped) wakes the sleeping
+wanderers that might see it. settle() brings every sleeper's position up to
+date before a frame is drawn.
+
+This is not faster on small or crowded boards: on the default 800x600 board
+it is slower than stepping every ant, because the per-step measuring costs
+more than the few skipped steps save. It pays off in large, sparse worlds,
+so it is opt-in; `benchmark.py --events` measures both.
+"""
+
+import heapq
+import math
+
+import numpy as np
+
+from engine_numpy import neighbor_pairs
+
+MIN_SLEEP = 3  # Shorter sleeps cost more to schedule than they save
+RETRY_AFTER = 4  # Steps before an ant that could not sleep tries again
+
+
+def nearby(grid, x, y, radius):
+    """Items in the grid cells overlapping the square of `radius` around (x, y), unordered."""
+    cells = grid.cells
+    for key in grid.keys_near(x, y, radius):
+        bucket = cells.get(key)
+        if bucket:
+            for _, item in bucket.values():
+                yield item
+
+
+def nearest(qx, qy, px, py, radius, width, height, penalty=None):
+    """Distance from each query to its nearest point (less the point's `penalty`), capped at `radius`."""
+    room = np.full(len(qx), float(radius))
+    qi, pj = neighbor_pairs(qx, qy, px, py, radius, width, height)
+    gap = np.hypot(qx[qi] - px[pj], qy[qi] - py[pj])
+    if penalty is not None:
+        gap -= penalty[pj]
+    np.minimum.at(room, qi, gap)
+    return room
+
+
+class EventScheduler:
+    """Sleeping ants of one Board and the steps they wake at."""
+
+    def __init__(self, board, horizon=32):
+        self.board = board
+        self.horizon = horizon
+        self.queue = []  # (wake step, order, ant); entries of ants woken early are skipped
+        self.ants = []  # This step's ants in stepping order
+        self.cursor = -1  # Position in self.ants of the ant acting now
+        self.enemy_room = self.food_room = np.empty(0)  # Per entry of self.ants, at the start of the step
+        self.new_food = []  # Food placed during this step
+        self.stepped = 0  # Ant-steps taken in full
+        self.replayed = 0  # Ant-steps replayed on waking
+
+    def skipped_share(self):
+        """Fraction of ant-steps that were replayed instead of taken in full."""
+        return self.replayed / max(1, self.stepped + self.replayed)
+
+    def advance(self, act=None):
+        """Move, look and collide every awake ant (or call `act` on it), then put whoever can to sleep."""
+        step = self.board.step
+        self.ants, self.cursor, self.new_food = [], -1, []
+        self.wake_due(step)
+        self.ants = ants = list(self.board.all_ants())
+        for index, ant in enumerate(ants):
+            ant.event_slot = index
+        self.measure_room(step)
+        for index, ant in enumerate(ants):
+            if ant.sleep_until > step:
+                continue
+            self.cursor = index
+            if act is None:
+                ant.move()
+                ant.look_for_targets()
+                ant.check_collisions()
+            else:
+                act(ant)
+            self.stepped += 1
+            self.try_sleep(ant, index, step)
+        self.cursor = len(ants)
+
+    def wake_due(self, step):
+        """Wake the ants whose sleep ends at `step`."""
+        queue = self.queue
+        while queue and queue[0][0] <= step:
+            wake, _, ant = heapq.heappop(queue)
+            if ant.sleep_from is not None and ant.sleep_until == wake:
+                self.catch_up(ant, step)
+                ant.sleep_from = None
+
+    def catch_up(self, ant, step):
+        """Bring a sleeper's position up to the start of `step`."""
+        ant.skip(step - ant.sleep_from)
+        self.replayed += step - ant.sleep_from
+        ant.sleep_from = step
+
+    def settle(self):
+        """Bring every sleeper up to the current step, leaving it asleep."""
+        step = self.board.step
+        for ant in self.board.all_ants():
+            if ant.sleep_from is not None:
+                self.catch_up(ant, step)
+
+    def measure_room(self, step):
+        """For each ant that may try to sleep after acting, the distance to the nearest enemy and food item.
+
+        A sleeping enemy counts as closer by the distance it may have walked
+        since its position was recorded, and an enemy nest as an enemy that
+        never sleeps. Ants further than the search radius cannot cut a sleep
+        short, so the radius stands in for their distance.
+        """
+        board = self.board
+        cfg = board.config
+        speed, horizon = cfg.ant_speed, self.horizon
+        ants = self.ants
+        n = len(ants)
+        self.enemy_room = np.full(n, -np.inf)
+        self.food_room = np.full(n, -np.inf)
+        acting = np.array([ant.sleep_until <= step and ant.retry_at <= step and ant.target_ant is None
+                           for ant in ants], dtype=bool)  # Others will not try
+        if not acting.any():
+            return
+        x = np.array([ant.x for ant in ants], dtype=np.float64)
+        y = np.array([ant.y for ant in ants], dtype=np.float64)
+        colony = np.array([ant.colony.index for ant in ants], dtype=np.int64)
+        walked = speed * np.array([0 if ant.sleep_from is None else step - ant.sleep_from for ant in ants],
+                                  dtype=np.float64)
+
+        radius = cfg.vision_radius + speed * (2 * horizon + 2) + walked.max() + 1
+        nests = np.array([other.pos for other in board.colonies], dtype=np.float64).reshape(-1, 2)
+        for index in np.unique(colony[acting]):
+            mine = np.flatnonzero(acting & (colony == index))
+            enemies = np.flatnonzero(colony != index)
+            room = nearest(x[mine], y[mine], x[enemies], y[enemies], radius, cfg.width, cfg.height,
+                           walked[enemies])
+            others = np.delete(nests, index, axis=0)
+            if len(others):
+                room = np.minimum(room, np.hypot(others[:, 0][None, :] - x[mine, None],
+                                                 others[:, 1][None, :] - y[mine, None]).min(axis=1))
+            self.enemy_room[mine] = room
+
+        food = list(board.food_items)
+        mine = np.flatnonzero(acting)
+        self.food_room[mine] = nearest(x[mine], y[mine], np.array([f.x for f in food], dtype=np.float64),
+                                       np.array([f.y for f in food], dtype=np.float64),
+                                       cfg.vision_radius + speed * (horizon + 1) + 1, cfg.width, cfg.height)
+
+    def try_sleep(self, ant, index, step):
+        """Put an ant that just acted in `step` to sleep if nothing can reach it for a while.
+
+        Distances measured at the start of the step lose one stride for the
+        ant's own move since then; over k more steps it walks k strides and
+        an enemy k + 1.
+        """
+        if not ant.is_alive or ant.target_ant or ant.retry_at > step:
+            return  # Chasers follow a moving target
+        cfg = self.board.config
+        speed = cfg.ant_speed
+        if ant.has_food:
+            reach = cfg.vision_radius  # Enemies look for carriers
+            dist = math.hypot(ant.colony.pos[0] - ant.x, ant.colony.pos[1] - ant.y)
+            steps = (dist - 3) / (speed / 2) - 1  # Delivery happens awake
+        elif ant.target_food:
+            reach = cfg.ant_radius * 2  # Only enemy carriers bumping into it matter
+            steps = math.hypot(ant.target_food.x - ant.x, ant.target_food.y - ant.y) / speed - 2
+        else:
+            reach = cfg.vision_radius
+            steps = (self.food_room[index] - reach - 1) / speed - 1
+            for food in self.new_food:
+                steps = min(steps, (math.hypot(food.x - ant.x, food.y - ant.y) - reach - 1) / speed)
+        steps = min(steps, self.horizon, (self.enemy_room[index] - reach - 2 * speed - 1) / (2 * speed))
+        if steps < MIN_SLEEP:
+            ant.retry_at = step + RETRY_AFTER
+            return
+        ant.sleep_from = step + 1
+        ant.sleep_until = step + 1 + int(steps)
+        heapq.heappush(self.queue, (ant.sleep_until, ant.order, ant))
+
+    def food_added(self, food):
+        """Wake the sleeping wanderers that might see a food item that just appeared."""
+        self.new_food.append(food)
+        cfg = self.board.config
+        speed = cfg.ant_speed
+        radius = cfg.vision_radius + speed * (self.horizon + 1) + 1
+        for ant in list(nearby(self.board.vision_grid, food.x, food.y, radius)):
+            if ant.sleep_from is None or ant.has_food or ant.target_food:
+                continue
+            dist = math.hypot(food.x - ant.x, food.y - ant.y)
+            if dist < cfg.vision_radius + speed * (ant.sleep_until - ant.sleep_from) + 1:
+                self.wake_early(ant)
+
+    def wake_early(self, ant):
+        """Wake a sleeper now, mid-step, in the state step-by-step mode would have it in."""
+        step = self.board.step
+        acted = ant.event_slot < self.cursor  # Its turn this step has gone by
+        self.catch_up(ant, step + 1 if acted else step)
+        ant.sleep_from = None
+        ant.sleep_until = step + 1 if acted else step
@@ -0,0 +1,53 @@
+"""
+Slot-based registry of the food items on the board.
+
+Every item gets an integer id that is its slot in the registry. Picking an
+item up frees the slot and later respawns reuse free slots first, so the
+registry stays as large as the peak amount of food rather than growing with
+every respawn. Claims are checked by identity, so two items with the same
+position and color are still told apart.
+"""
+
+import collections
+
+Food = collections.namedtuple('Food', ['x', 'y', 'color', 'id'])
+
+
+class FoodRegistry:
+    """Live food items addressed by stable slot ids, with O(1) add and claim."""
+
+    def __init__(self):
+        self.slots = []  # Food item or None, indexed by id
+        self.free = []   # Ids of empty slots, reused last-freed first
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, food):
+        return food.id < len(self.slots) and self.slots[food.id] is food
+
+    def __iter__(self):
+        """Live items in id order."""
+        return (food for food in self.slots if food is not None)
+
+    def add(self, x, y, color):
+        """Create a food item in a free slot and return it."""
+        if self.free:
+            food_id = self.free.pop()
+            food = Food(x, y, color, food_id)
+            self.slots[food_id] = food
+        else:
+            food = Food(x, y, color, len(self.slots))
+            self.slots.append(food)
+        self.count += 1
+        return food
+
+    def claim(self, food):
+        """Remove `food` if it is still on the board; return True on success."""
+        if food not in self:
+            return False
+        self.slots[food.id] = None
+        self.free.append(food.id)
+        self.count -= 1
+        return True
@@ -0,0 +1,148 @@
+"""
+Background frame writer for --output_mode files.
+
+The simulation loop only copies the rendered surface into an RGB byte buffer
+and hands it to a bounded queue. Worker threads take frames off the queue and
+either encode them as PNG files (zlib compression releases the GIL, so
+several workers encode in parallel) or stream the raw pixels in order to an
+ffmpeg subprocess that writes a video directly.
+
+When the queue is full, 'block' backpressure makes the loop wait for a free
+slot and 'drop' discards the new frame; both are counted and reported.
+"""
+
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import time
+import zlib
+
+import numpy as np
+
+FORMATS = ('png', 'ffmpeg', 'auto')
+BACKPRESSURE = ('block', 'drop')
+
+
+def encode_png(pixels, width, height, level=6):
+    """Encode packed RGB bytes as a PNG file image."""
+    rows = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width * 3)
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # Leading 0 per row: no filter
+    raw[:, 1:] = rows
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)  # 8-bit RGB
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), level)) + chunk(b'IEND', b''))
+
+
+def resolve_format(frame_format):
+    """Turn 'auto' into 'ffmpeg' when an ffmpeg binary is on PATH, else 'png'."""
+    if frame_format == 'auto':
+        return 'ffmpeg' if shutil.which('ffmpeg') else 'png'
+    if frame_format == 'ffmpeg' and not shutil.which('ffmpeg'):
+        raise RuntimeError("--frame_format ffmpeg needs an ffmpeg binary on PATH")
+    return frame_format
+
+
+class FrameWriter:
+    """Bounded queue of frames drained by background encoder threads."""
+
+    def __init__(self, frames_dir, width, height, frame_format='png', workers=2, queue_size=8,
+                 backpressure='block', video_file='simulation.mp4', fps=30, png_level=6):
+        if backpressure not in BACKPRESSURE:
+            raise ValueError(f"Unknown backpressure {backpressure!r}; expected one of {', '.join(BACKPRESSURE)}")
+        self.frames_dir = frames_dir
+        self.width, self.height = width, height
+        self.format = resolve_format(frame_format)
+        self.backpressure = backpressure
+        self.png_level = png_level
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.blocked_time = 0.0
+        self.max_depth = 0
+        self.errors = []
+        self.lock = threading.Lock()
+        self.ffmpeg = None
+        os.makedirs(frames_dir, exist_ok=True)
+        if self.format == 'ffmpeg':
+            workers = 1  # Frames must reach the encoder in order
+            self.ffmpeg = subprocess.Popen(
+                ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                 '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+                 '-c:v', 'libx264', '-pix_fmt', 'yuv420p', video_file],
+                stdin=subprocess.PIPE)
+        self.threads = [threading.Thread(target=self.work, daemon=True) for _ in range(max(1, workers))]
+        for thread in self.threads:
+            thread.start()
+
+    @property
+    def depth(self):
+        return self.queue.qsize()
+
+    def submit(self, name, pixels):
+        """Queue one frame of packed RGB bytes; return False if it was dropped."""
+        self.submitted += 1
+        item = (name, pixels)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            if self.backpressure == 'drop':
+                self.dropped += 1
+                return False
+            self.blocked += 1
+            start = time.perf_counter()
+            self.queue.put(item)
+            self.blocked_time += time.perf_counter() - start
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def work(self):
+        """Worker loop: encode frames until the stop marker arrives."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            name, pixels = item
+            try:
+                if self.ffmpeg is not None:
+                    self.ffmpeg.stdin.write(pixels)
+                else:
+                    self.write_png(name, pixels)
+                with self.lock:
+                    self.written += 1
+            except (OSError, ValueError) as error:
+                with self.lock:
+                    self.errors.append(f"{name}: {error}")
+
+    def write_png(self, name, pixels):
+        """Encode and write one PNG into the frames directory."""
+        with open(os.path.join(self.frames_dir, name), 'wb') as out:
+            out.write(encode_png(pixels, self.width, self.height, self.png_level))
+
+    def status(self):
+        """One-line summary of the queue for the log."""
+        line = (f"queue depth {self.depth}/{self.queue.maxsize} (max {self.max_depth}), "
+                f"{self.written} written, {self.dropped} dropped, {self.blocked} blocked")
+        if self.blocked:
+            line += f" for {self.blocked_time:.2f}s"
+        return line
+
+    def close(self):
+        """Drain the queue, stop the workers and finish the video, if any."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.ffmpeg is not None:
+            self.ffmpeg.stdin.close()
+            self.ffmpeg.wait()
+        for error in self.errors:
+            print(f"Frame writer error: {error}")
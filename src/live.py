@@ -0,0 +1,298 @@
+"""
+Live metrics of a running simulation, served over a local socket (`--live`).
+
+The simulation publishes one row every `interval` steps into a ring buffer
+in `multiprocessing.shared_memory`:
+- step and steps/sec
+- death count and food count
+- each colony's preference and population
+
+A header holds the number of rows written so far. Publishing writes a row
+and then bumps that count; it never waits on anything, so a run with no one
+listening costs one array write per row.
+
+A separate server process maps the same block and answers plain HTTP, on a
+TCP port or a UNIX socket:
+- GET /metrics?since=N returns the buffered rows after row N as JSON
+- GET /stream sends every new row as a server-sent event, then an `end`
+  event when the run is over
+If the simulation dies without closing the publisher (SIGKILL, a crash),
+the server notices its parent is gone, ends the streams, removes the socket
+and unlinks the shared memory itself.
+
+Readers copy rows and then re-read the count. They drop any row the writer
+may have overwritten meanwhile, so a slow reader skips rows rather than
+seeing torn ones. `show_stats.py --live ADDRESS` tails /stream with
+read_stream().
+"""
+
+import http.client
+import http.server
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+import urllib.parse
+from multiprocessing import shared_memory
+
+import numpy as np
+
+FIELDS = ('step', 'steps_per_sec', 'deaths', 'food')  # Followed by preference and population per colony
+HEADER = ('count', 'done', 'colonies', 'capacity')
+POLL_SECONDS = 0.1  # How often a stream checks for new rows
+
+
+def parse_address(address):
+    """('unix', path) for a socket path, else ('tcp', (host, port)) for 'PORT' or 'HOST:PORT'."""
+    if address.startswith('unix:'):
+        return 'unix', address[len('unix:'):]
+    if '/' in address:
+        return 'unix', address
+    host, _, port = address.rpartition(':')
+    return 'tcp', (host or '127.0.0.1', int(port))
+
+
+def format_address(kind, where):
+    return f"unix:{where}" if kind == 'unix' else f"http://{where[0]}:{where[1]}"
+
+
+class MetricsRing:
+    """Header and row arrays over one shared memory block."""
+
+    def __init__(self, colonies=0, capacity=0, name=None):
+        width = len(FIELDS) + 2 * colonies
+        if name is None:
+            self.block = shared_memory.SharedMemory(create=True, size=8 * (len(HEADER) + capacity * width))
+        else:
+            self.block = shared_memory.SharedMemory(name=name)
+        self.header = np.ndarray(len(HEADER), np.int64, buffer=self.block.buf)
+        if name is None:
+            self.header[:] = (0, 0, colonies, capacity)
+        colonies, capacity = int(self.header[2]), int(self.header[3])
+        self.colonies, self.capacity = colonies, capacity
+        self.rows = np.ndarray((capacity, len(FIELDS) + 2 * colonies), np.float64, buffer=self.block.buf,
+                               offset=8 * len(HEADER))
+
+    @property
+    def count(self):
+        return int(self.header[0])
+
+    @property
+    def done(self):
+        return bool(self.header[1])
+
+    def write(self, row):
+        """Store a row in the next slot, overwriting the oldest once full, then publish it."""
+        count = int(self.header[0])
+        self.rows[count % self.capacity] = row
+        self.header[0] = count + 1
+
+    def read(self, since=0):
+        """(first row number, rows) of the rows after `since` still in the buffer."""
+        count = self.count
+        first = max(since, count - self.capacity, 0)
+        rows = self.rows[np.arange(first, count) % self.capacity]  # A copy
+        overwritten = self.count - self.capacity + 1  # Rows below this may have changed while copying
+        if overwritten > first:
+            rows = rows[overwritten - first:]
+            first = overwritten
+        return first, rows
+
+    def record(self, number, row):
+        """One row as a JSON-ready dict."""
+        n = len(FIELDS)
+        return {'row': number, 'step': int(row[0]), 'steps_per_sec': float(row[1]), 'deaths': int(row[2]),
+                'food': int(row[3]), 'preference': row[n:n + self.colonies].tolist(),
+                'population': row[n + self.colonies:].astype(np.int64).tolist()}
+
+    def records(self, since=0):
+        first, rows = self.read(since)
+        return [self.record(first + i, row) for i, row in enumerate(rows)]
+
+    def close(self):
+        self.header = self.rows = None
+        self.block.close()
+
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the ring of `server.ring` as JSON and server-sent events."""
+
+    def log_message(self, format, *args):
+        pass  # Keep the simulation's output clean
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        since = int(query.get('since', ['0'])[0])
+        ring = self.server.ring
+        if url.path == '/metrics':
+            body = json.dumps({'colonies': ring.colonies, 'done': ring.done, 'rows': ring.records(since)}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif url.path == '/stream':
+            self.stream(ring, since)
+        else:
+            self.send_error(404, 'Use /metrics or /stream')
+
+    def stream(self, ring, since):
+        """Send rows as they arrive until the run is over or the client goes away."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        with self.server.streams_lock:
+            self.server.streams += 1
+        try:
+            while True:
+                done = ring.done  # Read before the rows, so none written before the end are missed
+                records = ring.records(since)
+                for record in records:
+                    self.wfile.write(f"data: {json.dumps(record)}\n\n".encode())
+                if records:
+                    since = records[-1]['row'] + 1
+                    self.wfile.flush()
+                if done:
+                    self.wfile.write(b"event: end\ndata: {}\n\n")
+                    self.wfile.flush()
+                    return
+                time.sleep(POLL_SECONDS)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self.server.streams_lock:
+                self.server.streams -= 1
+
+
+class TCPMetricsServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class UnixMetricsServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix', 0)  # The handler expects a (host, port) client address
+
+
+def serve(name, address, ready, parent):
+    """Server process: answer requests until the run is over (or `parent` is gone) and every stream has finished."""
+    ring = MetricsRing(name=name)
+    orphaned = False
+    kind, where = parse_address(address)
+    if kind == 'unix' and os.path.exists(where) and stat.S_ISSOCK(os.stat(where).st_mode):
+        os.unlink(where)  # Left over from an earlier run
+    server = (UnixMetricsServer if kind == 'unix' else TCPMetricsServer)(where, MetricsHandler)
+    server.ring, server.streams, server.streams_lock = ring, 0, threading.Lock()
+    ready.send(where if kind == 'unix' else server.server_address[:2])
+    ready.close()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        while not (ring.done and server.streams == 0):
+            if os.getppid() != parent:
+                orphaned = True
+                ring.header[1] = 1  # The run died without closing; end the streams as if it had
+            time.sleep(POLL_SECONDS)
+    finally:
+        server.shutdown()
+        server.server_close()
+        if kind == 'unix':
+            os.unlink(where)
+        ring.close()
+        if orphaned:
+            ring.block.unlink()  # No one else is left to
+
+
+class LivePublisher:
+    """Simulation side: the ring buffer it writes to and the server process that reads it."""
+
+    def __init__(self, address, colonies, capacity=1024, step=0):
+        self.ring = MetricsRing(colonies, max(2, capacity))
+        kind, _ = parse_address(address)
+        context = multiprocessing.get_context()
+        receive, send = context.Pipe(duplex=False)
+        self.process = context.Process(target=serve, args=(self.ring.block.name, address, send, os.getpid()),
+                                       daemon=True, name='live-metrics')
+        self.process.start()
+        send.close()
+        try:
+            self.address = format_address(kind, receive.recv())  # With the port picked when given 0
+        except EOFError:
+            self.process.join()
+            self.ring.close()
+            self.ring.block.unlink()
+            raise RuntimeError(f"Could not serve live metrics on {address}") from None
+        self.last = (step, time.perf_counter())  # Of the previous row, for steps/sec
+
+    def publish(self, step, preferences, populations, deaths, food):
+        """Add one row; never waits for readers."""
+        now = time.perf_counter()
+        rate = (step - self.last[0]) / (now - self.last[1]) if now > self.last[1] else 0.0
+        self.last = (step, now)
+        self.ring.write([step, rate, deaths, food, *preferences, *populations])
+
+    def close(self, timeout=2.0):
+        """Mark the run as over, let open streams send their last rows, then stop the server."""
+        if self.ring.header is None:
+            return
+        self.ring.header[1] = 1
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.ring.close()
+        self.ring.block.unlink()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP over a UNIX socket."""
+
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def connect(address, timeout=None):
+    """HTTP connection to a metrics server at a `--live` address or an http:// URL."""
+    if address.startswith('http://'):
+        address = urllib.parse.urlparse(address).netloc
+    kind, where = parse_address(address)
+    if kind == 'unix':
+        return UnixHTTPConnection(where, timeout)
+    return http.client.HTTPConnection(*where, timeout=timeout)
+
+
+def read_stream(address, since=0, timeout=None):
+    """Yield the rows of a metrics server's /stream as dicts until the run ends."""
+    connection = connect(address, timeout)
+    try:
+        connection.request('GET', f'/stream?since={since}')
+        response = connection.getresponse()
+        if response.status != 200:
+            raise RuntimeError(f"{address}: HTTP {response.status} {response.reason}")
+        event = None
+        for line in response:
+            line = line.decode().rstrip('\r\n')
+            if line.startswith('event:'):
+                event = line[len('event:'):].strip()
+            elif line.startswith('data:'):
+                if event == 'end':
+                    return
+                yield json.loads(line[len('data:'):])
+            elif not line:
+                event = None
+    finally:
+        connection.close()
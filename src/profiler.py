@@ -0,0 +1,133 @@
+"""
+Opt-in per-phase timing and event counters for `colony.py --profile`.
+
+A Profiler accumulates the seconds spent in each phase of a step and counts
+of the work done (vision candidates examined, collision pair checks,
+pickups, deaths, spawns). Every `window` steps it prints a one-line summary
+of that window; report() returns the whole run, per phase and per counter,
+with the per-window summaries, and save() writes that as JSON.
+
+Nothing here is touched unless a run is profiled: the engines and the
+simulation loop only check for a profiler once per step.
+"""
+
+import json
+import sys
+import time
+
+PHASES = ('move', 'look', 'collide', 'refresh', 'draw', 'frames', 'stats', 'checkpoint')
+COUNTERS = ('vision_candidates', 'collision_checks', 'pickups', 'deaths', 'spawns')
+
+
+class PhaseTimer:
+    """Context manager adding its elapsed time to one phase."""
+
+    def __init__(self, times, name):
+        self.times = times
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.times[self.name] += time.perf_counter() - self.start
+        return False
+
+
+class Profiler:
+    """Phase times and event counts, summarized every `window` steps."""
+
+    def __init__(self, window=1000, log=sys.stdout):
+        self.window = max(1, window)
+        self.log = log
+        self.times = dict.fromkeys(PHASES, 0.0)  # Current window
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.total_times = dict.fromkeys(PHASES + ('other',), 0.0)
+        self.total_counts = dict.fromkeys(COUNTERS, 0)
+        self.steps = 0
+        self.window_steps = 0
+        self.window_start = None
+        self.wall = 0.0
+        self.windows = []
+
+    def start(self):
+        """Begin timing the first window."""
+        if self.window_start is None:
+            self.window_start = time.perf_counter()
+
+    def phase(self, name):
+        return PhaseTimer(self.times, name)
+
+    def count(self, name, n=1):
+        self.counts[name] += n
+
+    def end_step(self, step):
+        """Note a finished step; print and fold in the window once it is full."""
+        self.window_steps += 1
+        if self.window_steps >= self.window:
+            self.flush(step)
+
+    def flush(self, step):
+        """Close the current window, if it has any steps."""
+        if not self.window_steps:
+            return
+        now = time.perf_counter()
+        wall = now - self.window_start
+        phases = dict(self.times, other=max(0.0, wall - sum(self.times.values())))
+        summary = {'first_step': step - self.window_steps + 1, 'last_step': step, 'steps': self.window_steps,
+                   'seconds': round(wall, 6), 'phases': {name: round(t, 6) for name, t in phases.items()},
+                   'counters': dict(self.counts)}
+        self.windows.append(summary)
+        if self.log is not None:
+            self.log.write(format_window(summary) + "\n")
+            self.log.flush()
+        for name, seconds in phases.items():
+            self.total_times[name] += seconds
+        for name, n in self.counts.items():
+            self.total_counts[name] += n
+        self.steps += self.window_steps
+        self.wall += wall
+        self.times = dict.fromkeys(PHASES, 0.0)
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.window_steps = 0
+        self.window_start = now
+
+    def report(self, step=None):
+        """Whole-run totals as a dict; closes a partial last window when `step` is given."""
+        if step is not None:
+            self.flush(step)
+        steps = max(self.steps, 1)
+        wall = max(self.wall, 1e-12)
+        return {
+            'steps': self.steps,
+            'seconds': round(self.wall, 6),
+            'steps_per_sec': round(self.steps / wall, 2),
+            'window': self.window,
+            'phases': {name: {'seconds': round(t, 6), 'share': round(t / wall, 4),
+                              'us_per_step': round(t / steps * 1e6, 3)}
+                       for name, t in self.total_times.items()},
+            'counters': {name: {'total': n, 'per_step': round(n / steps, 3)}
+                         for name, n in self.total_counts.items()},
+            'windows': self.windows,
+        }
+
+    def save(self, path, step=None):
+        """Write report() to `path` as JSON and return it."""
+        report = self.report(step)
+        with open(path, 'w') as out:
+            json.dump(report, out, indent=2)
+        return report
+
+
+def format_window(summary):
+    """One summary line for a window: throughput, phase shares and counter rates."""
+    wall = max(summary['seconds'], 1e-12)
+    steps = summary['steps']
+    shares = ' '.join(f"{name} {100 * t / wall:.0f}%" for name, t in summary['phases'].items() if t > 0)
+    counters = summary['counters']
+    return (f"[profile] steps {summary['first_step']}-{summary['last_step']}: {steps / wall:.1f} steps/sec | "
+            f"{shares} | vision {counters['vision_candidates'] / steps:.1f}/step "
+            f"collisions {counters['collision_checks'] / steps:.1f}/step "
+            f"pickups {counters['pickups']} deaths {counters['deaths']} spawns {counters['spawns']}")
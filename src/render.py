@@ -0,0 +1,111 @@
+"""
+Pygame renderer for the 'display' and 'files' output modes.
+
+The simulation core never imports this module (or pygame) itself; a
+Simulation loads it only when a run has something to show or save.
+"""
+
+import math
+import os
+
+import pygame
+
+from colors import COLOR_GREEN, COLOR_ORANGE, COLOR_WHITE
+from engine_numpy import FOOD_GREEN
+
+
+class Renderer:
+    """A window ('display') or off-screen surface ('files') the world is drawn onto."""
+
+    def __init__(self, width, height, display=False):
+        self.display = display
+        if not display:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'  # Use dummy by default for headless runs; can be overridden
+        pygame.init()
+        if display:
+            self.screen = pygame.display.set_mode((width, height))
+            pygame.display.set_caption("Ant Colonies Simulation")
+        else:
+            self.screen = pygame.Surface((width, height))
+
+    def draw(self, cfg, board, engine=None):
+        """Render the board, or the engine's world when one is given."""
+        self.screen.fill(COLOR_WHITE)
+        if engine is not None:
+            draw_engine(self.screen, cfg, engine, [colony.color for colony in board.colonies])
+        else:
+            draw_board(self.screen, board)
+
+    def pixels(self):
+        """Packed RGB bytes of the current frame."""
+        return pygame.image.tobytes(self.screen, 'RGB')
+
+    def show(self):
+        """Flip the window; return False once it has been closed."""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+        pygame.display.flip()
+        return True
+
+    def close(self):
+        pygame.quit()
+
+
+def draw_colony(screen, cfg, pos, color, food_preference):
+    """Draw a colony circle and its preference bar."""
+    radius = cfg.colony_radius
+    pygame.draw.circle(screen, color, pos, radius)
+    # Preference bar: green for green preference, orange for orange
+    bar_x = pos[0] - 2 * radius
+    bar_y = pos[1] - 2 * radius
+    bar_width = 8
+    green_height = radius * 4 * food_preference
+    orange_height = radius * 4 * (1 - food_preference)
+    pygame.draw.rect(screen, COLOR_GREEN, (bar_x, bar_y, bar_width, green_height))
+    pygame.draw.rect(screen, COLOR_ORANGE, (bar_x, bar_y + green_height, bar_width, orange_height))
+
+
+def draw_ant(screen, cfg, x, y, color, life, food_color, angle):
+    """Draw an ant with its health bar and, if food_color is set, its load."""
+    radius = cfg.ant_radius
+    pygame.draw.circle(screen, color, (int(x), int(y)), radius)
+    # Health bar
+    health_width = radius * 4 * (life / cfg.initial_life)
+    pygame.draw.rect(screen, color, (int(x) - 2 * radius, int(y) - 2 * radius, health_width, 3))
+    if food_color is not None:
+        food_offset_x = x + math.cos(angle) * 10
+        food_offset_y = y + math.sin(angle) * 10
+        pygame.draw.circle(screen, food_color, (int(food_offset_x), int(food_offset_y)), cfg.food_radius)
+
+
+def draw_board(screen, board):
+    """Draw a reference Board's colonies, food and ants."""
+    cfg = board.config
+    for colony in board.colonies:
+        if colony.is_alive:
+            draw_colony(screen, cfg, colony.pos, colony.color, colony.food_preference)
+    for food in board.food_items:
+        pygame.draw.circle(screen, food.color, (food.x, food.y), cfg.food_radius)
+    for ant in board.all_ants():
+        if ant.is_alive:
+            draw_ant(screen, cfg, ant.x, ant.y, ant.colony.color, ant.life,
+                     ant.food_color if ant.has_food else None, ant.angle)
+
+
+def draw_engine(screen, cfg, engine, colony_colors):
+    """Draw the world held by a NumpyEngine."""
+    for c, pos in enumerate(engine.colony_pos):
+        if engine.colony_alive[c]:
+            draw_colony(screen, cfg, (int(pos[0]), int(pos[1])), colony_colors[c], engine.colony_preference[c])
+    for i in range(len(engine.fx)):
+        if engine.factive[i]:
+            color = COLOR_GREEN if engine.fcolor[i] == FOOD_GREEN else COLOR_ORANGE
+            pygame.draw.circle(screen, color, (int(engine.fx[i]), int(engine.fy[i])), cfg.food_radius)
+    for i in range(engine.num_ants):
+        if engine.alive[i]:
+            carried = None
+            if engine.has_food[i]:
+                carried = COLOR_GREEN if engine.food_color[i] == FOOD_GREEN else COLOR_ORANGE
+            draw_ant(screen, cfg, engine.x[i], engine.y[i], colony_colors[engine.colony[i]], engine.life[i],
+                     carried, engine.angle[i])
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+SQLite store of run results.
+
+One row per finished run holds the results.txt columns plus the outcome code,
+seed, wall time, timestamp, every config field that affects the run (so
+parameters like vision_radius and learning_rate are recorded even though
+they are not command-line flags) and a hash of the simulation sources.
+a_alive/b_alive are the first two colonies; runs with more colonies also
+record every colony's survival flag and preference as JSON in `colonies`.
+
+The database is opened in WAL mode with a busy timeout, so any number of
+colony.py processes and sweeps can write to the same file while analysis
+scripts read it. Inserts are batched into one transaction per `batch_size`
+results. Seeded runs carry a content hash of their parameters, seed and code
+version; a sweep uses it to skip runs that are already recorded.
+
+    python src/results_db.py import results.txt      # load an old results file
+    python src/results_db.py summary                 # success rate and median steps per cell
+"""
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_PATH = 'results.db'
+
+# Config fields that only choose where and how output is written
+OUTPUT_FIELDS = ('output_mode', 'stats', 'stats_file', 'stats_interval', 'stats_capacity', 'stats_mode',
+                 'frames_dir', 'frame_interval', 'frame_format', 'frame_workers', 'frame_queue',
+                 'frame_backpressure', 'video_file', 'checkpoint_interval', 'checkpoint_file', 'profile',
+                 'profile_window', 'profile_file', 'tiles', 'events', 'event_horizon', 'live',
+                 'live_interval', 'live_capacity')
+
+# Parameters kept in their own (indexed) columns besides the full JSON
+PARAM_COLUMNS = ('engine', 'max_steps', 'learning_rate', 'vision_radius', 'ant_speed', 'initial_life')
+
+# Sources whose contents can change the result of a run: every module `colony` imports, plus the engines
+# and checkpointing it loads on demand (render, live and results_db only write output)
+CODE_FILES = ('colony.py', 'engine_numpy.py', 'engine_tiled.py', 'events.py', 'spatial.py', 'rng.py', 'food.py',
+              'checkpoint.py', 'colors.py', 'frames.py', 'profiler.py', 'telemetry.py')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_hash TEXT UNIQUE,
+    num_ants INTEGER NOT NULL,
+    num_food INTEGER NOT NULL,
+    steps INTEGER NOT NULL,
+    a_alive INTEGER NOT NULL,
+    b_alive INTEGER NOT NULL,
+    outcome TEXT NOT NULL,
+    plateau_step INTEGER,
+    seed INTEGER,
+    engine TEXT,
+    max_steps INTEGER,
+    learning_rate REAL,
+    vision_radius REAL,
+    ant_speed REAL,
+    initial_life INTEGER,
+    wall_time REAL,
+    recorded_at REAL NOT NULL,
+    code_version TEXT,
+    params TEXT,
+    source TEXT,
+    num_colonies INTEGER DEFAULT 2,
+    colonies TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_cell ON runs (num_ants, num_food, outcome, steps);
+CREATE INDEX IF NOT EXISTS runs_params ON runs (engine, max_steps, learning_rate, vision_radius, ant_speed, initial_life);
+"""
+
+# Columns added since the first schema; connect() adds them to older databases
+ADDED_COLUMNS = (('num_colonies', 'INTEGER DEFAULT 2'), ('colonies', 'TEXT'))
+
+COLUMNS = ('run_hash', 'num_ants', 'num_food', 'steps', 'a_alive', 'b_alive', 'outcome', 'plateau_step', 'seed') \
+    + PARAM_COLUMNS + ('wall_time', 'recorded_at', 'code_version', 'params', 'source') \
+    + tuple(name for name, _ in ADDED_COLUMNS)
+
+INSERT = f"INSERT OR IGNORE INTO runs ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+_code_version = None
+
+
+def code_version():
+    """Short hash of the simulation sources, computed once per process."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        src = os.path.dirname(os.path.abspath(__file__))
+        for name in CODE_FILES:
+            with open(os.path.join(src, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def run_params(config):
+    """Config fields that affect a run's result, as a JSON-friendly dict (seed excluded)."""
+    params = dataclasses.asdict(config)
+    for name in OUTPUT_FIELDS + ('seed',):
+        params.pop(name, None)
+    return params
+
+
+def run_hash(config, version=None):
+    """Content hash of parameters, seed and code version; None for unseeded runs, which never repeat."""
+    if config.seed is None:
+        return None
+    payload = json.dumps({'params': run_params(config), 'seed': config.seed, 'code': version or code_version()},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def classify(steps, a_alive, b_alive, max_steps, plateau=False, alive=None):
+    """Outcome code of a results.txt line, which does not record it.
+
+    `alive` holds every colony's flag when there are more than two.
+    """
+    if plateau:
+        return 'plateau'
+    surviving = sum(alive) if alive is not None else a_alive + b_alive
+    if surviving < 2:
+        return 'extinction'
+    return 'timeout' if steps >= max_steps else 'divergence'
+
+
+def connect(path=DEFAULT_PATH, timeout=30.0):
+    """Open (creating if needed) a results database in WAL mode."""
+    conn = sqlite3.connect(path, timeout=timeout)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; a crash loses at most the last batch
+    conn.executescript(SCHEMA)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+    for name, kind in ADDED_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE runs ADD COLUMN {name} {kind}")
+    return conn
+
+
+class ResultStore:
+    """Buffered writer of run results; use as a context manager or call close()."""
+
+    def __init__(self, path=DEFAULT_PATH, batch_size=64, source=None):
+        self.path = path
+        self.conn = connect(path)
+        self.batch_size = max(1, batch_size)
+        self.source = source
+        self.pending = []
+        self.inserted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, result, config, wall_time=None):
+        """Queue one finished run of `config`."""
+        params = run_params(config)
+        outcome = result.outcome or classify(result.steps, result.colony_a_alive, result.colony_b_alive,
+                                             config.max_steps, alive=result.colonies_alive)
+        colonies = None
+        if result.colonies_alive is not None:
+            colonies = json.dumps({'alive': list(result.colonies_alive),
+                                   'preference': list(result.colony_preferences)})
+        row = (run_hash(config), result.num_ants, result.num_food, result.steps, int(result.colony_a_alive),
+               int(result.colony_b_alive), outcome, result.plateau_step, result.seed) \
+            + tuple(params.get(name) for name in PARAM_COLUMNS) \
+            + (result.elapsed if wall_time is None else wall_time, time.time(), code_version(),
+               json.dumps(params, sort_keys=True), self.source, result.num_colonies, colonies)
+        self.add_row(row)
+
+    def add_row(self, row):
+        self.pending.append(row)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write queued rows in one transaction."""
+        if not self.pending:
+            return
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(INSERT, self.pending)
+            self.inserted += self.conn.total_changes - before
+        self.pending = []
+
+    def recorded(self, hashes):
+        """The subset of `hashes` already in the store."""
+        hashes = [h for h in hashes if h is not None]
+        found = set()
+        for start in range(0, len(hashes), 500):  # Stay under SQLite's bound-parameter limit
+            chunk = hashes[start:start + 500]
+            query = f"SELECT run_hash FROM runs WHERE run_hash IN ({', '.join('?' * len(chunk))})"
+            found.update(h for (h,) in self.conn.execute(query, chunk))
+        return found
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def parse_line(line):
+    """(ants, food, steps, a_alive, b_alive, seed, plateau, alive) of a results.txt line, or None if it is short.
+
+    `alive` holds every colony's flag from an `alive=` field, which runs
+    with other than two colonies write, else None.
+    """
+    fields = line.strip().split(',')
+    if len(fields) < 5:
+        return None
+    ants, food, steps, a_alive, b_alive = (int(v) for v in fields[:5])
+    extra = fields[5:]
+    seed = next((int(v) for v in extra if v.lstrip('-').isdigit()), None)
+    flags = next((v[len('alive='):] for v in extra if v.startswith('alive=')), None)
+    alive = [flag == '1' for flag in flags] if flags is not None else None
+    return ants, food, steps, a_alive, b_alive, seed, 'plateau' in extra, alive
+
+
+def import_text(store, path, max_steps=500000):
+    """Add the lines of a results.txt file; importing the same file again adds nothing."""
+    seen = {}
+    source = os.path.abspath(path)
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            parsed = parse_line(line)
+            if parsed is None:
+                continue
+            ants, food, steps, a_alive, b_alive, seed, plateau, alive = parsed
+            # Identical lines are separate runs, so the n-th copy of a line gets its own key
+            seen[line] = seen.get(line, 0) + 1
+            key = hashlib.sha256(f"{source}\0{line}\0{seen[line]}".encode()).hexdigest()
+            outcome = classify(steps, a_alive, b_alive, max_steps, plateau, alive)
+            colonies = json.dumps({'alive': alive, 'preference': None}) if alive is not None else None
+            row = (key, ants, food, steps, a_alive, b_alive, outcome, None, seed) + (None,) * len(PARAM_COLUMNS) \
+                + (None, time.time(), None, None, source, len(alive) if alive is not None else 2, colonies)
+            store.add_row(row)
+    store.flush()
+
+
+def where_clause(filters):
+    """SQL condition and parameters selecting rows whose columns equal `filters`."""
+    for name in filters:
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown results column {name!r}")
+    if not filters:
+        return '1', []
+    return ' AND '.join(f"{name} = ?" for name in filters), list(filters.values())
+
+
+def cell_summary(conn, **filters):
+    """Per (num_ants, num_food) cell: runs, success rate, median steps and most common outcome.
+
+    Aggregation happens in SQLite, so only one row per cell is returned.
+    """
+    condition, values = where_clause(filters)
+    query = f"""
+        WITH selected AS (SELECT num_ants, num_food, outcome, steps FROM runs WHERE {condition}),
+        ranked AS (
+            SELECT num_ants, num_food, steps,
+                   ROW_NUMBER() OVER (PARTITION BY num_ants, num_food ORDER BY steps) AS position,
+                   COUNT(*) OVER (PARTITION BY num_ants, num_food) AS n
+            FROM selected),
+        medians AS (
+            SELECT num_ants, num_food, AVG(steps) AS median_steps FROM ranked
+            WHERE position IN ((n + 1) / 2, (n + 2) / 2) GROUP BY num_ants, num_food),
+        outcomes AS (
+            SELECT num_ants, num_food, outcome, COUNT(*) AS count,
+                   ROW_NUMBER() OVER (PARTITION BY num_ants, num_food ORDER BY COUNT(*) DESC, outcome) AS position
+            FROM selected GROUP BY num_ants, num_food, outcome),
+        totals AS (
+            SELECT num_ants, num_food, COUNT(*) AS runs, AVG(outcome = 'divergence') AS success_rate
+            FROM selected GROUP BY num_ants, num_food)
+        SELECT t.num_ants, t.num_food, t.runs, t.success_rate, m.median_steps, o.outcome
+        FROM totals t
+        JOIN medians m USING (num_ants, num_food)
+        JOIN outcomes o ON o.num_ants = t.num_ants AND o.num_food = t.num_food AND o.position = 1
+        ORDER BY t.num_ants, t.num_food
+    """
+    return conn.execute(query, values).fetchall()
+
+
+def iter_runs(conn, columns=('num_ants', 'num_food', 'steps', 'a_alive', 'b_alive', 'outcome'), **filters):
+    """Stream selected columns of matching runs without loading them all at once."""
+    for name in columns:
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown results column {name!r}")
+    condition, values = where_clause(filters)
+    return conn.execute(f"SELECT {', '.join(columns)} FROM runs WHERE {condition}", values)
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Manage the SQLite results store")
+    parser.add_argument('--db', default=DEFAULT_PATH, help=f'Results database (default: {DEFAULT_PATH})')
+    commands = parser.add_subparsers(dest='command', required=True)
+    importer = commands.add_parser('import', help='Add results.txt-format files to the database')
+    importer.add_argument('files', nargs='+', help='Files to import')
+    importer.add_argument('--max_steps', type=int, default=500000,
+                          help='Step limit the imported runs used, to tell timeouts apart (default: 500000)')
+    summary = commands.add_parser('summary', help='Print success rate and median steps per (ants, food) cell')
+    summary.add_argument('--engine', default=None, help='Only runs of this engine')
+    summary.add_argument('--max_steps', type=int, default=None, help='Only runs with this step limit')
+    summary.add_argument('--num_colonies', type=int, default=None, help='Only runs with this many colonies')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    if args.command == 'import':
+        with ResultStore(args.db, batch_size=1000) as store:
+            for path in args.files:
+                before = store.inserted
+                import_text(store, path, args.max_steps)
+                print(f"{path}: {store.inserted - before} runs imported into {args.db}")
+        return
+    filters = {name: getattr(args, name) for name in ('engine', 'max_steps', 'num_colonies')
+               if getattr(args, name) is not None}
+    conn = connect(args.db)
+    print("num_ants,num_food,runs,success_rate,median_steps,outcome")
+    for ants, food, runs, success_rate, median_steps, outcome in cell_summary(conn, **filters):
+        print(f"{ants},{food},{runs},{success_rate:.3f},{median_steps:g},{outcome}")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
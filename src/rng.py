@@ -0,0 +1,59 @@
+"""
+Pre-drawn random numbers for the reference engine's per-step loop.
+
+The inner loop asks for one random number at a time (a color choice for every
+food item or enemy ant examined, an angle per spawn, a mutation per delivery).
+RandomPool draws uniforms from a seeded NumPy generator in large blocks and
+hands them out one by one, so each call costs a list pop instead of a trip
+through random.choices or random.uniform.
+"""
+
+import math
+
+import numpy as np
+
+BLOCK_SIZE = 4096
+TWO_PI = 2 * math.pi
+
+
+class RandomPool:
+    """Seeded stream of uniforms, refilled from NumPy in blocks of `block_size`."""
+
+    def __init__(self, seed=None, block_size=BLOCK_SIZE):
+        self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.buffer = []  # Reversed block; pop() hands out draws in generation order
+
+    def refill(self):
+        """Draw the next block of uniforms."""
+        block = self.generator.random(self.block_size).tolist()
+        block.reverse()
+        self.buffer = block
+
+    def random(self):
+        """Uniform float in [0, 1)."""
+        try:
+            return self.buffer.pop()
+        except IndexError:
+            self.refill()
+            return self.buffer.pop()
+
+    def uniform(self, a, b):
+        """Uniform float in [a, b)."""
+        return a + (b - a) * self.random()
+
+    def angle(self):
+        """Uniform heading in [0, 2*pi)."""
+        return TWO_PI * self.random()
+
+    def randint(self, a, b):
+        """Uniform integer in [a, b], both ends included."""
+        return a + int((b - a + 1) * self.random())
+
+    def choice(self, options):
+        """Uniformly chosen element of a non-empty sequence."""
+        return options[int(len(options) * self.random())]
+
+    def binary(self, p, first, second):
+        """`first` with probability p, otherwise `second` (a two-way categorical draw)."""
+        return first if self.random() < p else second
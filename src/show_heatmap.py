@@ -1,19 +1,53 @@
+import sys
 import pandas as pd
 import numpy as np
 
-df = pd.read_csv('results.txt', header=None, names=['num_ants', 'num_food', 'steps', 'a_alive', 'b_alive'])
+def load_results(path):
+    # Lines are num_ants,num_food,steps,a_alive,b_alive, optionally followed by a seed, 'plateau' and/or
+    # 'alive=' with every colony's flag; 'surviving' counts the colonies left
+    import results_db
+    rows = []
+    with open(path) as f:
+        for line in f:
+            parsed = results_db.parse_line(line)
+            if parsed is None:
+                continue
+            ants, food, steps, a_alive, b_alive, _, plateau, alive = parsed
+            surviving = sum(alive) if alive is not None else a_alive + b_alive
+            rows.append([ants, food, steps, a_alive, b_alive, plateau, surviving])
+    return pd.DataFrame(rows, columns=['num_ants', 'num_food', 'steps', 'a_alive', 'b_alive', 'plateau',
+                                       'surviving'])
 
 MAX_STEPS = 500000  # Adjust based on your code
 
+OUTCOME_LABELS = {'divergence': 'Successful Divergence', 'extinction': 'Colony Death',
+                  'timeout': 'Timeout (No Divergence)', 'plateau': 'Plateau (Stopped Early)'}
+
+def load_summary(path):
+    # One row per (ants, food) cell, aggregated inside SQLite: majority outcome and median steps
+    import results_db
+    conn = results_db.connect(path)
+    rows = results_db.cell_summary(conn)
+    conn.close()
+    df = pd.DataFrame(rows, columns=['num_ants', 'num_food', 'runs', 'success_rate', 'steps', 'outcome'])
+    df['outcome'] = df['outcome'].map(OUTCOME_LABELS)
+    return df
+
+path = sys.argv[1] if len(sys.argv) > 1 else 'results.txt'  # e.g. adaptive_map.txt or results.db
+df = load_summary(path) if path.endswith('.db') else load_results(path)
+
 def classify(row):
+    if row['plateau']:
+        return 'Plateau (Stopped Early)'
     if row['steps'] >= MAX_STEPS:
         return 'Timeout (No Divergence)'
-    elif row['a_alive'] + row['b_alive'] < 2:
+    elif row['surviving'] < 2:
         return 'Colony Death'
     else:
         return 'Successful Divergence'
 
-df['outcome'] = df.apply(classify, axis=1)
+if 'runs' not in df:
+    df['outcome'] = df.apply(classify, axis=1)
 df['steps_norm'] = np.clip(df['steps'], 0, MAX_STEPS)
 
 # Heatmaps
@@ -23,16 +57,17 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 
 # Outcome numeric for coloring
-outcome_map = {'Successful Divergence': 2, 'Colony Death': 1, 'Timeout (No Divergence)': 0}
+outcome_map = {'Successful Divergence': 2, 'Colony Death': 1, 'Timeout (No Divergence)': 0, 'Plateau (Stopped Early)': -1}
 df['outcome_num'] = df['outcome'].map(outcome_map)
 
 # Pivot for grid
-pivot_outcome = df.pivot(index='num_ants', columns='num_food', values='outcome_num')
-pivot_steps = df.pivot(index='num_ants', columns='num_food', values='steps_norm')
+# Cells with replicate runs show their most common outcome and mean steps
+pivot_outcome = df.pivot_table(index='num_ants', columns='num_food', values='outcome_num', aggfunc=lambda v: v.mode().iloc[0])
+pivot_steps = df.pivot_table(index='num_ants', columns='num_food', values='steps_norm', aggfunc='mean')
 
 # Outcome Heatmap
 plt.figure(figsize=(12, 10))
-sns.heatmap(pivot_outcome, cmap='RdYlGn', annot=False, cbar_kws={'ticks': [0,1,2], 'label': 'Outcome (0=Timeout, 1=Death, 2=Success)'})
+sns.heatmap(pivot_outcome, cmap='RdYlGn', annot=False, cbar_kws={'ticks': [-1,0,1,2], 'label': 'Outcome (-1=Plateau, 0=Timeout, 1=Death, 2=Success)'})
 plt.title('Outcome Heatmap: Divergence Success by Ants and Food')
 plt.xlabel('Number of Food')
 plt.ylabel('Number of Ants')
@@ -40,7 +75,7 @@ plt.show()
 
 # Steps Heatmap (among successes only, to focus on divergence time)
 success_df = df[df['outcome'] == 'Successful Divergence']
-pivot_steps_success = success_df.pivot(index='num_ants', columns='num_food', values='steps_norm')
+pivot_steps_success = success_df.pivot_table(index='num_ants', columns='num_food', values='steps_norm', aggfunc='mean')
 plt.figure(figsize=(12, 10))
 sns.heatmap(pivot_steps_success, cmap='viridis_r', annot=False)  # _r for reverse: low steps = dark
 plt.title('Steps to Divergence (Success Cases Only)')
@@ -53,7 +88,7 @@ import plotly.express as px
 
 # Outcome Heatmap
 fig = px.imshow(pivot_outcome, color_continuous_scale='RdYlGn', aspect='auto',
-                labels=dict(color='Outcome (0=Timeout, 1=Death, 2=Success)'))
+                labels=dict(color='Outcome (-1=Plateau, 0=Timeout, 1=Death, 2=Success)'))
 fig.update_layout(title='Outcome Heatmap: Divergence Success by Ants and Food',
                   xaxis_title='Number of Food', yaxis_title='Number of Ants')
 fig.show()  # Or fig.write_html('outcome_heatmap.html') for export
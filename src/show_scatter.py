@@ -1,3 +1,4 @@
+import sys
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -12,25 +13,47 @@ x_dead = []
 y_dead = []
 x_max = []
 y_max = []
+x_plateau = []
+y_plateau = []
 
-FILE_NAME = './results.txt'
-
-with open(FILE_NAME, 'r') as input:
-    for line in input:
-        ants, food, step, colony_a_is_alive, colony_b_is_alive = [
-            int(i) for i in line.strip().split(',')]
-        if step == 500000:
-            x_max.append(food)
-            y_max.append(step)
-            continue
-        if colony_a_is_alive and colony_b_is_alive:
-            # Bucket by number of ants (1-10, 11-20, ..., 91-100)
-            bucket_idx = min((ants - 1) // bucket_size, bucket_count - 1)
-            bucket_x[bucket_idx].append(food)
-            bucket_y[bucket_idx].append(step)
-        else:
-            x_dead.append(food)
-            y_dead.append(step)
+FILE_NAME = sys.argv[1] if len(sys.argv) > 1 else './results.txt'
+
+def read_runs(path):
+    # (ants, food, steps, extinct, plateau) per run, from a results.txt file or a results database;
+    # extinct means fewer than two colonies were left, however many the run had
+    import results_db
+    if path.endswith('.db'):
+        conn = results_db.connect(path)
+        for ants, food, step, outcome in results_db.iter_runs(conn, ('num_ants', 'num_food', 'steps', 'outcome')):
+            yield ants, food, step, outcome == 'extinction', outcome == 'plateau'
+        conn.close()
+        return
+    with open(path, 'r') as input:
+        for line in input:
+            parsed = results_db.parse_line(line)
+            if parsed is None:
+                continue
+            ants, food, step, a_alive, b_alive, _, plateau, alive = parsed
+            surviving = sum(alive) if alive is not None else a_alive + b_alive
+            yield ants, food, step, surviving < 2, plateau
+
+for ants, food, step, extinct, plateau in read_runs(FILE_NAME):
+    if plateau:
+        x_plateau.append(food)
+        y_plateau.append(step)
+        continue
+    if step == 500000:
+        x_max.append(food)
+        y_max.append(step)
+        continue
+    if not extinct:
+        # Bucket by number of ants (1-10, 11-20, ..., 91-100)
+        bucket_idx = min((ants - 1) // bucket_size, bucket_count - 1)
+        bucket_x[bucket_idx].append(food)
+        bucket_y[bucket_idx].append(step)
+    else:
+        x_dead.append(food)
+        y_dead.append(step)
 
 # Vibrant colors for buckets
 cmap = plt.get_cmap('tab10')
@@ -43,6 +66,7 @@ for i in range(bucket_count):
 # Plot dead colonies and max step
 plt.scatter(x_dead, y_dead, color='red', label='Colony died')
 plt.scatter(x_max, y_max, color='gray', label='Max steps')
+plt.scatter(x_plateau, y_plateau, color='black', marker='x', label='Stopped early (plateau)')
 
 plt.title('Ant clustering by ant count buckets')
 plt.xlabel('Amount of food')
@@ -1,21 +1,33 @@
 #!/usr/bin/env python3
 """
 Show statistics visualization for ant colony simulation.
-Reads stats.txt and creates graphs showing food preferences over time.
+Reads stats.npz (or a legacy stats.txt) and creates graphs showing food
+preferences over time, or tails the live metrics of a running simulation
+(--live).
 """
 
 import argparse
+import collections
+import itertools
 import os
 import sys
 import numpy as np
 import matplotlib
 import matplotlib.pyplot as plt
 
+import telemetry
+from live import read_stream
+from downsample import MinMaxDownsampler, lttb
+from frames import resolve_format
+from stats_animation import render_animation
+
+CHUNK_ROWS = 1000000  # Rows read at a time when streaming a stats file
+
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="Visualize ant colony statistics")
-    parser.add_argument('--stats_file', default='stats.txt', 
-                       help='Path to stats.txt file (default: stats.txt)')
+    parser.add_argument('--stats_file', default='stats.npz',
+                       help='Path to the stats file written by --stats, .npz or legacy .txt (default: stats.npz)')
     parser.add_argument('--output', default=None,
                        help='Output file for the plot (default: show plot)')
     parser.add_argument('--title', default='Ant Colony Food Preferences Over Time',
@@ -24,49 +36,168 @@ def parse_arguments():
                        help='Force save to file instead of displaying')
     parser.add_argument('--animate', action='store_true',
                        help='Create an animation by saving or showing each frame of the stats plot')
+    parser.add_argument('--downsample', choices=['minmax', 'lttb', 'none'], default='minmax',
+                       help='How long series are thinned for plotting: per-bucket first/last/min/max rows, streamed '
+                            'in chunks ("minmax"), Largest-Triangle-Three-Buckets ("lttb") or not at all (default: minmax)')
+    parser.add_argument('--points', type=int, default=4000,
+                       help='Rows to plot per series when downsampling (default: 4000)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help='Processes rendering --animate --save frames (default: number of cores)')
+    parser.add_argument('--frame_format', choices=['png', 'ffmpeg', 'auto'], default='png',
+                       help='--animate --save output: PNGs in stats-frames/, or frames streamed to ffmpeg; '
+                            '"auto" uses ffmpeg when installed (default: png)')
+    parser.add_argument('--video_file', default='stats.mp4',
+                       help='Video written with --frame_format ffmpeg (default: stats.mp4)')
+    parser.add_argument('--live', default=None, metavar='ADDRESS',
+                       help='Tail the live metrics of a run started with colony.py --live ADDRESS, printing each row; '
+                            'with --output, plot the last --points rows once the run ends')
     return parser.parse_args()
 
-def load_stats_data(stats_file):
-    """Load statistics data from file."""
+def check_stats_file(stats_file):
     if not os.path.exists(stats_file):
         print(f"Error: Stats file '{stats_file}' not found.")
         print("Run the simulation with --stats flag first:")
         print("  python src/colony.py --stats")
         sys.exit(1)
-    
-    steps = []
-    colony_0_prefs = []
-    colony_1_prefs = []
-    
+
+def parse_lines(lines, first_line_num):
+    """Slow path for a chunk of a legacy stats.txt that has malformed lines: parse line by line."""
+    rows = []
+    for line_num, line in enumerate(lines, first_line_num):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            parts = line.split(',')
+            if len(parts) != 3:
+                raise ValueError
+            rows.append((int(parts[0]), float(parts[1]), float(parts[2])))
+        except ValueError:
+            print(f"Warning: Skipping malformed line {line_num}: {line}")
+    return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+def read_text_chunks(stats_file, chunk_rows):
+    """Yield (steps, colony_0_prefs, colony_1_prefs) blocks of a legacy step,pref0,pref1 text file."""
+    line_num = 1
     with open(stats_file, 'r') as f:
-        for line_num, line in enumerate(f, 1):
-            line = line.strip()
-            if not line:
-                continue
-                
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                return
             try:
-                parts = line.split(',')
-                if len(parts) != 3:
-                    print(f"Warning: Skipping malformed line {line_num}: {line}")
-                    continue
-                    
-                step = int(parts[0])
-                pref_0 = float(parts[1])
-                pref_1 = float(parts[2])
-                
-                steps.append(step)
-                colony_0_prefs.append(pref_0)
-                colony_1_prefs.append(pref_1)
-                
-            except (ValueError, IndexError) as e:
-                print(f"Warning: Skipping malformed line {line_num}: {line}")
+                block = np.loadtxt(lines, delimiter=',', ndmin=2)  # Parsed in C, a whole chunk at once
+                if block.size and block.shape[1] != 3:
+                    raise ValueError
+            except ValueError:
+                block = parse_lines(lines, line_num)
+            line_num += len(lines)
+            if len(block):
+                yield block[:, 0].astype(np.int64), block[:, 1], block[:, 2]
+
+def iter_stats_chunks(stats_file, chunk_rows=CHUNK_ROWS):
+    """Yield the stats file as (steps, colony_0_prefs, colony_1_prefs) blocks of at most chunk_rows rows."""
+    if stats_file.endswith('.npz'):
+        data = telemetry.load(stats_file, mmap=True)  # Only the rows of the current block are read
+        for start in range(0, len(data['step']), chunk_rows):
+            stop = start + chunk_rows
+            yield (np.asarray(data['step'][start:stop]), np.asarray(data['preference'][start:stop, 0]),
+                   np.asarray(data['preference'][start:stop, 1]))
+        return
+    yield from read_text_chunks(stats_file, chunk_rows)
+
+def step_range(stats_file):
+    """First and last step in the stats file, without reading the rows in between."""
+    if stats_file.endswith('.npz'):
+        steps = telemetry.load(stats_file, mmap=True)['step']
+        return (int(steps[0]), int(steps[-1])) if len(steps) else None
+    first = next(read_text_chunks(stats_file, 1000), None)
+    if first is None:
+        return None
+    with open(stats_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        for line in reversed(f.read().splitlines()):
+            try:
+                return int(first[0][0]), int(line.split(b',')[0])
+            except ValueError:
                 continue
-    
-    if not steps:
+    return int(first[0][0]), int(first[0][-1])
+
+def load_stats_data(stats_file):
+    """Load statistics data from file."""
+    check_stats_file(stats_file)
+
+    if stats_file.endswith('.npz'):
+        data = telemetry.load(stats_file)
+        steps, colony_0_prefs, colony_1_prefs = data['step'], data['preference'][:, 0], data['preference'][:, 1]
+    else:
+        chunks = list(read_text_chunks(stats_file, CHUNK_ROWS))
+        steps, colony_0_prefs, colony_1_prefs = (np.concatenate(column) for column in zip(*chunks)) \
+            if chunks else (np.zeros(0),) * 3
+
+    if len(steps) == 0:
         print("Error: No valid data found in stats file.")
         sys.exit(1)
-    
-    return np.array(steps), np.array(colony_0_prefs), np.array(colony_1_prefs)
+
+    return steps, colony_0_prefs, colony_1_prefs
+
+def load_plot_data(stats_file, method='minmax', points=4000, chunk_rows=CHUNK_ROWS):
+    """Load the rows to plot, downsampled to about `points` per series; return them and the total row count.
+
+    'minmax' streams the file in chunks, so it never holds more than one chunk
+    plus the selected rows; 'lttb' and 'none' load the whole series.
+    """
+    check_stats_file(stats_file)
+    if method == 'minmax':
+        bounds = step_range(stats_file)
+        if bounds is None:
+            print("Error: No valid data found in stats file.")
+            sys.exit(1)
+        # Up to 4 rows (first, last, min, max) per bucket and series
+        sampler = MinMaxDownsampler(bounds[0], bounds[1], max(1, points // 4))
+        every_row = []  # Kept until there are too many rows to plot them all
+        for chunk in iter_stats_chunks(stats_file, chunk_rows):
+            steps, colony_0_prefs, colony_1_prefs = chunk
+            sampler.add(steps, colony_0_prefs, colony_1_prefs, colony_0_prefs - colony_1_prefs)
+            if every_row is not None:
+                every_row.append(chunk)
+                if sampler.count > points:
+                    every_row = None
+        if every_row is not None:
+            return tuple(np.concatenate(column) for column in zip(*every_row)) + (sampler.count,)
+        rows = sampler.result()
+        return rows[:, 0].astype(np.int64), rows[:, 1], rows[:, 2], sampler.count
+
+    steps, colony_0_prefs, colony_1_prefs = load_stats_data(stats_file)
+    total = len(steps)
+    if method == 'lttb' and total > points:
+        keep = np.unique(np.concatenate([lttb(steps, y, points) for y in
+                                         (colony_0_prefs, colony_1_prefs, colony_0_prefs - colony_1_prefs)]))
+        steps, colony_0_prefs, colony_1_prefs = steps[keep], colony_0_prefs[keep], colony_1_prefs[keep]
+    return steps, colony_0_prefs, colony_1_prefs, total
+
+def format_live_row(row):
+    """One line of text for a live metrics row."""
+    preferences = ' '.join(f"{p:.3f}" for p in row['preference'])
+    populations = ' '.join(str(n) for n in row['population'])
+    return (f"step {row['step']:>8}  {row['steps_per_sec']:>8.1f} steps/sec  deaths {row['deaths']:>6}  "
+            f"food {row['food']:>5}  preference {preferences}  population {populations}")
+
+def tail_live(address, points=4000):
+    """Print live metrics rows as they arrive until the run ends; return the last `points` of them."""
+    window = collections.deque(maxlen=points)  # Constant memory however long the run
+    try:
+        for row in read_stream(address):
+            window.append(row)
+            print(format_live_row(row), flush=True)
+    except (ConnectionRefusedError, FileNotFoundError):
+        print(f"Error: No live metrics at '{address}'.")
+        print("Start the simulation with --live first:")
+        print("  python src/colony.py --live 8765")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+    return list(window)
 
 def create_preference_plot(steps, colony_0_prefs, colony_1_prefs, title, xlim=None, ylim=None):
     plt.figure(figsize=(12, 8))
@@ -112,8 +243,22 @@ def main():
     if args.output or args.save:
         matplotlib.use('Agg')
 
-    steps, colony_0_prefs, colony_1_prefs = load_stats_data(args.stats_file)
-    print(f"Loaded {len(steps)} data points")
+    if args.live:
+        rows = tail_live(args.live, args.points)
+        if args.output and rows:
+            steps = np.array([row['step'] for row in rows])
+            preferences = np.array([row['preference'][:2] for row in rows])
+            create_preference_plot(steps, preferences[:, 0], preferences[:, 1], args.title).savefig(
+                args.output, dpi=300, bbox_inches='tight')
+            print(f"Plot of the last {len(rows)} rows saved to: {args.output}")
+        return
+
+    if args.animate:
+        steps, colony_0_prefs, colony_1_prefs = load_stats_data(args.stats_file)  # One frame per row
+        print(f"Loaded {len(steps)} data points")
+    else:
+        steps, colony_0_prefs, colony_1_prefs, total = load_plot_data(args.stats_file, args.downsample, args.points)
+        print(f"Loaded {total} data points" + (f", plotting {len(steps)}" if len(steps) < total else ""))
     print(f"Simulation ran for {steps[-1]} steps")
     print(f"Final preferences - Colony 0: {colony_0_prefs[-1]:.4f}, Colony 1: {colony_1_prefs[-1]:.4f}")
 
@@ -124,17 +269,11 @@ def main():
         ylim_diff = (-1.1, 1.1)
 
         if args.save:
-            os.makedirs('stats-frames', exist_ok=True)
-            for i in range(1, len(steps)+1):
-                plt.close('all')
-                frame_steps = steps[:i]
-                frame_c0 = colony_0_prefs[:i]
-                frame_c1 = colony_1_prefs[:i]
-                frame_plot = create_preference_plot(frame_steps, frame_c0, frame_c1, args.title, xlim=xlim)
-                frame_path = f'stats-frames/frame_{i-1:06d}.png'
-                frame_plot.savefig(frame_path, dpi=150, bbox_inches='tight')
-                print(f"Saved {frame_path}")
-            print("Animation complete.")
+            # The figure is built once per worker and only the lines are redrawn per frame
+            count = render_animation(steps, colony_0_prefs, colony_1_prefs, args.title, 'stats-frames',
+                                     args.workers, args.frame_format, args.video_file)
+            where = args.video_file if resolve_format(args.frame_format) == 'ffmpeg' else 'stats-frames/'
+            print(f"Animation complete: {count} frames written to {where}")
             return
         else:
             # Interactive real-time animation
@@ -0,0 +1,105 @@
+"""
+Uniform-grid spatial index for fixed-radius neighbor queries.
+
+Items are bucketed into square cells of side `cell_size`; a query of radius
+r only visits the cells overlapping the query square instead of every item.
+Items are keyed by identity, so value-equal items (e.g. two Food tuples at
+the same spot) are tracked separately.
+"""
+
+import math
+
+# A cell's key is cx * CELL_STRIDE + cy; one int per indexed item takes far less memory than a tuple
+CELL_STRIDE = 1 << 32
+
+
+class SpatialGrid:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}   # cell key -> {id(item): (order, item)}
+        self.where = {}   # id(item) -> cell key
+        self.counter = 0
+
+    def __getstate__(self):
+        # id() keys do not survive pickling; store the entries by cell instead
+        entries = [(cell, order, item) for cell, bucket in self.cells.items() for order, item in bucket.values()]
+        return {'cell_size': self.cell_size, 'counter': self.counter, 'entries': entries}
+
+    def __setstate__(self, state):
+        self.__init__(state['cell_size'])
+        self.counter = state['counter']
+        for cell, order, item in state['entries']:
+            self.cells.setdefault(cell, {})[id(item)] = (order, item)
+            self.where[id(item)] = cell
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, item):
+        return id(item) in self.where
+
+    def cell_of(self, x, y):
+        """Return the key of the cell containing point (x, y)."""
+        return int(x // self.cell_size) * CELL_STRIDE + int(y // self.cell_size)
+
+    def keys_near(self, x, y, radius):
+        """Keys of the cells overlapping the square of `radius` around (x, y)."""
+        reach = int(math.ceil(radius / self.cell_size))
+        cy = int(y // self.cell_size)
+        for gx in range(int(x // self.cell_size) - reach, int(x // self.cell_size) + reach + 1):
+            column = gx * CELL_STRIDE + cy
+            yield from range(column - reach, column + reach + 1)
+
+    def insert(self, item, x, y, order=None):
+        """Add an item at (x, y). `order` sets its position in query results."""
+        if order is None:
+            order = self.counter
+            self.counter += 1
+        cell = self.cell_of(x, y)
+        self.cells.setdefault(cell, {})[id(item)] = (order, item)
+        self.where[id(item)] = cell
+
+    def remove(self, item):
+        """Remove an item; no-op if it is not indexed."""
+        cell = self.where.pop(id(item), None)
+        if cell is None:
+            return
+        bucket = self.cells[cell]
+        del bucket[id(item)]
+        if not bucket:
+            del self.cells[cell]
+
+    def move(self, item, x, y):
+        """Re-bucket an item after its position changed, keeping its order."""
+        key = id(item)
+        old = self.where.get(key)
+        if old is None:
+            return
+        new = self.cell_of(x, y)
+        if new == old:
+            return
+        bucket = self.cells[old]
+        entry = bucket.pop(key)
+        if not bucket:
+            del self.cells[old]
+        self.cells.setdefault(new, {})[key] = entry
+        self.where[key] = new
+
+    def query(self, x, y, radius):
+        """Return items in cells overlapping the query square, in insertion order.
+
+        This is a superset of the items within `radius`; callers still apply
+        their exact distance test.
+        """
+        reach = int(math.ceil(radius / self.cell_size))
+        cx, cy = int(x // self.cell_size), int(y // self.cell_size)
+        found = []
+        cells = self.cells
+        for gx in range(cx - reach, cx + reach + 1):
+            column = gx * CELL_STRIDE + cy
+            for key in range(column - reach, column + reach + 1):
+                bucket = cells.get(key)
+                if bucket:
+                    found.extend(bucket.values())
+        found.sort(key=lambda entry: entry[0])
+        return [item for _, item in found]
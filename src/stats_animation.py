@@ -0,0 +1,166 @@
+"""
+Frame renderer for `show_stats.py --animate --save`.
+
+The figure is laid out and drawn once, and everything beneath the data
+lines (axes, grid, ticks, titles) is cached as a background bitmap. Each
+frame restores that bitmap and draws only the preference lines for its
+prefix of the data, plus the artists an axes draws above them (reference
+lines, spines, legend), then reads the RGB pixels straight out of the Agg
+canvas. Frames are pixel-identical to a full redraw.
+
+Frames are split into contiguous chunks that a process pool renders in any
+order. Each worker builds its own copy of the figure once. PNG frames are
+encoded and written by the workers. With the ffmpeg format the pixels come
+back to the parent in frame order and are streamed to an ffmpeg process, so
+no stats-frames/*.png files are written at all.
+"""
+
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from frames import FrameWriter, encode_png, resolve_format
+
+
+class StatsAnimation:
+    """The two-panel preference figure, drawn once, with per-frame line updates."""
+
+    def __init__(self, steps, colony_0_prefs, colony_1_prefs, title, dpi=150):
+        self.steps = np.asarray(steps)
+        self.prefs = (np.asarray(colony_0_prefs), np.asarray(colony_1_prefs))
+        self.diff = self.prefs[0] - self.prefs[1]
+        self.figure = Figure(figsize=(12, 8), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        ax1, ax2 = self.figure.subplots(2, 1)
+        xlim = (0, self.steps[-1])
+
+        self.line_c0, = ax1.plot([], [], 'r-', linewidth=2, label='Colony 0 (Red)', alpha=0.8, animated=True)
+        self.line_c1, = ax1.plot([], [], 'k-', linewidth=2, label='Colony 1 (Black)', alpha=0.8, animated=True)
+        ax1.axhline(y=1.0, color='green', linestyle='--', alpha=0.3, label='Green food preference')
+        ax1.axhline(y=0.0, color='orange', linestyle='--', alpha=0.3, label='Orange food preference')
+        ax1.axhline(y=0.5, color='gray', linestyle=':', alpha=0.5, label='Neutral preference')
+        ax1.set_xlabel('Simulation Step')
+        ax1.set_ylabel('Food Preference')
+        ax1.set_title(f'{title} - Food Preferences')
+        legend_1 = ax1.legend()
+        ax1.grid(True, alpha=0.3)
+        ax1.set_ylim(-0.05, 1.05)
+        ax1.set_xlim(*xlim)
+
+        self.line_diff, = ax2.plot([], [], 'purple', linewidth=2, alpha=0.8, animated=True)
+        ax2.axhline(y=0, color='gray', linestyle=':', alpha=0.5)
+        ax2.axhline(y=0.9, color='red', linestyle='--', alpha=0.5, label='Divergence threshold')
+        ax2.axhline(y=-0.9, color='red', linestyle='--', alpha=0.5)
+        ax2.set_xlabel('Simulation Step')
+        ax2.set_ylabel('Preference Difference (Colony 0 - Colony 1)')
+        ax2.set_title('Preference Divergence')
+        legend_2 = ax2.legend()
+        ax2.grid(True, alpha=0.3)
+        ax2.set_ylim(-1.1, 1.1)
+        ax2.set_xlim(*xlim)
+        self.figure.tight_layout()
+
+        # Everything an axes draws from its data lines onwards (reference lines, spines, legend) goes on
+        # top of the cached background per frame, so frames match a full redraw of the figure
+        self.overlay = []
+        for axes, lines in ((ax1, (self.line_c0, self.line_c1)), (ax2, (self.line_diff,))):
+            order = sorted(axes.get_children(), key=lambda artist: artist.get_zorder())
+            first = min(order.index(line) for line in lines)
+            for artist in order[first:]:
+                if artist.get_visible():
+                    artist.set_animated(True)
+                    self.overlay.append((axes, artist))
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.width, self.height = self.canvas.get_width_height()
+
+    def __len__(self):
+        return len(self.steps)
+
+    def render(self, count):
+        """Packed RGB bytes of the frame showing the first `count` samples."""
+        self.line_c0.set_data(self.steps[:count], self.prefs[0][:count])
+        self.line_c1.set_data(self.steps[:count], self.prefs[1][:count])
+        self.line_diff.set_data(self.steps[:count], self.diff[:count])
+        self.canvas.restore_region(self.background)
+        for axes, artist in self.overlay:
+            axes.draw_artist(artist)
+        return np.asarray(self.canvas.buffer_rgba())[:, :, :3].tobytes()
+
+
+def frame_name(index):
+    return f'frame_{index:06d}.png'
+
+
+worker_animation = None
+
+
+def init_worker(steps, colony_0_prefs, colony_1_prefs, title, dpi):
+    """Pool initializer: build this worker's figure once."""
+    global worker_animation
+    worker_animation = StatsAnimation(steps, colony_0_prefs, colony_1_prefs, title, dpi)
+
+
+def render_chunk(task):
+    """Render frames [start, stop); write them as PNGs into frames_dir, or return their pixels if it is None."""
+    start, stop, frames_dir = task
+    animation = worker_animation
+    if frames_dir is None:
+        return [animation.render(i + 1) for i in range(start, stop)]
+    for i in range(start, stop):
+        with open(os.path.join(frames_dir, frame_name(i)), 'wb') as out:
+            out.write(encode_png(animation.render(i + 1), animation.width, animation.height))
+    return stop - start
+
+
+def render_animation(steps, colony_0_prefs, colony_1_prefs, title, frames_dir='stats-frames', workers=None,
+                     frame_format='png', video_file='stats.mp4', dpi=150, chunk_size=32, progress=sys.stdout):
+    """Render one frame per stats sample; return the number of frames written."""
+    frame_format = resolve_format(frame_format)
+    workers = workers or os.cpu_count() or 1
+    total = len(steps)
+    stream = frame_format == 'ffmpeg'
+    tasks = [(start, min(start + chunk_size, total), None if stream else frames_dir)
+             for start in range(0, total, chunk_size)]
+    init_args = (steps, colony_0_prefs, colony_1_prefs, title, dpi)
+
+    writer = None
+    if stream:
+        size = StatsAnimation(*init_args)  # Only for the frame size ffmpeg needs up front
+        writer = FrameWriter(frames_dir, size.width, size.height, 'ffmpeg', video_file=video_file)
+    else:
+        os.makedirs(frames_dir, exist_ok=True)
+
+    done = 0
+    if workers == 1:
+        init_worker(*init_args)
+        results = map(render_chunk, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes=workers, initializer=init_worker, initargs=init_args)
+        # Chunks may finish in any order; streamed pixels must still reach the encoder in frame order
+        results = pool.imap(render_chunk, tasks) if stream else pool.imap_unordered(render_chunk, tasks)
+    try:
+        for result in results:
+            if stream:
+                for pixels in result:
+                    writer.submit(frame_name(done), pixels)
+                    done += 1
+            else:
+                done += result
+            if progress is not None:
+                progress.write(f"\rRendered {done}/{total} frames")
+                progress.flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if writer is not None:
+            writer.close()
+    if progress is not None:
+        progress.write("\n")
+    return done
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Parallel (num_ants, num_food) parameter sweep.
+
+Runs every grid cell in a pool of long-lived worker processes, each of which
+imports the simulation once and then executes many runs back-to-back. Results
+travel back to the parent over the pool, which is the only writer of
+results.txt, and a progress line with an ETA is printed as runs complete.
+With --results_db the parent also stores each run in a SQLite database (in
+batches) and skips seeded runs that are already recorded there.
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from colony import Simulation, SimulationConfig
+import results_db
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run an ant colony parameter sweep in parallel")
+    parser.add_argument('--ants', type=int, nargs=3, default=[1, 100, 1], metavar=('START', 'END', 'STEP'),
+                        help='Inclusive range of --num_ants values (default: 1 100 1)')
+    parser.add_argument('--food', type=int, nargs=3, default=[1, 100, 1], metavar=('START', 'END', 'STEP'),
+                        help='Inclusive range of --num_food values (default: 1 100 1)')
+    parser.add_argument('--repeats', type=int, default=1, help='Runs per grid cell (default: 1)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: number of cores)')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Runs handed to a worker at a time (default: chosen from the task count)')
+    parser.add_argument('--engine', choices=['reference', 'numpy'], default='reference',
+                        help='Simulation engine (default: reference)')
+    parser.add_argument('--max_steps', type=int, default=None, help='Override the per-run step limit')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Base seed; run i uses seed + i (default: unseeded)')
+    parser.add_argument('--plateau_window', type=int, default=0,
+                        help='End runs early once they stop drifting, judged over windows of this many steps (default: 0, off)')
+    parser.add_argument('--plateau_windows', type=int, default=5,
+                        help='Consecutive windows without drift before a run counts as stuck (default: 5)')
+    parser.add_argument('--plateau_tolerance', type=float, default=0.05,
+                        help='Allowed spread of window-mean colony preferences (default: 0.05)')
+    parser.add_argument('--plateau_population_tolerance', type=float, default=0.1,
+                        help='Allowed spread of window-mean colony populations, relative (default: 0.1)')
+    parser.add_argument('--plateau_record_only', action='store_true', default=False,
+                        help='Run to completion but log the step the detector would have stopped at')
+    parser.add_argument('--results_file', default='results.txt',
+                        help='File the results are appended to (default: results.txt)')
+    parser.add_argument('--results_db', default=None,
+                        help='Also store runs in this SQLite database and skip seeded runs already in it (default: off)')
+    parser.add_argument('--timings_file', default='sweep_timings.csv',
+                        help='Per-run wall-time log (default: sweep_timings.csv)')
+    return parser.parse_args(argv)
+
+
+def build_tasks(ants_range, food_range, repeats=1, engine='reference', max_steps=None, seed=None, settings=None):
+    """Return one SimulationConfig per run of the sweep; `settings` sets further config fields."""
+    tasks = []
+    for ants in range(ants_range[0], ants_range[1] + 1, ants_range[2]):
+        for food in range(food_range[0], food_range[1] + 1, food_range[2]):
+            for _ in range(repeats):
+                config = SimulationConfig(num_ants=ants, num_food=food, engine=engine, **(settings or {}))
+                if max_steps is not None:
+                    config.max_steps = max_steps
+                if seed is not None:
+                    config.seed = seed + len(tasks)
+                tasks.append(config)
+    return tasks
+
+
+def skip_recorded(tasks, store):
+    """Drop tasks whose run (same parameters, seed and code) is already in the store."""
+    hashes = [results_db.run_hash(t) for t in tasks]
+    recorded = store.recorded(hashes)
+    if recorded:
+        print(f"Skipping {sum(h in recorded for h in hashes)} runs already in {store.path}")
+    return [t for t, h in zip(tasks, hashes) if h not in recorded]
+
+
+def default_chunksize(num_tasks, workers):
+    """Small chunks so a few 500k-step runs cannot leave one worker with a long tail."""
+    return max(1, min(16, num_tasks // (workers * 32)))
+
+
+def run_one(config):
+    """Worker entry point: run one simulation and time it end to end."""
+    start = time.perf_counter()
+    result = Simulation(config).run()
+    return result, time.perf_counter() - start
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+
+def run_sweep(tasks, workers, chunksize=None, on_result=None, progress=sys.stdout, shuffle=True, pool=None):
+    """Run all tasks in a process pool and return [(result, wall_time)] in completion order.
+
+    Long runs cluster in parameter space, so tasks are shuffled (with a fixed
+    seed) before dispatch to spread them across chunks and workers. Pass
+    shuffle=False to dispatch them in the given order instead. Pass a running
+    `pool` to reuse its workers across calls; it is left open.
+    """
+    if chunksize is None:
+        chunksize = default_chunksize(len(tasks), workers)
+    order = list(range(len(tasks)))
+    if shuffle:
+        random.Random(0).shuffle(order)
+    shuffled = [tasks[i] for i in order]
+
+    outcomes = []
+    start = time.perf_counter()
+    owned = pool is None
+    with multiprocessing.Pool(processes=workers) if owned else contextlib.nullcontext(pool) as pool:
+        for result, wall_time in pool.imap_unordered(run_one, shuffled, chunksize=chunksize):
+            outcomes.append((result, wall_time))
+            if on_result is not None:
+                on_result(result, wall_time)
+            if progress is not None:
+                done = len(outcomes)
+                elapsed = time.perf_counter() - start
+                eta = elapsed / done * (len(tasks) - done)
+                progress.write(f"\r[{done}/{len(tasks)}] {done / elapsed:.2f} runs/s, "
+                               f"last {result.num_ants} ants/{result.num_food} food: {result.steps} steps in {wall_time:.2f}s, "
+                               f"elapsed {format_duration(elapsed)}, ETA {format_duration(eta)}   ")
+                progress.flush()
+        if owned:
+            # Let workers exit on their own; terminate() can hang on workers that initialized SDL
+            pool.close()
+            pool.join()
+    if progress is not None:
+        progress.write("\n")
+    return outcomes
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    plateau = {name: getattr(args, name) for name in ('plateau_window', 'plateau_windows', 'plateau_tolerance',
+                                                      'plateau_population_tolerance', 'plateau_record_only')}
+    tasks = build_tasks(args.ants, args.food, args.repeats, args.engine, args.max_steps, args.seed, plateau)
+    store = None
+    if args.results_db:
+        store = results_db.ResultStore(args.results_db, source='sweep')
+        tasks = skip_recorded(tasks, store)
+    print(f"Running {len(tasks)} simulations on {args.workers} workers")
+    # Runs of one sweep share every setting but the cell and seed
+    configs = {(t.num_ants, t.num_food, t.seed): t for t in tasks}
+
+    with open(args.results_file, 'a') as results_out, open(args.timings_file, 'a') as timings_out:
+        if timings_out.tell() == 0:
+            timings_out.write("num_ants,num_food,seed,steps,wall_time,outcome,plateau_step\n")
+
+        def record(result, wall_time):
+            results_out.write(result.csv_line() + "\n")
+            results_out.flush()
+            plateau_step = '' if result.plateau_step is None else result.plateau_step
+            timings_out.write(f"{result.num_ants},{result.num_food},{result.seed},{result.steps},{wall_time:.4f},"
+                              f"{result.outcome},{plateau_step}\n")
+            if store is not None:
+                store.add(result, configs[(result.num_ants, result.num_food, result.seed)], wall_time)
+
+        start = time.perf_counter()
+        try:
+            outcomes = run_sweep(tasks, args.workers, args.chunksize, on_result=record)
+        finally:
+            if store is not None:
+                store.close()
+
+    total = time.perf_counter() - start
+    cpu = sum(wall for _, wall in outcomes)
+    print(f"All {len(outcomes)} scatter experiments complete in {format_duration(total)} "
+          f"({cpu:.1f}s of run time, {cpu / max(total, 1e-9):.1f}x parallel speedup).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Columnar per-step telemetry with bounded memory.
+
+A TelemetryRecorder keeps preallocated NumPy columns (step, deaths, food
+count, and per-colony preference and population) and fills one row every
+`interval` steps. When the columns are full it either grows them, overwrites
+the oldest rows ('ring'), or drops every other row and doubles the interval
+('decimate', which keeps the whole run at a coarser resolution). save()
+writes the columns to an uncompressed .npz file that show_stats.py loads
+directly, or memory-maps for runs too long to read into memory.
+"""
+
+import struct
+import zipfile
+
+import numpy as np
+
+MODES = ('grow', 'ring', 'decimate')
+COLUMNS = ('step', 'deaths', 'food', 'preference', 'population')
+
+
+class TelemetryRecorder:
+    """Preallocated telemetry columns sampled every `interval` steps."""
+
+    def __init__(self, n_colonies, interval=100, capacity=4096, mode='grow'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown telemetry mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.n_colonies = n_colonies
+        self.interval = max(1, interval)
+        self.capacity = max(2, capacity)
+        self.mode = mode
+        self.count = 0  # Rows recorded so far (for 'ring', may exceed capacity)
+        self.step = np.zeros(self.capacity, dtype=np.int64)
+        self.deaths = np.zeros(self.capacity, dtype=np.int64)
+        self.food = np.zeros(self.capacity, dtype=np.int64)
+        self.preference = np.zeros((self.capacity, n_colonies), dtype=np.float64)
+        self.population = np.zeros((self.capacity, n_colonies), dtype=np.int64)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def record(self, step, preferences, populations, deaths, food):
+        """Store one row if `step` falls on the sampling interval."""
+        if step % self.interval:
+            return
+        if self.count >= self.capacity and self.mode != 'ring':
+            if self.mode == 'grow':
+                self.resize(2 * self.capacity)
+            else:
+                self.decimate()
+                if step % self.interval:
+                    return
+        row = self.count % self.capacity
+        self.step[row] = step
+        self.deaths[row] = deaths
+        self.food[row] = food
+        self.preference[row] = preferences
+        self.population[row] = populations
+        self.count += 1
+
+    def resize(self, capacity):
+        for name in COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+        self.capacity = capacity
+
+    def decimate(self):
+        """Keep the rows on a doubled interval, halving the resolution in place."""
+        self.interval *= 2
+        keep = np.flatnonzero(self.step[:self.count] % self.interval == 0)
+        for name in COLUMNS:
+            column = getattr(self, name)
+            column[:len(keep)] = column[keep]
+        self.count = len(keep)
+
+    def data(self):
+        """Recorded columns in step order, trimmed to the filled rows."""
+        n = len(self)
+        if self.mode == 'ring' and self.count > self.capacity:
+            order = np.roll(np.arange(n), -(self.count % self.capacity))
+        else:
+            order = np.arange(n)
+        data = {name: getattr(self, name)[order] for name in COLUMNS}
+        data['interval'] = np.int64(self.interval)
+        return data
+
+    def save(self, path):
+        """Write the columns to a .npz file."""
+        np.savez(path, **self.data())
+
+
+def load(path, mmap=False):
+    """Load a telemetry file written by TelemetryRecorder.save() as a dict of arrays.
+
+    With mmap=True the columns are memory-mapped from the file instead of read.
+    """
+    if mmap:
+        return map_npz(path)
+    with np.load(path) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def map_npz(path):
+    """Memory-map the arrays stored uncompressed in a .npz file; compressed or scalar members are read."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type == zipfile.ZIP_STORED:
+                # Skip the zip local file header to the start of the .npy data
+                f.seek(info.header_offset + 26)
+                name_length, extra_length = struct.unpack('<HH', f.read(4))
+                f.seek(name_length + extra_length, 1)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+                if shape and not dtype.hasobject:
+                    arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                             order='F' if fortran else 'C')
+                    continue
+            with archive.open(info) as member:
+                arrays[name] = np.lib.format.read_array(member)
+    return arrays
@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the src directory to the path so we can import the adaptive_sweep module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from adaptive_sweep import AdaptivePlanner, main, run_adaptive, wilson_lower
+from colony import SimulationConfig, SimulationResult
+
+
+def fake_batch(truth, noisy_first_run=False):
+    """run_batch stand-in whose outcome is a function of (ants, food).
+
+    With noisy_first_run, the first run at every odd ant count times out.
+    """
+    calls = []
+
+    def run_batch(configs):
+        outcomes = []
+        for config in configs:
+            first = all((c.num_ants, c.num_food) != (config.num_ants, config.num_food) for c in calls)
+            calls.append(config)
+            outcome = truth(config.num_ants, config.num_food)
+            if noisy_first_run and first and config.num_ants % 2:
+                outcome = 'timeout'
+            alive = outcome != 'extinction'
+            result = SimulationResult(config.num_ants, config.num_food, 100, alive, True, 0.5, 0.5, 0, 0.01,
+                                      seed=config.seed, outcome=outcome)
+            outcomes.append((result, config.num_ants / 1000))
+        return outcomes
+    return run_batch, calls
+
+
+def make_config(values):
+    def make(i, j, run_index):
+        return SimulationConfig(num_ants=values[i], num_food=values[j], seed=run_index)
+    return make
+
+
+def boundary(ants, food):
+    return 'divergence' if ants > food else 'extinction'
+
+
+class TestAdaptivePlanner(unittest.TestCase):
+    """Test cases for the adaptive sweep planner."""
+
+    def test_wilson_lower(self):
+        self.assertEqual(wilson_lower(0, 0, 1.0), 0.0)
+        self.assertLess(wilson_lower(1, 1, 1.2816), 0.5)
+        self.assertGreater(wilson_lower(2, 2, 1.2816), 0.5)
+        self.assertLess(wilson_lower(2, 3, 1.2816), 0.5)
+
+    def test_map_matches_truth_with_fewer_runs(self):
+        values = list(range(1, 41))
+        planner = AdaptivePlanner(values, values, coarse=8, confidence=0.9, min_repeats=1, max_repeats=3)
+        run_batch, calls = fake_batch(boundary)
+        total = run_adaptive(planner, make_config(values), run_batch, log=None)
+        cells = planner.outcome_map()
+        self.assertEqual(len(cells), 40 * 40)
+        for (i, j), (outcome, line, _) in cells.items():
+            self.assertEqual(outcome, boundary(values[i], values[j]))
+            self.assertEqual(line.split(',')[:2], [str(values[i]), str(values[j])])
+        self.assertEqual(total, len(calls))
+        self.assertLess(total, 40 * 40 // 2)  # Under half of one run per cell; the planner needs about 600
+
+    def test_replicates_until_confident(self):
+        """Points with disagreeing replicates get up to max_repeats runs."""
+        values = list(range(1, 6))
+        planner = AdaptivePlanner(values, values, coarse=4, confidence=0.9, max_repeats=5)
+        run_batch, calls = fake_batch(lambda a, f: 'divergence', noisy_first_run=True)
+        run_adaptive(planner, make_config(values), run_batch, log=None)
+        counts = [len(runs) for runs in planner.runs.values()]
+        self.assertTrue(all(2 <= n <= 5 for n in counts))
+        self.assertGreater(max(counts), 2)
+        self.assertTrue(all(planner.majority(p)[0] == 'divergence' for p in planner.runs))
+
+    def test_longest_expected_first(self):
+        values = list(range(1, 10))
+        planner = AdaptivePlanner(values, values, coarse=4)
+        run_batch, calls = fake_batch(boundary)
+        run_adaptive(planner, make_config(values), run_batch, log=None)
+        first_round = calls[:9]
+        self.assertEqual([c.num_ants for c in first_round], sorted((c.num_ants for c in first_round), reverse=True))
+
+    def test_main_runs_every_round_in_one_pool(self):
+        """A real sweep writes every run and one map line per grid cell."""
+        with tempfile.TemporaryDirectory() as tmp:
+            results, map_file = os.path.join(tmp, 'results.txt'), os.path.join(tmp, 'map.txt')
+            main(['--ants', '2', '6', '1', '--food', '1', '5', '1', '--coarse', '2', '--max_steps', '30',
+                  '--max_repeats', '2', '--workers', '2', '--seed', '1', '--results_file', results,
+                  '--map_file', map_file])
+            with open(map_file) as f:
+                self.assertEqual(len(f.read().splitlines()), 25)
+            with open(results) as f:
+                self.assertGreaterEqual(len(f.read().splitlines()), 9)  # At least the coarse lattice
+
+
+if __name__ == '__main__':
+    unittest.main()
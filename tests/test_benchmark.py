@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add the src directory to the path so we can import the benchmark module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import benchmark
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases for the benchmark suite."""
+
+    def test_matrix(self):
+        cases = benchmark.build_cases([10, 100], [1, 5], ['dummy', 'files'], ['reference'], steps=50, seeds=2)
+        self.assertEqual(len(cases), 8)
+        self.assertEqual(len({benchmark.case_name(c) for c in cases}), 8)
+
+    def test_scaling_cases_keep_density(self):
+        cases = benchmark.scaling_cases(['numpy'], steps=5, seeds=1, colonies=8, sides=(500, 1000))
+        self.assertEqual([c['num_ants'] for c in cases], [benchmark.SCALING_ANTS // 4, benchmark.SCALING_ANTS])
+        self.assertAlmostEqual(cases[1]['num_food'] / cases[0]['num_food'], 4, delta=0.2)
+        self.assertTrue(benchmark.case_name(cases[0]).endswith('/colonies=8/world=500x500'))
+
+    def test_strong_scaling_cases(self):
+        self.assertEqual(benchmark.tile_counts(1), [1])
+        self.assertEqual(benchmark.tile_counts(6), [1, 2, 4, 6])
+        cases = benchmark.strong_scaling_cases(steps=5, seeds=1, max_tiles=2)
+        self.assertEqual([(c['engine'], c.get('tiles')) for c in cases], [('numpy', None), ('tiled', 1), ('tiled', 2)])
+        self.assertEqual(len({benchmark.case_name(c) for c in cases}), 3)
+        rows = benchmark.speedups([dict(c, name=benchmark.case_name(c), steps_per_sec=s)
+                                   for c, s in zip(cases, (10, 8, 15))])
+        self.assertEqual([(tiles, round(speedup, 2), round(efficiency, 2)) for _, tiles, speedup, efficiency in rows],
+                         [(1, 0.8, 0.8), (2, 1.5, 0.75)])
+
+    def test_event_cases(self):
+        cases = benchmark.event_cases(steps=5, seeds=1, worlds=((None, 20, 5, 2), (2000, 100, 10, 4)))
+        self.assertEqual([c.get('events', False) for c in cases], [False, True, False, True])
+        self.assertEqual(benchmark.case_name(cases[3]),
+                         'reference/dummy/ants=100/food=10/colonies=4/world=2000x2000/events')
+        results = [benchmark.measure(c) for c in cases[:2]]
+        self.assertEqual(results[0]['total_steps'], results[1]['total_steps'])
+        rows = benchmark.event_speedups([dict(c, name=benchmark.case_name(c), steps_per_sec=s)
+                                         for c, s in zip(cases, (10, 5, 10, 25))])
+        self.assertEqual([(name, round(speedup, 2)) for name, speedup in rows],
+                         [(benchmark.case_name(cases[0]), 0.5), (benchmark.case_name(cases[2]), 2.5)])
+
+    def test_memory_cases(self):
+        cases = benchmark.memory_cases(['reference', 'numpy'], [100, 400], colonies=4)
+        self.assertEqual(len({benchmark.case_name(c) for c in cases}), 4)
+        self.assertEqual([c['width'] for c in cases[:2]], [benchmark.WIDTH, 1265])  # Never below the default
+        results = [benchmark.measure_memory(c) for c in cases[1::2]]
+        self.assertLess(results[1]['bytes_per_ant'], results[0]['bytes_per_ant'])  # Arrays beat objects
+        self.assertGreater(results[1]['bytes_per_ant'], 0)
+        self.assertIn('bytes/ant', benchmark.format_result(results[0]))
+        json.dumps(results)
+
+    def test_measure_reports_throughput_latency_and_memory(self):
+        case = benchmark.build_cases([6], [3], ['dummy'], ['reference'], steps=25, seeds=2)[0]
+        result = benchmark.measure(case)
+        self.assertEqual(result['runs'], 2)
+        self.assertLessEqual(result['total_steps'], 50)
+        self.assertGreater(result['steps_per_sec'], 0)
+        latency = result['latency_ms']
+        self.assertTrue(0 < latency['p50'] <= latency['p90'] <= latency['p99'] <= latency['max'])
+        self.assertGreater(result['peak_rss_mb'], 0)
+        json.dumps(result)  # Must be JSON-serializable
+
+    def test_compare_flags_regressions(self):
+        def case(name, speed, rss):
+            return {'name': name, 'steps_per_sec': speed, 'peak_rss_mb': rss}
+        baseline = {'cases': [case('a', 100, 50), case('b', 100, 50), case('c', 100, 50)]}
+        rows = benchmark.compare([case('a', 95, 50), case('b', 70, 50), case('c', 100, 80), case('new', 1, 1)],
+                                 baseline, tolerance=0.1)
+        self.assertEqual([(name, regressed) for name, _, _, regressed in rows],
+                         [('a', False), ('b', True), ('c', True)])
+
+    def test_main_writes_json_and_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'current.json')
+            argv = ['--ants', '4', '--food', '2', '--modes', 'dummy', '--steps', '10', '--seeds', '1',
+                    '--min_seconds', '0', '--output', output]
+            benchmark.main(argv)
+            with open(output) as f:
+                report = json.load(f)
+            self.assertEqual([c['name'] for c in report['cases']], ['reference/dummy/ants=4/food=2'])
+            report['cases'][0]['steps_per_sec'] *= 100  # Pretend the baseline was much faster
+            baseline = os.path.join(tmp, 'baseline.json')
+            with open(baseline, 'w') as out:
+                json.dump(report, out)
+            with self.assertRaises(SystemExit):
+                benchmark.main(argv[:-2] + ['--baseline', baseline])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the src directory to the path so we can import the colony module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import checkpoint
+from colony import Simulation, SimulationConfig
+
+
+class TestCheckpoint(unittest.TestCase):
+    """Test cases for checkpoint, resume and fork."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'checkpoint.pkl.gz')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def split_run(self, **overrides):
+        """Run 700 steps straight and as 300 + checkpoint + resume; return both results."""
+        config = dict(seed=11, max_steps=700, stop_on_divergence=False, stats=True,
+                      stats_interval=50, stats_file=os.path.join(self.tmp.name, 'stats.npz'), **overrides)
+        straight = Simulation(SimulationConfig(**config))
+        straight.run()
+        first = Simulation(SimulationConfig(**config))
+        for _ in range(300):
+            first.step()
+        first.save_checkpoint(self.path)
+        resumed = Simulation.resume(self.path)
+        self.assertEqual(resumed.current_step, 300)
+        resumed.run()
+        return straight, resumed
+
+    def assert_same_run(self, a, b):
+        self.assertEqual(a.result.csv_line(), b.result.csv_line())
+        self.assertEqual(a.result.colony_a_preference, b.result.colony_a_preference)
+        self.assertEqual(a.result.colony_b_preference, b.result.colony_b_preference)
+        self.assertEqual(a.result.death_count, b.result.death_count)
+        self.assertEqual(a.telemetry.data()['population'].tolist(), b.telemetry.data()['population'].tolist())
+
+    def test_resume_reference_is_exact(self):
+        straight, resumed = self.split_run()
+        self.assert_same_run(straight, resumed)
+        self.assertEqual([(a.x, a.y, a.life) for a in straight.board.all_ants()],
+                         [(a.x, a.y, a.life) for a in resumed.board.all_ants()])
+
+    def test_resume_numpy_is_exact(self):
+        straight, resumed = self.split_run(engine='numpy')
+        self.assert_same_run(straight, resumed)
+        self.assertTrue((straight.engine.x == resumed.engine.x).all())
+
+    def test_fork_reseeds_and_overrides(self):
+        simulation = Simulation(SimulationConfig(seed=3, max_steps=400, stop_on_divergence=False))
+        for _ in range(200):
+            simulation.step()
+        simulation.save_checkpoint(self.path)
+        overrides = checkpoint.parse_overrides(SimulationConfig(), ['learning_rate=0.05,0.2', 'max_steps=300'], 1)
+        self.assertEqual(overrides, {'learning_rate': 0.2, 'max_steps': 300})
+        fork = Simulation.resume(self.path, seed=99, overrides=overrides, variant=1)
+        self.assertEqual((fork.config.seed, fork.board.config.learning_rate), (99, 0.2))
+        self.assertTrue(fork.config.stats_file.endswith('stats_fork1.npz'))
+        result = fork.run()
+        self.assertLessEqual(result.steps, 300)
+        self.assertEqual(result.seed, 99)
+        with self.assertRaises(ValueError):
+            checkpoint.parse_overrides(SimulationConfig(), ['num_ants=5'])
+
+    def test_overrides_use_the_declared_types(self):
+        """Values convert to the field's declared type, not that of its default."""
+        self.assertIsInstance(SimulationConfig().ant_speed, int)  # Declared float
+        overrides = checkpoint.parse_overrides(SimulationConfig(), ['ant_speed=7.5', 'stats=Yes', 'profile=0'])
+        self.assertEqual(overrides, {'ant_speed': 7.5, 'stats': True, 'profile': False})
+        with self.assertRaises(ValueError):
+            checkpoint.parse_overrides(SimulationConfig(), ['stats=maybe'])
+
+
+if __name__ == '__main__':
+    unittest.main()
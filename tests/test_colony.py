@@ -1,26 +1,200 @@
 import unittest
 import sys
 import os
+import pickle
+import tempfile
 
 # Add the src directory to the path so we can import the colony module
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import numpy as np
+
+from colony import Board, PlateauDetector, Simulation, SimulationConfig, colony_layout, run_outcome, wanted_state
+from colors import COLOR_RED
+
+
 class TestColony(unittest.TestCase):
     """Test cases for the Colony class."""
-    
+
     def setUp(self):
         """Set up test fixtures."""
-        pass
-    
+        self.board = Board(SimulationConfig(seed=1))
+        self.colony = self.board.spawn_colony((100, 100), COLOR_RED, 5)
+
     def test_colony_initialization(self):
         """Test that a colony can be initialized."""
-        # Add your test here
-        pass
-    
+        self.assertTrue(self.colony.is_alive)
+        self.assertEqual(self.colony.food_preference, 0.5)
+        self.assertEqual(self.colony.ants, [])
+        self.assertIs(self.board.colonies[0], self.colony)
+
     def test_ant_spawning(self):
         """Test that ants can be spawned."""
-        # Add your test here
-        pass
+        for _ in range(7):
+            self.colony.spawn_ant()
+        self.assertEqual(len(self.colony.ants), 5)  # Capped at capacity
+        ant = self.colony.ants[0]
+        self.assertEqual((ant.x, ant.y), (100, 100))
+        self.assertTrue(ant.is_alive)
+        self.colony.spawn_ant(1.7)
+        self.assertEqual(len(self.colony.ants), 5)
+
+    def test_running_aggregates(self):
+        """Population and preference statistics track spawns and deaths."""
+        colony = self.board.spawn_colony((300, 300), COLOR_RED, 100)
+        preferences = [i / 40 for i in range(40)]
+        for p in preferences:
+            colony.spawn_ant(p)
+        for ant in list(colony.ants)[::3]:
+            ant.die()
+            preferences.remove(ant.food_preference)
+        colony.refresh()
+        self.assertEqual(colony.population, len(preferences))
+        self.assertEqual(sorted(ant.food_preference for ant in colony.ants), preferences)
+        self.assertEqual([ant.index for ant in colony.ants], list(range(colony.population)))
+        mean = sum(preferences) / len(preferences)
+        self.assertAlmostEqual(colony.food_preference, mean)
+        self.assertAlmostEqual(colony.preference_variance,
+                               sum((p - mean) ** 2 for p in preferences) / len(preferences))
+        self.assertEqual(colony.preference_min, min(preferences))
+        self.assertEqual(colony.preference_max, max(preferences))
+        for ant in list(colony.ants):
+            ant.die()
+        self.assertFalse(colony.is_alive)
+        self.assertIsNone(colony.preference_min)
+
+    def test_compact_objects_pickle(self):
+        """Ants and colonies carry no __dict__ and pickle round-trip."""
+        self.colony.spawn_ant(0.3)
+        ant = self.colony.ants[0]
+        self.assertFalse(hasattr(ant, '__dict__') or hasattr(self.colony, '__dict__'))
+        board = pickle.loads(pickle.dumps(self.board))
+        copy = board.colonies[0].ants[0]
+        self.assertEqual((copy.x, copy.y, copy.food_preference, copy.order), (ant.x, ant.y, 0.3, ant.order))
+        self.assertIs(copy.colony, board.colonies[0])
+
+
+class TestSimulation(unittest.TestCase):
+    """Test cases for the Simulation API."""
+
+    def run_once(self, **overrides):
+        config = SimulationConfig(seed=5, max_steps=400, **overrides)
+        return Simulation(config).run()
+
+    def test_runs_are_reproducible_back_to_back(self):
+        """Two runs with the same seed in one process give the same result."""
+        first = self.run_once()
+        second = self.run_once()
+        self.assertEqual(first.csv_line(), second.csv_line())
+        self.assertEqual(first.colony_a_preference, second.colony_a_preference)
+        self.assertEqual(first.death_count, second.death_count)
+
+    def test_interleaved_runs_are_independent(self):
+        """Stepping two simulations alternately matches running them alone."""
+        alone = self.run_once(num_ants=20, num_food=30)
+        a = Simulation(SimulationConfig(seed=5, max_steps=400, num_ants=20, num_food=30))
+        b = Simulation(SimulationConfig(seed=9, max_steps=400))
+        while a.step():
+            b.step()
+        self.assertEqual(a.result.csv_line(), alone.csv_line())
+        self.assertEqual(a.result.colony_b_preference, alone.colony_b_preference)
+
+    def test_result_record(self):
+        """A finished run reports its parameters, steps and colony status."""
+        result = self.run_once(num_ants=10, num_food=5)
+        self.assertEqual((result.num_ants, result.num_food), (10, 5))
+        self.assertLessEqual(result.steps, 400)
+        self.assertEqual(result.csv_line().split(',')[:2], ['10', '5'])
+
+    def test_brute_force_matches_grid_until_first_death(self):
+        """Both neighbor-search paths give identical runs while nobody dies."""
+        grid = self.run_once(initial_life=10 ** 9, num_ants=60, num_food=60)
+        brute = self.run_once(initial_life=10 ** 9, num_ants=60, num_food=60, neighbor_search='brute')
+        self.assertEqual(grid.death_count, 0)
+        self.assertEqual(grid.csv_line(), brute.csv_line())
+        self.assertEqual(grid.colony_a_preference, brute.colony_a_preference)
+        self.assertEqual(grid.colony_b_preference, brute.colony_b_preference)
+
+    def test_headless_runs_do_not_render(self):
+        """Dummy runs have no surface; files runs only write the sampled frames."""
+        self.assertIsNone(Simulation(SimulationConfig(seed=5)).screen)
+        with tempfile.TemporaryDirectory() as frames_dir:
+            self.run_once(output_mode='files', frames_dir=frames_dir, frame_interval=150,
+                          stop_on_divergence=False, initial_life=10 ** 9)
+            self.assertEqual(sorted(os.listdir(frames_dir)),
+                             ['final_frame.png', 'frame_000000.png', 'frame_000001.png', 'frame_000002.png'])
+
+
+class TestColonies(unittest.TestCase):
+    """Test cases for runs with any number of colonies."""
+
+    def test_layout(self):
+        """Colonies spread over the world with ants split evenly; two colonies keep their usual spots."""
+        layout = colony_layout(SimulationConfig(num_ants=23, num_colonies=5, width=1000, height=500))
+        positions = [pos for pos, _ in layout]
+        self.assertEqual(len(set(positions)), 5)
+        self.assertTrue(all(0 < x < 1000 and 0 < y < 500 for x, y in positions))
+        self.assertEqual([capacity for _, capacity in layout], [5, 5, 5, 4, 4])
+        default = SimulationConfig(num_ants=7)
+        self.assertEqual(colony_layout(default), [(default.colony_a_pos, 4), (default.colony_b_pos, 3)])
+        given = ((10, 10), (20, 20), (30, 30))
+        self.assertEqual([pos for pos, _ in colony_layout(SimulationConfig(num_colonies=3, colony_positions=given))],
+                         list(given))
+        with self.assertRaises(ValueError):
+            colony_layout(SimulationConfig(num_colonies=4, colony_positions=given))
+        with self.assertRaises(ValueError):
+            colony_layout(SimulationConfig(num_colonies=1))
+
+    def test_divergence_criterion(self):
+        """Every living colony is committed and both colors are taken."""
+        self.assertTrue(wanted_state([0.99, 0.01, 0.98]))
+        self.assertFalse(wanted_state([0.99, 0.5, 0.01]))
+        self.assertTrue(wanted_state([0.99, 0.5, 0.01], alive=[True, False, True]))
+        self.assertFalse(wanted_state([0.99, 0.97, 0.98]))
+        preferences = np.array([[0.99, 0.99], [0.01, 0.5], [0.02, 0.01]])
+        self.assertEqual(list(wanted_state(preferences)), [True, False])
+        self.assertEqual(run_outcome([True, False, True], False, False), '')
+        self.assertEqual(run_outcome([True, False, False], False, False), 'extinction')
+
+    def test_many_colony_runs(self):
+        """Both engines run N colonies and report each of them."""
+        for engine in ('reference', 'numpy'):
+            result = Simulation(SimulationConfig(seed=2, num_ants=60, num_food=30, num_colonies=4, width=1200,
+                                                 height=900, max_steps=300, engine=engine)).run()
+            self.assertEqual((result.num_colonies, len(result.colonies_alive), len(result.colony_preferences)),
+                             (4, 4, 4))
+            self.assertEqual(result.colonies_alive[:2], (result.colony_a_alive, result.colony_b_alive))
+            flags = result.csv_line().split(',')[5]
+            self.assertEqual(flags, 'alive=' + ''.join(str(int(a)) for a in result.colonies_alive))
+            self.assertTrue(result.steps == 300 or sum(result.colonies_alive) < 2
+                            or wanted_state(result.colony_preferences, result.colonies_alive))
+
+
+class TestPlateauDetector(unittest.TestCase):
+    """Test cases for early stopping of stuck runs."""
+
+    def test_fires_only_after_enough_quiet_windows(self):
+        detector = PlateauDetector(window=10, windows=3, tolerance=0.05, population_tolerance=0.1)
+        fired = [detector.update([0.5 + 0.01 * (i % 3), 0.4], [20, 20 + i % 2]) for i in range(60)]
+        self.assertEqual(fired.index(True), 39)  # Fourth window is the first with three predecessors
+
+    def test_drift_keeps_run_going(self):
+        detector = PlateauDetector(window=10, windows=3, tolerance=0.05)
+        self.assertFalse(any(detector.update([i / 100, 0.5], [20, 20]) for i in range(100)))
+        detector = PlateauDetector(window=10, windows=3, population_tolerance=0.1)
+        self.assertFalse(any(detector.update([0.5, 0.5], [20, 10 + i // 10]) for i in range(100)))
+
+    def test_early_stop_matches_record_only_run(self):
+        """The step a stopped run ends at is where a record-only run saw the plateau."""
+        settings = dict(seed=3, num_ants=40, num_food=60, max_steps=4000, plateau_window=200,
+                        plateau_windows=3, plateau_tolerance=0.3)
+        full = Simulation(SimulationConfig(plateau_record_only=True, **settings)).run()
+        early = Simulation(SimulationConfig(**settings)).run()
+        self.assertIsNotNone(full.plateau_step)
+        self.assertEqual(full.outcome, 'timeout')
+        self.assertEqual((early.steps, early.outcome), (full.plateau_step, 'plateau'))
+        self.assertTrue(early.csv_line().endswith(',1,1,plateau'))
+
 
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main()
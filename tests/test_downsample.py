@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Add the src directory to the path so we can import the downsample module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from downsample import MinMaxDownsampler, lttb, minmax
+
+
+def walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n) * 10 + 5, np.cumsum(rng.normal(size=n)), rng.random(n)
+
+
+class TestMinMax(unittest.TestCase):
+    """Test cases for the per-bucket first/last/min/max reduction."""
+
+    def test_keeps_bucket_extremes(self):
+        """Every bucket keeps its first and last row and each series' minimum and maximum."""
+        x, y, z = walk(10007)
+        keep = minmax(x, y, z, buckets=50)
+        self.assertLessEqual(len(keep), 50 * 6)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        bucket = (x - x[0]) * 50 // (x[-1] - x[0] + 1)
+        for b in range(50):
+            rows = np.flatnonzero(bucket == b)
+            kept = keep[bucket[keep] == b]
+            self.assertEqual((kept[0], kept[-1]), (rows[0], rows[-1]))
+            for series in (y, z):
+                self.assertEqual(series[kept].min(), series[rows].min())
+                self.assertEqual(series[kept].max(), series[rows].max())
+
+    def test_chunked_matches_in_memory(self):
+        """Streaming the rows in chunks selects the same rows as one pass."""
+        x, y, z = walk(5000, seed=1)
+        sampler = MinMaxDownsampler(x[0], x[-1], 64)
+        for start in range(0, len(x), 333):
+            sampler.add(x[start:start + 333], y[start:start + 333], z[start:start + 333])
+        rows = sampler.result()
+        np.testing.assert_array_equal(np.searchsorted(x, rows[:, 0]), minmax(x, y, z, buckets=64))
+        np.testing.assert_array_equal(rows[:, 1], y[np.searchsorted(x, rows[:, 0])])
+        self.assertEqual(sampler.count, len(x))
+
+
+class TestLttb(unittest.TestCase):
+    """Test cases for Largest-Triangle-Three-Buckets."""
+
+    def test_selects_requested_points(self):
+        x, y, _ = walk(1000)
+        keep = lttb(x, y, 100)
+        self.assertEqual(len(keep), 100)
+        self.assertEqual((keep[0], keep[-1]), (0, 999))
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        np.testing.assert_array_equal(lttb(x, y, 2000), np.arange(1000))
+
+    def test_keeps_a_spike(self):
+        """An isolated peak is the largest triangle in its bucket."""
+        x = np.arange(500)
+        y = np.zeros(500)
+        y[250] = 10
+        self.assertIn(250, lttb(x, y, 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
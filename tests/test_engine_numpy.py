@@ -0,0 +1,59 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Add the src directory to the path so we can import the engine module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from engine_numpy import NumpyEngine, neighbor_pairs
+
+
+def make_engine(num_ants=80, num_food=20, seed=3):
+    return NumpyEngine(800, 600, [((100, 100), num_ants - num_ants // 2), ((700, 500), num_ants // 2)],
+                       num_food, seed=seed)
+
+
+class TestNumpyEngine(unittest.TestCase):
+    """Test cases for the vectorized engine."""
+
+    def test_neighbor_pairs_match_brute_force(self):
+        """Grid pair search finds exactly the pairs within the radius."""
+        rng = np.random.default_rng(0)
+        qx, qy = rng.uniform(0, 800, 200), rng.uniform(0, 600, 200)
+        px, py = rng.uniform(0, 800, 300), rng.uniform(0, 600, 300)
+        qi, pj = neighbor_pairs(qx, qy, px, py, 50, 800, 600)
+        d2 = (qx[:, None] - px[None, :]) ** 2 + (qy[:, None] - py[None, :]) ** 2
+        expected = set(zip(*np.nonzero(d2 < 50 ** 2)))
+        self.assertEqual(set(zip(qi.tolist(), pj.tolist())), expected)
+
+    def test_invariants_hold_while_stepping(self):
+        """Food is conserved, colonies stay within capacity, ants stay on the board."""
+        engine = make_engine()
+        for _ in range(500):
+            engine.advance()
+            carried = int(engine.has_food[engine.alive].sum())
+            self.assertEqual(int(engine.factive.sum()) + carried, 20)
+            self.assertTrue((engine.population() <= engine.colony_capacity).all())
+            alive = engine.alive
+            self.assertTrue(((engine.x[alive] >= 0) & (engine.x[alive] <= 800)).all())
+            self.assertTrue(((engine.y[alive] >= 0) & (engine.y[alive] <= 600)).all())
+            self.assertTrue(((engine.preference >= 0) & (engine.preference <= 1)).all())
+            if not engine.colony_alive.all():
+                break
+        self.assertGreater(engine.step, 0)
+
+    def test_seeded_runs_are_reproducible(self):
+        """The same seed yields the same trajectory."""
+        a, b = make_engine(seed=11), make_engine(seed=11)
+        for _ in range(200):
+            a.advance()
+            b.advance()
+        np.testing.assert_array_equal(a.x, b.x)
+        np.testing.assert_array_equal(a.colony_preference, b.colony_preference)
+        self.assertEqual(a.death_count, b.death_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
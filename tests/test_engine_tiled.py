@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+import numpy as np
+
+# Add the src directory to the path so we can import the engine module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from engine_tiled import TiledEngine, tile_grid, tile_of
+from colony import Simulation, SimulationConfig
+
+COLONIES = [((150, 150), 40), ((1050, 150), 40), ((150, 750), 40), ((1050, 750), 40)]
+
+
+class TestTiledEngine(unittest.TestCase):
+    """Test cases for the multi-process tiled engine."""
+
+    def test_tile_grid(self):
+        """Tiles come out as close to square as the count allows and cover the board."""
+        self.assertEqual(tile_grid(4, 1000, 1000), (2, 2))
+        self.assertEqual(tile_grid(2, 2000, 1000), (2, 1))
+        self.assertEqual(tile_grid(6, 1500, 1000), (3, 2))
+        self.assertEqual(tile_grid(5, 2000, 1000), (5, 1))
+        x = np.array([0.0, 499.9, 500.0, 1000.0, 999.0])
+        y = np.array([0.0, 0.0, 999.0, 1000.0, 0.0])
+        self.assertEqual(tile_of(x, y, (2, 2), 1000, 1000).tolist(), [0, 0, 3, 3, 1])
+
+    def test_matches_numpy_engine(self):
+        """Every tile count reproduces the single-process engine exactly, ants crossing tiles included."""
+        results = []
+        for engine, tiles in (('numpy', 0), ('tiled', 1), ('tiled', 3), ('tiled', 4)):
+            config = SimulationConfig(seed=4, num_ants=160, num_food=40, num_colonies=4, width=1200, height=900,
+                                      max_steps=300, stop_on_divergence=False, engine=engine, tiles=tiles)
+            results.append(dict(Simulation(config).run().as_dict(), elapsed=None))
+        self.assertGreater(results[0]['death_count'], 0)
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+
+    def test_close_and_checkpoint(self):
+        """A closed engine steps on by itself; a snapshot resumes with another tile count."""
+        engine = TiledEngine(1200, 900, COLONIES, 30, seed=2, tiles=2)
+        reference = TiledEngine(1200, 900, COLONIES, 30, seed=2, tiles=2)
+        for _ in range(40):
+            engine.advance()
+            reference.advance()
+        engine.close()
+        self.assertIsNone(engine.pool)
+        self.assertNotIsInstance(engine.x.base, memoryview)
+        for _ in range(10):
+            engine.advance()
+            reference.advance()
+        np.testing.assert_array_equal(engine.x, reference.x)
+        reference.close()
+        engine.close()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run.pkl.gz')
+            config = SimulationConfig(seed=1, num_ants=120, num_food=30, num_colonies=4, width=1200, height=900,
+                                      max_steps=200, stop_on_divergence=False, engine='tiled', tiles=2,
+                                      checkpoint_file=path)
+            simulation = Simulation(config)
+            for _ in range(100):
+                simulation.step()
+            simulation.save_checkpoint()
+            expected = dict(simulation.run().as_dict(), elapsed=None)
+            resumed = Simulation.resume(path, overrides={'tiles': 3}).run()
+            self.assertEqual(dict(resumed.as_dict(), elapsed=None), expected)
+
+    def test_checkpoint_before_first_step(self):
+        """A tiled run can be snapshotted before its workers have started."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run.pkl.gz')
+            config = SimulationConfig(seed=3, num_ants=120, num_food=30, num_colonies=4, width=1200, height=900,
+                                      max_steps=100, stop_on_divergence=False, engine='tiled', tiles=2,
+                                      checkpoint_file=path)
+            simulation = Simulation(config)
+            simulation.save_checkpoint()
+            expected = dict(simulation.run().as_dict(), elapsed=None)
+            resumed = Simulation.resume(path).run()
+            self.assertEqual(dict(resumed.as_dict(), elapsed=None), expected)
+
+    def test_dead_worker_raises(self):
+        """A killed worker fails the next step, naming its tile, instead of hanging it."""
+        engine = TiledEngine(1200, 900, COLONIES, 30, seed=2, tiles=2)
+        engine.advance()
+        worker = engine.pool.processes[1]
+        worker.kill()
+        worker.join()
+        start = time.perf_counter()
+        with self.assertRaisesRegex(RuntimeError, r'tile 1 \(exit code -9\)'):
+            engine.advance()
+        engine.close()
+        self.assertLess(time.perf_counter() - start, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
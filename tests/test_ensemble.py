@@ -0,0 +1,39 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to the path so we can import the ensemble module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from colony import Simulation, SimulationConfig
+from ensemble import Ensemble
+
+
+class TestEnsemble(unittest.TestCase):
+    """Test cases for batched ensemble runs."""
+
+    def test_replicas_match_single_runs(self):
+        """Each replica ends exactly like a standalone numpy run with its seed."""
+        config = SimulationConfig(num_ants=30, num_food=15, engine='numpy', max_steps=600)
+        results = Ensemble(config, replicas=4, seeds=[10, 11, 12, 13]).run()
+        for result in results:
+            config.seed = result.seed
+            alone = Simulation(config).run()
+            self.assertEqual(result.csv_line(), alone.csv_line())
+            self.assertEqual(result.colony_a_preference, alone.colony_a_preference)
+            self.assertEqual(result.death_count, alone.death_count)
+
+    def test_every_replica_reports_once_with_seed(self):
+        """One result row per replica, in replica order, each ending by its own rule."""
+        config = SimulationConfig(num_ants=10, num_food=3, max_steps=300, seed=100)
+        ensemble = Ensemble(config, replicas=6)
+        results = ensemble.run()
+        self.assertEqual(ensemble.active, 0)
+        self.assertEqual([r.seed for r in results], list(range(100, 106)))
+        for r in results:
+            self.assertTrue(r.steps == 300 or not (r.colony_a_alive and r.colony_b_alive))
+            self.assertEqual(r.csv_line(with_seed=True).split(',')[-1], str(r.seed))
+
+
+if __name__ == '__main__':
+    unittest.main()
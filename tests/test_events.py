@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+import math
+import tempfile
+
+# Add the src directory to the path so we can import the events module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from colony import Board, Simulation, SimulationConfig
+from colors import COLOR_RED
+
+
+def run(events, **kwargs):
+    """Run a simulation with or without event stepping; return its result dict and the simulation."""
+    simulation = Simulation(SimulationConfig(stop_on_divergence=False, events=events, **kwargs))
+    return dict(simulation.run().as_dict(), elapsed=None), simulation
+
+
+class TestEvents(unittest.TestCase):
+    """Test cases for event-driven stepping."""
+
+    def test_matches_step_mode(self):
+        """Event stepping gives exactly the step-by-step results and skips some steps."""
+        for kwargs in (dict(seed=1, num_ants=80, num_food=20, max_steps=600),
+                       dict(seed=3, num_ants=300, num_food=15, num_colonies=4, width=3000, height=3000,
+                            max_steps=200, event_horizon=16)):
+            expected, _ = run(False, **kwargs)
+            result, simulation = run(True, **kwargs)
+            self.assertEqual(result, expected)
+            self.assertGreater(simulation.board.events.skipped_share(), 0.1)
+        self.assertGreater(expected['death_count'], 0)
+
+    def test_skip_matches_moves(self):
+        """Skipping k steps puts an ant exactly where k moves do, wall bounces and re-aiming included."""
+        def ant(angle, has_food):
+            board = Board(SimulationConfig(seed=5, width=300, height=200))
+            colony = board.spawn_colony((150, 100), COLOR_RED, 1)
+            colony.spawn_ant()
+            ant = colony.ants[0]
+            ant.angle, ant.has_food = angle, has_food
+            if has_food:
+                ant.x, ant.y = 12.5, 190.0
+            return ant
+
+        for angle, has_food, steps in ((0.3, False, 250), (2.0, False, 41), (math.pi / 2, False, 97),
+                                       (-1.1, False, 7), (0.0, True, 26)):
+            stepped, skipped = ant(angle, has_food), ant(angle, has_food)
+            for _ in range(steps):
+                stepped.move()
+            skipped.skip(steps)
+            self.assertEqual((skipped.x, skipped.y, skipped.angle, skipped.leg_step),
+                             (stepped.x, stepped.y, stepped.angle, stepped.leg_step))
+            self.assertNotEqual((skipped.x, skipped.y), (12.5, 190.0))
+
+    def test_settle(self):
+        """Settling brings sleepers to the current step without changing what follows."""
+        kwargs = dict(seed=2, num_ants=200, num_food=10, num_colonies=4, width=3000, height=3000, max_steps=120)
+        expected, _ = run(False, **kwargs)
+        simulation = Simulation(SimulationConfig(stop_on_divergence=False, events=True, **kwargs))
+        for _ in range(60):
+            simulation.step()
+            simulation.board.events.settle()
+        sleeping = [ant for ant in simulation.board.all_ants() if ant.sleep_from is not None]
+        self.assertTrue(sleeping)
+        self.assertTrue(all(ant.sleep_from == simulation.board.step for ant in sleeping))
+        self.assertEqual(dict(simulation.run().as_dict(), elapsed=None), expected)
+
+    def test_checkpoint_with_sleepers(self):
+        """A snapshot taken while ants sleep resumes to the same result."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'run.pkl.gz')
+            config = SimulationConfig(seed=4, num_ants=200, num_food=10, num_colonies=4, width=3000, height=3000,
+                                      max_steps=150, stop_on_divergence=False, events=True, checkpoint_file=path)
+            simulation = Simulation(config)
+            for _ in range(70):
+                simulation.step()
+            simulation.save_checkpoint()
+            expected = dict(simulation.run().as_dict(), elapsed=None)
+            resumed = Simulation.resume(path).run()
+            self.assertEqual(dict(resumed.as_dict(), elapsed=None), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
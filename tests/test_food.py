@@ -0,0 +1,43 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to the path so we can import the food module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from food import FoodRegistry
+
+
+class TestFoodRegistry(unittest.TestCase):
+    """Test cases for the slot-based food registry."""
+
+    def setUp(self):
+        self.registry = FoodRegistry()
+        self.items = [self.registry.add(i, 2 * i, 'green') for i in range(5)]
+
+    def test_ids_are_slots(self):
+        """Items get consecutive ids and iterate in id order."""
+        self.assertEqual([food.id for food in self.items], [0, 1, 2, 3, 4])
+        self.assertEqual(list(self.registry), self.items)
+
+    def test_claim_frees_slot_for_reuse(self):
+        """A claimed item is gone once, and its slot is handed to the next add."""
+        self.assertTrue(self.registry.claim(self.items[1]))
+        self.assertFalse(self.registry.claim(self.items[1]))
+        self.assertEqual(len(self.registry), 4)
+        respawned = self.registry.add(50, 60, 'orange')
+        self.assertEqual(respawned.id, 1)
+        self.assertNotIn(self.items[1], self.registry)
+        self.assertIn(respawned, self.registry)
+
+    def test_equal_items_are_distinct(self):
+        """Two items at the same place with the same color are claimed separately."""
+        a = self.registry.add(7, 7, 'green')
+        b = self.registry.add(7, 7, 'green')
+        self.assertTrue(self.registry.claim(b))
+        self.assertIn(a, self.registry)
+        self.assertEqual(len(self.registry), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+
+import pygame
+
+# Add the src directory to the path so we can import the frames module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from frames import FrameWriter, encode_png
+
+
+def gradient(width, height):
+    surface = pygame.Surface((width, height))
+    for x in range(width):
+        for y in range(height):
+            surface.set_at((x, y), (x * 20 % 256, y * 30 % 256, (x + y) % 256))
+    return surface
+
+
+class TestFrameWriter(unittest.TestCase):
+    """Test cases for the background frame writer."""
+
+    def test_png_round_trip(self):
+        """Encoded frames decode back to the same pixels."""
+        surface = gradient(13, 7)
+        pixels = pygame.image.tobytes(surface, 'RGB')
+        with tempfile.TemporaryDirectory() as frames_dir:
+            path = os.path.join(frames_dir, 'frame.png')
+            with open(path, 'wb') as out:
+                out.write(encode_png(pixels, 13, 7))
+            loaded = pygame.image.load(path)
+        self.assertEqual(pygame.image.tobytes(loaded, 'RGB'), pixels)
+
+    def test_writes_all_frames_when_blocking(self):
+        pixels = pygame.image.tobytes(gradient(8, 8), 'RGB')
+        with tempfile.TemporaryDirectory() as frames_dir:
+            writer = FrameWriter(frames_dir, 8, 8, workers=3, queue_size=2)
+            for i in range(20):
+                self.assertTrue(writer.submit(f"frame_{i:06d}.png", pixels))
+            writer.close()
+            self.assertEqual(len(os.listdir(frames_dir)), 20)
+        self.assertEqual((writer.written, writer.dropped), (20, 0))
+
+    def test_drop_backpressure_counts_dropped_frames(self):
+        """With the only worker stalled, frames beyond the queue size are dropped."""
+        release = threading.Event()
+        with tempfile.TemporaryDirectory() as frames_dir:
+            writer = FrameWriter(frames_dir, 8, 8, workers=1, queue_size=2, backpressure='drop')
+            original = writer.write_png
+            writer.write_png = lambda name, pixels: (release.wait(), original(name, pixels))
+            pixels = bytes(8 * 8 * 3)
+            accepted = [writer.submit(f"frame_{i:06d}.png", pixels) for i in range(6)]
+            release.set()
+            writer.close()
+        self.assertGreaterEqual(writer.dropped, 3)
+        self.assertEqual(accepted.count(False), writer.dropped)
+        self.assertEqual(writer.written, 6 - writer.dropped)
+        self.assertIn('dropped', writer.status())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+import json
+import multiprocessing
+import signal
+import tempfile
+import time
+
+import numpy as np
+
+# Add the src directory to the path so we can import the live module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from live import LivePublisher, MetricsRing, connect, parse_address, read_stream
+from colony import Simulation, SimulationConfig
+
+
+def write_rows(name, stop):
+    """Writer process: fill every field of row N with N until told to stop."""
+    ring = MetricsRing(name=name)
+    number = ring.count
+    while not stop.is_set():
+        ring.write(np.full(ring.rows.shape[1], float(number)))
+        number += 1
+    ring.close()
+
+
+def publish_and_die(path, report):
+    """Simulation process: start publishing, report the block's name, then die without closing."""
+    publisher = LivePublisher(path, colonies=2, capacity=8)
+    publisher.publish(1, [0.5, 0.5], [3, 3], 0, 4)
+    report.send(publisher.ring.block.name)
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+class TestLive(unittest.TestCase):
+    """Test cases for live metrics streaming."""
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address('8765'), ('tcp', ('127.0.0.1', 8765)))
+        self.assertEqual(parse_address('0.0.0.0:80'), ('tcp', ('0.0.0.0', 80)))
+        self.assertEqual(parse_address('/tmp/ants.sock'), ('unix', '/tmp/ants.sock'))
+        self.assertEqual(parse_address('unix:ants.sock'), ('unix', 'ants.sock'))
+
+    def test_ring_keeps_the_newest_rows(self):
+        """Readers get the rows after `since` that are still buffered, numbered from the first row."""
+        ring = MetricsRing(colonies=2, capacity=4)
+        reader = MetricsRing(name=ring.block.name)
+        try:
+            for step in range(6):
+                ring.write([step, 10.0, step, 3, 0.5, 0.25, 40, step])
+            self.assertEqual(reader.count, 6)
+            records = reader.records()
+            self.assertEqual([r['row'] for r in records], [3, 4, 5])  # 0 and 1 overwritten, 2 is written next
+            self.assertEqual(records[-1], {'row': 5, 'step': 5, 'steps_per_sec': 10.0, 'deaths': 5, 'food': 3,
+                                           'preference': [0.5, 0.25], 'population': [40, 5]})
+            self.assertEqual([r['row'] for r in reader.records(since=5)], [5])
+            self.assertEqual(reader.records(since=6), [])
+        finally:
+            reader.close()
+            ring.close()
+            ring.block.unlink()
+
+    def test_reader_never_sees_torn_rows(self):
+        """A reader racing a writer in another process only returns rows written in full."""
+        ring = MetricsRing(colonies=2000, capacity=4)  # Wide rows take a while to write
+        reader = MetricsRing(name=ring.block.name)
+        stop = multiprocessing.Event()
+        writer = multiprocessing.Process(target=write_rows, args=(ring.block.name, stop))
+        writer.start()
+        try:
+            seen = 0
+            deadline = time.perf_counter() + 1.0
+            while time.perf_counter() < deadline:
+                first, rows = reader.read(max(0, reader.count - 3))
+                for number, row in enumerate(rows, first):
+                    self.assertTrue((row == number).all(), f"row {number} is torn")
+                seen += len(rows)
+            self.assertGreater(seen, 0)
+        finally:
+            stop.set()
+            writer.join()
+            reader.close()
+            ring.close()
+            ring.block.unlink()
+
+    def test_stream_follows_a_run(self):
+        """A stream opened mid-run sees every row, the final state included, and ends with the run."""
+        config = SimulationConfig(seed=3, max_steps=230, stop_on_divergence=False, live='127.0.0.1:0',
+                                  live_interval=20, live_capacity=64)
+        simulation = Simulation(config)
+        for _ in range(50):
+            simulation.step()
+        stream = read_stream(simulation.live.address, timeout=30)
+        rows = [next(stream)]  # The stream is open from here on; later rows wait in the socket
+        result = simulation.run()
+        rows.extend(stream)
+        self.assertEqual([row['step'] for row in rows], list(range(20, 230, 20)) + [230])
+        self.assertEqual(rows[-1]['deaths'], result.death_count)
+        self.assertEqual(len(rows[-1]['preference']), 2)
+        self.assertTrue(all(row['steps_per_sec'] > 0 for row in rows))
+        self.assertFalse(simulation.live.process.is_alive())
+
+    def test_unix_socket_and_no_listener(self):
+        """Rows are served as JSON over a UNIX socket; with no one listening, publishing never waits."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'live.sock')
+            publisher = LivePublisher(path, colonies=3, capacity=8)
+            start = time.perf_counter()
+            for step in range(1, 1001):
+                publisher.publish(step, [0.1, 0.2, 0.3], [5, 6, 7], step, 9)
+            self.assertLess(time.perf_counter() - start, 1.0)
+            connection = connect(publisher.address, timeout=10)
+            connection.request('GET', '/metrics?since=995')
+            body = json.loads(connection.getresponse().read())
+            connection.close()
+            self.assertEqual(body['colonies'], 3)
+            self.assertEqual([row['step'] for row in body['rows']], [996, 997, 998, 999, 1000])
+            publisher.close()
+            self.assertFalse(publisher.process.is_alive())
+            self.assertFalse(os.path.exists(path))
+
+    def test_server_cleans_up_after_a_killed_run(self):
+        """When the simulation is killed, the server removes its socket and shared memory and exits."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'live.sock')
+            receive, send = multiprocessing.Pipe(duplex=False)
+            simulation = multiprocessing.Process(target=publish_and_die, args=(path, send))
+            simulation.start()
+            self.assertTrue(receive.poll(30))
+            name = receive.recv()
+            simulation.join()
+            self.assertEqual(simulation.exitcode, -signal.SIGKILL)
+            deadline = time.perf_counter() + 10
+            while os.path.exists(path) and time.perf_counter() < deadline:
+                time.sleep(0.05)
+            self.assertFalse(os.path.exists(path))
+            time.sleep(0.2)  # The block is unlinked right after the socket
+            with self.assertRaises(FileNotFoundError):
+                MetricsRing(name=name)
+
+
+if __name__ == '__main__':
+    unittest.main()
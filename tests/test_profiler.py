@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import io
+import json
+import tempfile
+import contextlib
+
+# Add the src directory to the path so we can import the profiler module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from profiler import Profiler, PHASES, COUNTERS
+from colony import Simulation, SimulationConfig
+
+
+class TestProfiler(unittest.TestCase):
+    """Test cases for the opt-in step profiler."""
+
+    def test_windows_and_report(self):
+        """A summary line per full window; the report folds in a partial last window."""
+        log = io.StringIO()
+        profiler = Profiler(window=2, log=log)
+        profiler.start()
+        for step in range(1, 4):
+            with profiler.phase('move'):
+                pass
+            profiler.count('vision_candidates', 5)
+            profiler.end_step(step)
+        self.assertEqual(log.getvalue().count('[profile]'), 1)
+        self.assertIn('steps 1-2:', log.getvalue())
+        report = profiler.report(step=3)
+        self.assertEqual(report['steps'], 3)
+        self.assertEqual([(w['first_step'], w['last_step']) for w in report['windows']], [(1, 2), (3, 3)])
+        self.assertEqual(report['counters']['vision_candidates'], {'total': 15, 'per_step': 5.0})
+        self.assertEqual(set(report['phases']), set(PHASES) | {'other'})
+        self.assertGreater(report['phases']['move']['seconds'], 0)
+
+    def test_profiled_run_matches_and_counts(self):
+        """Profiling leaves results unchanged and counts every death, on both engines."""
+        with tempfile.TemporaryDirectory() as tmp:
+            for engine in ('reference', 'numpy'):
+                results = []
+                for profile in (False, True):
+                    path = os.path.join(tmp, f'{engine}.json')
+                    config = SimulationConfig(num_ants=60, num_food=15, seed=3, max_steps=150, engine=engine,
+                                              stop_on_divergence=False, profile=profile, profile_window=40,
+                                              profile_file=path)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        results.append(Simulation(config).run())
+                plain, profiled = (dict(result.as_dict(), elapsed=None) for result in results)
+                self.assertEqual(plain, profiled)
+                with open(path) as f:
+                    report = json.load(f)
+                self.assertEqual(report['steps'], results[1].steps)
+                self.assertEqual(len(report['windows']), 4)
+                self.assertEqual(set(report['counters']), set(COUNTERS))
+                self.assertEqual(report['counters']['deaths']['total'], results[1].death_count)
+                self.assertGreater(report['counters']['vision_candidates']['total'], 0)
+                self.assertGreater(report['counters']['pickups']['total'], 0)
+
+    def test_checkpoints_leave_the_profiler_out(self):
+        """A profiled run's snapshot resumes unprofiled unless asked to profile."""
+        with tempfile.TemporaryDirectory() as tmp:
+            config = SimulationConfig(num_ants=20, num_food=5, seed=1, max_steps=30, profile=True,
+                                      profile_file=os.path.join(tmp, 'profile.json'),
+                                      checkpoint_file=os.path.join(tmp, 'run.pkl.gz'))
+            simulation = Simulation(config)
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(10):
+                    simulation.step()
+            path = simulation.save_checkpoint()
+            resumed = Simulation.resume(path, overrides={'profile': False})
+            self.assertIsNone(resumed.profiler)
+            self.assertIsNone(resumed.board.profiler)
+            self.assertNotIn('food_near', vars(resumed.board))
+
+
+if __name__ == '__main__':
+    unittest.main()
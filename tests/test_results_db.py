@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+import tempfile
+import json
+import subprocess
+
+# Add the src directory to the path so we can import the results_db module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import results_db
+from colony import Simulation, SimulationConfig, SimulationResult
+from sweep import build_tasks, skip_recorded
+
+
+def make_result(ants, food, steps, a_alive=True, b_alive=True, outcome='divergence', seed=None):
+    return SimulationResult(num_ants=ants, num_food=food, steps=steps, colony_a_alive=a_alive,
+                            colony_b_alive=b_alive, colony_a_preference=0.1, colony_b_preference=0.9,
+                            death_count=0, elapsed=0.5, seed=seed, outcome=outcome)
+
+
+class TestResultsDb(unittest.TestCase):
+    """Test cases for the SQLite results store."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'results.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_run_hash_covers_params_seed_and_code(self):
+        """Output settings do not change the hash; parameters, seed and code version do."""
+        config = SimulationConfig(num_ants=10, num_food=5, seed=3)
+        base = results_db.run_hash(config)
+        self.assertEqual(base, results_db.run_hash(SimulationConfig(num_ants=10, num_food=5, seed=3,
+                                                                    output_mode='files', stats=True)))
+        self.assertNotEqual(base, results_db.run_hash(SimulationConfig(num_ants=10, num_food=5, seed=4)))
+        self.assertNotEqual(base, results_db.run_hash(SimulationConfig(num_ants=10, num_food=5, seed=3,
+                                                                       learning_rate=0.2)))
+        self.assertNotEqual(base, results_db.run_hash(config, version='other'))
+        self.assertIsNone(results_db.run_hash(SimulationConfig(num_ants=10, num_food=5)))
+
+    def test_code_version_covers_every_simulation_module(self):
+        """Every src module a run loads, including the tiled engine and events, is fingerprinted."""
+        src = os.path.dirname(results_db.__file__)
+        code = "import colony, sys; print('\\n'.join(getattr(m, '__file__', None) or '' for m in list(sys.modules.values())))"
+        out = subprocess.run([sys.executable, '-c', code], cwd=src, capture_output=True, text=True, check=True)
+        loaded = {os.path.basename(path) for path in out.stdout.split()
+                  if os.path.dirname(os.path.abspath(path)) == os.path.abspath(src)}
+        self.assertLessEqual(loaded, set(results_db.CODE_FILES))
+        for name in ('engine_tiled.py', 'events.py', 'checkpoint.py'):
+            self.assertIn(name, results_db.CODE_FILES)
+
+    def test_batched_inserts_and_skipping(self):
+        """Rows land once per batch and recorded seeded runs are skipped by the sweep."""
+        tasks = build_tasks((2, 4, 2), (1, 1, 1), repeats=2, max_steps=10, seed=0)
+        with results_db.ResultStore(self.path, batch_size=3) as store:
+            for config in tasks[:3]:
+                store.add(make_result(config.num_ants, config.num_food, 5, seed=config.seed), config)
+            self.assertEqual(store.inserted, 3)
+            store.add(make_result(2, 1, 5, seed=tasks[0].seed), tasks[0])  # Same run again
+            store.flush()
+            self.assertEqual(store.inserted, 3)
+            remaining = skip_recorded(tasks, store)
+        self.assertEqual([t.seed for t in remaining], [t.seed for t in tasks[3:]])
+
+    def test_import_is_idempotent(self):
+        """Old results files import once, with outcomes, seeds and plateau flags recovered."""
+        text_path = os.path.join(self.tmp.name, 'results.txt')
+        with open(text_path, 'w') as out:
+            out.write("5,5,100,1,1\n5,5,100,1,1\n5,5,40,1,0\n5,5,500000,1,1\n5,5,200,1,1,7,plateau\n")
+        with results_db.ResultStore(self.path) as store:
+            results_db.import_text(store, text_path)
+            results_db.import_text(store, text_path)
+            self.assertEqual(store.inserted, 5)
+        conn = results_db.connect(self.path)
+        rows = sorted(results_db.iter_runs(conn, columns=('steps', 'outcome', 'seed')))
+        conn.close()
+        self.assertEqual(rows, [(40, 'extinction', None), (100, 'divergence', None), (100, 'divergence', None),
+                                (200, 'plateau', 7), (500000, 'timeout', None)])
+
+    def test_many_colony_results_and_old_databases(self):
+        """Per-colony results are stored and the new columns are added to older databases."""
+        conn = results_db.sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE runs (id INTEGER PRIMARY KEY, run_hash TEXT UNIQUE, num_ants INTEGER NOT NULL, "
+                     "num_food INTEGER NOT NULL, steps INTEGER NOT NULL, a_alive INTEGER NOT NULL, "
+                     "b_alive INTEGER NOT NULL, outcome TEXT NOT NULL, plateau_step INTEGER, seed INTEGER, "
+                     "engine TEXT, max_steps INTEGER, learning_rate REAL, vision_radius REAL, ant_speed REAL, "
+                     "initial_life INTEGER, wall_time REAL, recorded_at REAL NOT NULL, code_version TEXT, "
+                     "params TEXT, source TEXT)")
+        conn.execute("INSERT INTO runs (num_ants, num_food, steps, a_alive, b_alive, outcome, recorded_at) "
+                     "VALUES (4, 2, 10, 1, 1, 'timeout', 0)")
+        conn.commit()
+        conn.close()
+        text_path = os.path.join(self.tmp.name, 'results.txt')
+        with open(text_path, 'w') as out:
+            out.write("9,3,50,0,1,alive=0110\n9,3,50,0,0,alive=0001\n")
+        config = SimulationConfig(num_ants=9, num_food=3, max_steps=50, num_colonies=3, seed=1)
+        result = Simulation(config).run()
+        with results_db.ResultStore(self.path) as store:
+            results_db.import_text(store, text_path, max_steps=1000)
+            store.add(result, config)
+        conn = results_db.connect(self.path)
+        rows = list(results_db.iter_runs(conn, columns=('num_colonies', 'outcome', 'colonies')))
+        conn.close()
+        self.assertEqual([row[:2] for row in rows[:3]], [(2, 'timeout'), (4, 'divergence'), (4, 'extinction')])
+        self.assertEqual(rows[3][0], 3)
+        self.assertEqual(json.loads(rows[3][2])['alive'], list(result.colonies_alive))
+
+    def test_parse_line(self):
+        """results.txt lines parse with their optional seed, plateau flag and per-colony alive flags."""
+        self.assertEqual(results_db.parse_line("10,5,300,1,0,42\n"), (10, 5, 300, 1, 0, 42, False, None))
+        self.assertEqual(results_db.parse_line("9,3,50,0,1,7,alive=0110,plateau"),
+                         (9, 3, 50, 0, 1, 7, True, [False, True, True, False]))
+        self.assertIsNone(results_db.parse_line("\n"))
+
+    def test_cell_summary(self):
+        """Success rate, median steps and majority outcome are aggregated per cell."""
+        config = SimulationConfig(max_steps=1000)
+        with results_db.ResultStore(self.path) as store:
+            for steps, outcome in [(10, 'divergence'), (30, 'divergence'), (20, 'extinction'), (40, 'divergence')]:
+                store.add(make_result(1, 1, steps, b_alive=outcome != 'extinction', outcome=outcome), config)
+            store.add(make_result(2, 1, 1000, outcome='timeout'), config)
+            store.add(make_result(2, 1, 50, outcome='divergence'), SimulationConfig(max_steps=50, engine='numpy'))
+        conn = results_db.connect(self.path)
+        self.assertEqual(results_db.cell_summary(conn),
+                         [(1, 1, 4, 0.75, 25.0, 'divergence'), (2, 1, 2, 0.5, 525.0, 'divergence')])
+        self.assertEqual(results_db.cell_summary(conn, engine='numpy'), [(2, 1, 1, 1.0, 50.0, 'divergence')])
+        conn.close()
+
+    def test_records_simulation_parameters(self):
+        """A stored run keeps its non-CLI parameters alongside the result."""
+        config = SimulationConfig(num_ants=6, num_food=3, max_steps=20, seed=2, vision_radius=40)
+        result = Simulation(config).run()
+        with results_db.ResultStore(self.path) as store:
+            store.add(result, config)
+        conn = results_db.connect(self.path)
+        (vision, seed, steps), = results_db.iter_runs(conn, columns=('vision_radius', 'seed', 'steps'))
+        conn.close()
+        self.assertEqual((vision, seed, steps), (40, 2, result.steps))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import sys
+import os
+import pickle
+
+# Add the src directory to the path so we can import the rng module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from rng import RandomPool
+
+
+class TestRandomPool(unittest.TestCase):
+    """Test cases for the pre-drawn random number pool."""
+
+    def test_seeded_streams_repeat_across_refills(self):
+        """The same seed gives the same draws regardless of block size."""
+        a = RandomPool(3, block_size=7)
+        b = RandomPool(3, block_size=7)
+        self.assertEqual([a.random() for _ in range(50)], [b.random() for _ in range(50)])
+        self.assertNotEqual(RandomPool(4).random(), RandomPool(3).random())
+
+    def test_draw_ranges(self):
+        """Every helper stays inside its documented range."""
+        pool = RandomPool(1, block_size=16)
+        for _ in range(500):
+            self.assertTrue(-0.1 <= pool.uniform(-0.1, 0.1) < 0.1)
+            self.assertTrue(0 <= pool.randint(0, 3) <= 3)
+            self.assertIn(pool.choice('ab'), 'ab')
+        self.assertEqual(pool.binary(1.0, 'green', 'orange'), 'green')
+        self.assertEqual(pool.binary(0.0, 'green', 'orange'), 'orange')
+
+    def test_pickle_round_trip(self):
+        """A pickled pool, as in a checkpoint, replays the same draws, mid-block included."""
+        pool = RandomPool(9, block_size=10)
+        for _ in range(13):
+            pool.random()
+        restored = pickle.loads(pickle.dumps(pool))
+        self.assertEqual([restored.random() for _ in range(25)], [pool.random() for _ in range(25)])
+
+
+if __name__ == '__main__':
+    unittest.main()
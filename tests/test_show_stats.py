@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+
+# Add the src directory to the path so we can import the show_stats module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import show_stats
+from telemetry import TelemetryRecorder
+
+
+class TestStatsLoading(unittest.TestCase):
+    """Test cases for the stats file loaders of show_stats.py."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.steps = np.arange(1, 2001) * 10
+        self.prefs = rng.random((2000, 2))
+        self.text = os.path.join(self.tmp.name, 'stats.txt')
+        with open(self.text, 'w') as out:
+            for step, (a, b) in zip(self.steps, self.prefs):
+                out.write(f"{step},{float(a)!r},{float(b)!r}\n")
+        self.npz = os.path.join(self.tmp.name, 'stats.npz')
+        recorder = TelemetryRecorder(2, interval=10)
+        for step, prefs in zip(self.steps, self.prefs):
+            recorder.record(step, prefs, [1, 1], 0, 0)
+        recorder.save(self.npz)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_text_and_npz_load_the_same_rows(self):
+        for path in (self.text, self.npz):
+            steps, a, b = show_stats.load_stats_data(path)
+            np.testing.assert_array_equal(steps, self.steps)
+            np.testing.assert_array_equal(np.column_stack([a, b]), self.prefs)
+            chunks = list(show_stats.iter_stats_chunks(path, chunk_rows=300))
+            self.assertEqual([len(c[0]) for c in chunks], [300] * 6 + [200])
+        self.assertEqual(show_stats.step_range(self.text), (10, 20000))
+
+    def test_malformed_lines_are_skipped(self):
+        with open(self.text, 'a') as out:
+            out.write("oops\n20010,0.5\n\n20020,0.25,0.75\n")
+        steps, a, b = show_stats.load_stats_data(self.text)
+        self.assertEqual(len(steps), 2001)
+        self.assertEqual((steps[-1], a[-1], b[-1]), (20020, 0.25, 0.75))
+
+    def test_plot_data_is_downsampled(self):
+        steps, a, b, total = show_stats.load_plot_data(self.npz, 'minmax', points=400, chunk_rows=256)
+        self.assertEqual(total, 2000)
+        self.assertLess(len(steps), 2000)
+        self.assertEqual((steps[0], steps[-1]), (10, 20000))
+        self.assertEqual(a.max(), self.prefs[:, 0].max())
+        steps, a, b, total = show_stats.load_plot_data(self.text, 'lttb', points=400)
+        self.assertLessEqual(len(steps), 3 * 400)
+        steps, a, b, total = show_stats.load_plot_data(self.text, 'minmax', points=5000)
+        self.assertEqual(len(steps), 2000)  # Few enough rows to plot them all
+
+
+if __name__ == '__main__':
+    unittest.main()
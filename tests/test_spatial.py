@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import math
+import pickle
+import random
+
+# Add the src directory to the path so we can import the spatial module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from spatial import SpatialGrid
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class TestSpatialGrid(unittest.TestCase):
+    """Test cases for the uniform-grid spatial index."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = random.Random(7)
+        self.grid = SpatialGrid(50)
+        self.points = [Point(rng.uniform(0, 800), rng.uniform(0, 600)) for _ in range(300)]
+        for p in self.points:
+            self.grid.insert(p, p.x, p.y)
+
+    def brute(self, x, y, radius):
+        return [p for p in self.points if math.hypot(p.x - x, p.y - y) < radius]
+
+    def near(self, x, y, radius):
+        return [p for p in self.grid.query(x, y, radius) if math.hypot(p.x - x, p.y - y) < radius]
+
+    def test_query_matches_brute_force_in_order(self):
+        """Grid query returns the same neighbors, in insertion order, as a full scan."""
+        for x, y in [(0, 0), (400, 300), (799, 599), (25, 580)]:
+            for radius in (14, 50, 120):
+                self.assertEqual(self.near(x, y, radius), self.brute(x, y, radius))
+
+    def test_move_and_remove(self):
+        """Moved items are found at their new position; removed items vanish."""
+        p = self.points[0]
+        p.x, p.y = 790, 10
+        self.grid.move(p, p.x, p.y)
+        self.assertIn(p, self.near(790, 10, 5))
+        self.grid.remove(p)
+        self.assertNotIn(p, self.grid)
+        self.assertNotIn(p, self.grid.query(790, 10, 5))
+        self.assertEqual(len(self.grid), len(self.points) - 1)
+
+    def test_value_equal_items_are_distinct(self):
+        """Items are keyed by identity, not by value."""
+        grid = SpatialGrid(10)
+        a, b = tuple([1, 1, 'green']), tuple([1, 1, 'green'])
+        grid.insert(a, 1, 1)
+        grid.insert(b, 1, 1)
+        grid.remove(a)
+        self.assertEqual(len(grid), 1)
+        self.assertIs(grid.query(1, 1, 1)[0], b)
+
+    def test_pickle_round_trip(self):
+        """A restored grid answers queries like the original and keeps tracking moves."""
+        grid = pickle.loads(pickle.dumps(self.grid))
+        self.assertEqual([(p.x, p.y) for p in grid.query(400, 300, 120)],
+                         [(p.x, p.y) for p in self.grid.query(400, 300, 120)])
+        point = grid.query(400, 300, 120)[0]
+        grid.move(point, 790, 590)
+        self.assertIn(point, grid.query(790, 590, 5))
+        self.assertEqual(len(grid), len(self.grid))
+
+
+if __name__ == '__main__':
+    unittest.main()
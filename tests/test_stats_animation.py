@@ -0,0 +1,53 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add the src directory to the path so we can import the stats_animation module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from stats_animation import StatsAnimation, render_animation
+
+
+def series(n=50):
+    rng = np.random.default_rng(0)
+    steps = np.arange(1, n + 1) * 100
+    prefs = np.clip(0.5 + np.cumsum(rng.normal(0, 0.05, (n, 2)), axis=0), 0, 1)
+    return steps, prefs[:, 0], prefs[:, 1]
+
+
+class TestStatsAnimation(unittest.TestCase):
+    """Test cases for the incremental stats frame renderer."""
+
+    def test_frames_match_a_full_redraw(self):
+        """Blitted frames are pixel-identical to drawing the whole figure."""
+        animation = StatsAnimation(*series(), title='Test', dpi=40)
+        animation.render(50)
+        frame = animation.render(20)  # Earlier frame after a later one: no leftovers
+        for _, artist in animation.overlay:
+            artist.set_animated(False)
+        animation.canvas.draw()
+        full = np.asarray(animation.canvas.buffer_rgba())[:, :, :3].tobytes()
+        self.assertEqual(frame, full)
+        self.assertEqual(len(frame), animation.width * animation.height * 3)
+
+    def test_render_animation_writes_every_frame(self):
+        """Chunks rendered by a pool produce one PNG per sample, same as in-process."""
+        with tempfile.TemporaryDirectory() as tmp:
+            counts = []
+            for workers in (1, 2):
+                frames_dir = os.path.join(tmp, f'workers{workers}')
+                counts.append(render_animation(*series(12), title='Test', frames_dir=frames_dir, workers=workers,
+                                               dpi=30, chunk_size=5, progress=None))
+                self.assertEqual(sorted(os.listdir(frames_dir)), [f'frame_{i:06d}.png' for i in range(12)])
+            self.assertEqual(counts, [12, 12])
+            for i in (0, 11):
+                with open(os.path.join(tmp, 'workers1', f'frame_{i:06d}.png'), 'rb') as a, \
+                        open(os.path.join(tmp, 'workers2', f'frame_{i:06d}.png'), 'rb') as b:
+                    self.assertEqual(a.read(), b.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import sys
+import os
+import multiprocessing
+
+# Add the src directory to the path so we can import the sweep module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sweep import build_tasks, run_sweep
+
+
+class TestSweep(unittest.TestCase):
+    """Test cases for the parallel sweep runner."""
+
+    def test_build_tasks_covers_grid(self):
+        """Every (ants, food) cell gets `repeats` runs with distinct seeds."""
+        tasks = build_tasks((1, 5, 2), (10, 20, 10), repeats=2, max_steps=50, seed=100)
+        cells = sorted({(t.num_ants, t.num_food) for t in tasks})
+        self.assertEqual(cells, [(a, f) for a in (1, 3, 5) for f in (10, 20)])
+        self.assertEqual(len(tasks), 12)
+        self.assertEqual(len({t.seed for t in tasks}), 12)
+        self.assertTrue(all(t.max_steps == 50 for t in tasks))
+
+    def test_run_sweep_returns_every_result(self):
+        """Results come back over the pool, one per task, with wall times."""
+        tasks = build_tasks((4, 8, 4), (2, 4, 2), max_steps=30, seed=1)
+        seen = []
+        outcomes = run_sweep(tasks, workers=2, on_result=lambda r, w: seen.append(r), progress=None)
+        self.assertEqual(len(outcomes), len(tasks))
+        self.assertEqual(len(seen), len(tasks))
+        self.assertEqual(sorted(r.seed for r, _ in outcomes), sorted(t.seed for t in tasks))
+        self.assertTrue(all(wall > 0 for _, wall in outcomes))
+
+    def test_run_sweep_reuses_a_given_pool(self):
+        """A pool passed in serves several sweeps and is left open."""
+        with multiprocessing.Pool(processes=1) as pool:
+            for seed in (1, 2):
+                outcomes = run_sweep(build_tasks((4, 4, 1), (2, 3, 1), max_steps=20, seed=seed), workers=1,
+                                     progress=None, pool=pool)
+                self.assertEqual(len(outcomes), 2)
+            self.assertEqual(pool.apply(abs, (-3,)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Add the src directory to the path so we can import the telemetry module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import telemetry
+from colony import Simulation, SimulationConfig
+from telemetry import TelemetryRecorder
+
+
+def fill(recorder, steps):
+    for step in range(1, steps + 1):
+        recorder.record(step, [step / 1000, 1 - step / 1000], [step, 2 * step], step // 3, 7)
+
+
+class TestTelemetryRecorder(unittest.TestCase):
+    """Test cases for the columnar telemetry recorder."""
+
+    def test_grow_keeps_every_sample(self):
+        recorder = TelemetryRecorder(2, interval=5, capacity=4)
+        fill(recorder, 100)
+        data = recorder.data()
+        np.testing.assert_array_equal(data['step'], np.arange(5, 101, 5))
+        np.testing.assert_array_equal(data['population'][:, 1], 2 * data['step'])
+        np.testing.assert_allclose(data['preference'][:, 0], data['step'] / 1000)
+
+    def test_ring_keeps_latest_samples_in_order(self):
+        recorder = TelemetryRecorder(2, interval=1, capacity=8, mode='ring')
+        fill(recorder, 21)
+        np.testing.assert_array_equal(recorder.data()['step'], np.arange(14, 22))
+        self.assertEqual(recorder.capacity, 8)
+
+    def test_decimate_covers_whole_run(self):
+        recorder = TelemetryRecorder(2, interval=1, capacity=8, mode='decimate')
+        fill(recorder, 100)
+        data = recorder.data()
+        self.assertLessEqual(len(data['step']), 8)
+        self.assertEqual(int(data['interval']), 16)
+        np.testing.assert_array_equal(data['step'], np.arange(16, 101, 16))
+        np.testing.assert_array_equal(data['deaths'], data['step'] // 3)
+
+    def test_simulation_writes_loadable_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stats.npz')
+            config = SimulationConfig(seed=2, max_steps=300, stats=True, stats_interval=10,
+                                      stats_file=path, stop_on_divergence=False)
+            result = Simulation(config).run()
+            data = telemetry.load(path)
+        self.assertEqual(data['step'][-1], result.steps - result.steps % 10)
+        self.assertEqual(data['preference'].shape, (len(data['step']), 2))
+        self.assertLessEqual(data['deaths'][-1], result.death_count)
+        self.assertTrue((data['population'] <= 40).all())
+
+    def test_memory_mapped_load_matches(self):
+        recorder = TelemetryRecorder(2, interval=1, capacity=8)
+        fill(recorder, 100)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'stats.npz')
+            recorder.save(path)
+            data = telemetry.load(path)
+            mapped = telemetry.load(path, mmap=True)
+            self.assertIsInstance(mapped['preference'], np.memmap)
+            for name in data:
+                np.testing.assert_array_equal(mapped[name], data[name])
+            del mapped
+
+
+if __name__ == '__main__':
+    unittest.main()